@@ -0,0 +1,301 @@
+"""Vectorized historical backtester for the signal engine.
+
+    python -m backtest.engine candles.csv --verify 2000
+    python -m backtest.engine ETH_USDT --archive data/candles --interval 1m
+"""
+import argparse
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from market_data.candle_archive import CandleArchive
+from market_data.candle_store import CANDLE_COLUMNS, interval_seconds
+from market_data.resampler import CandleResampler
+from signal_engine.batch_indicators import compute_indicators, ema
+from signal_engine.candle_patterns import CandlePatterns
+from signal_engine.fib_support import FibSupport
+from signal_engine.macd_rsi_logic import MacdRsiLogic
+from signal_engine.pipeline import SignalPipeline
+from signal_engine.scoring_rules import RuleScoringSystem
+from signal_engine.scoring_system import ScoringSystem
+from signal_engine.streaming import StreamingIndicatorEngine
+from signal_engine.vegas_tunnel import VegasTunnel
+from trading_assistant.trailing_manager import TrailingManager
+
+
+def load_candles(path: str) -> pd.DataFrame:
+    """Loads OHLCV candles from a .csv (with a header) or an (n, 6) .npy file."""
+    if path.endswith(".npy"):
+        return pd.DataFrame(np.load(path), columns=CANDLE_COLUMNS)
+    return pd.read_csv(path)[CANDLE_COLUMNS]
+
+
+def simulate_trades(df: pd.DataFrame, trailing_manager: TrailingManager, position_size: float = 1.0,
+                    fee_rate: float = 0.0005) -> pd.DataFrame:
+    """Simulates one position at a time: entry at the signal bar's close, then SL/TP/trailing exits.
+
+    ``df`` needs timestamp, high, low, close, atr and signal (1 long, -1 short, 0 none) columns.
+    Stops are checked against each bar's low/high (stop loss first when both are touched)
+    and trailed at the bar close with TrailingManager, like the position monitor does.
+    """
+    high = df['high'].to_numpy()
+    low = df['low'].to_numpy()
+    close = df['close'].to_numpy()
+    atr = df['atr'].to_numpy()
+    timestamps = df['timestamp'].to_numpy()
+    entries = np.flatnonzero(df['signal'].to_numpy() != 0)
+    signal = df['signal'].to_numpy()
+    n = len(df)
+    trades = []
+    i = 0
+    while True:
+        k = np.searchsorted(entries, i)
+        if k >= len(entries):
+            break
+        entry = entries[k]
+        direction = "long" if signal[entry] > 0 else "short"
+        open_price = close[entry]
+        stop_loss, take_profit = trailing_manager.calculate_current_levels(
+            open_price, open_price, atr[entry], direction, position_size)
+        exit_index, exit_price, reason = n - 1, close[n - 1], "end_of_data"
+        for j in range(entry + 1, n):
+            if direction == "long":
+                if low[j] <= stop_loss:
+                    exit_index, exit_price, reason = j, stop_loss, "stop_loss"
+                    break
+                if high[j] >= take_profit:
+                    exit_index, exit_price, reason = j, take_profit, "take_profit"
+                    break
+            else:
+                if high[j] >= stop_loss:
+                    exit_index, exit_price, reason = j, stop_loss, "stop_loss"
+                    break
+                if low[j] <= take_profit:
+                    exit_index, exit_price, reason = j, take_profit, "take_profit"
+                    break
+            stop_loss, take_profit = trailing_manager.calculate_current_levels(
+                open_price, close[j], atr[j], direction, position_size)
+        sign = 1 if direction == "long" else -1
+        fees = (open_price + exit_price) * position_size * fee_rate
+        trades.append({
+            "entry_time": timestamps[entry],
+            "exit_time": timestamps[exit_index],
+            "direction": direction,
+            "entry_price": open_price,
+            "exit_price": exit_price,
+            "bars_held": exit_index - entry,
+            "exit_reason": reason,
+            "profit": sign * (exit_price - open_price) * position_size - fees,
+        })
+        i = exit_index + 1
+    return pd.DataFrame(trades)
+
+
+def large_candle_closes(candles: pd.DataFrame, interval: str, large_timeframe: str) -> np.ndarray:
+    """True for each candle that completes a ``large_timeframe`` candle.
+
+    The large candles are resampled as in the live loop; each one closes with its last
+    base candle, whose close is the large candle's close.
+    """
+    closes = np.zeros(len(candles), dtype=bool)
+    closed = CandleResampler(interval, [large_timeframe]).update_many(candles[CANDLE_COLUMNS].to_numpy())
+    if closed:
+        last_timestamps = [candle[0] + interval_seconds(large_timeframe) - interval_seconds(interval)
+                           for _, candle in closed]
+        closes[np.searchsorted(candles['timestamp'].to_numpy(), last_timestamps)] = True
+    return closes
+
+
+def large_timeframe_trend_series(vegas_tunnel: VegasTunnel, close: pd.Series, large_closes: np.ndarray) -> np.ndarray:
+    """Large-timeframe trend label the live loop sees at each bar.
+
+    Each bar gets the trend of the last large candle closed by then ("sideways" before the
+    first one), like the live cycle reading its resampled large-timeframe engine.
+    """
+    labels = np.full(len(close), "sideways", dtype=object)
+    if not large_closes.any():
+        return labels
+    large = pd.DataFrame({'close': close.to_numpy()[large_closes]})
+    for span in sorted(set(vegas_tunnel.ema_spans())):
+        large[f'EMA_{span}'] = ema(large['close'], span)
+    large_trend, _ = vegas_tunnel.identify_trend_series(large)
+    last_closed = np.cumsum(large_closes) - 1
+    known = last_closed >= 0
+    labels[known] = large_trend[last_closed[known]]
+    return labels
+
+
+class Backtester:
+    """Scores every bar of a candle series at once and simulates SL/TP/trailing exits.
+
+    Signals use the vectorized counterparts of the live "last row" methods, so each bar's
+    score equals what the live loop would have computed when that bar closed.
+    """
+
+    def __init__(self, vegas_tunnel: VegasTunnel, macd_rsi_logic: MacdRsiLogic, fib_support: FibSupport,
+                 candle_patterns: CandlePatterns, scoring_system: ScoringSystem, trailing_manager: TrailingManager,
+                 strong_score: float = 8, window: int = 100, macd_fast: int = 12, macd_slow: int = 26,
+                 macd_signal: int = 9, rsi_length: int = 14, atr_length: int = 14,
+                 position_size: float = 1.0, fee_rate: float = 0.0005, interval: str = "1m",
+                 large_timeframe: Optional[str] = "4h"):
+        self.vegas_tunnel = vegas_tunnel
+        self.macd_rsi_logic = macd_rsi_logic
+        self.fib_support = fib_support
+        self.candle_patterns = candle_patterns
+        self.scoring_system = scoring_system
+        self.trailing_manager = trailing_manager
+        self.strong_score = strong_score
+        self.window = window  # Candles the live loop keeps (KLINE_LIMIT)
+        self.indicator_params = (macd_fast, macd_slow, macd_signal, rsi_length, atr_length)
+        self.atr_column = f"ATRr_{atr_length}"
+        self.position_size = position_size
+        self.fee_rate = fee_rate
+        self.interval = interval  # Interval of the candles passed in
+        self.large_timeframe = large_timeframe  # Resampled for the large-timeframe trend; None scores without it
+
+    def large_timeframe_trend(self, candles: pd.DataFrame) -> np.ndarray:
+        if self.large_timeframe is None:
+            return np.full(len(candles), "sideways", dtype=object)
+        return large_timeframe_trend_series(self.vegas_tunnel, candles['close'],
+                                            large_candle_closes(candles, self.interval, self.large_timeframe))
+
+    def signal_frame(self, candles: pd.DataFrame) -> pd.DataFrame:
+        """Returns the candles with indicator, component, score and signal columns for every bar.
+
+        ``score_<component>`` columns hold what each scoring component added (negative for
+        deductions), so a bar's score can be explained without re-running the scalar path.
+        """
+        df = compute_indicators(candles.copy(), self.vegas_tunnel.ema_spans(), *self.indicator_params)
+        trend, strength = self.vegas_tunnel.identify_trend_series(df)
+        macd_rsi_signals = self.macd_rsi_logic.signal_columns(df)
+        fib_near = self.fib_support.near_level_series(df)
+        patterns = self.candle_patterns.pattern_columns(df)
+        atr = np.nan_to_num(df[self.atr_column].to_numpy(), nan=0.0)
+        large_trend = self.large_timeframe_trend(candles)
+        components = self.scoring_system.score_components(trend, strength, macd_rsi_signals, fib_near,
+                                                          self.candle_patterns.scored_patterns(patterns), atr,
+                                                          large_trend)
+        score = self.scoring_system.total_score(components)
+        score[:1] = 0  # The live loop waits for two closed candles before scoring
+        signal = np.where((score >= self.strong_score) & (trend == "uptrend"), 1,
+                          np.where((score >= self.strong_score) & (trend == "downtrend"), -1, 0))
+        signal[:1] = 0
+        df['trend'] = trend
+        df['trend_strength'] = strength
+        df['fib_near'] = fib_near
+        df['large_timeframe_trend'] = large_trend
+        for name, column in {**macd_rsi_signals, **patterns}.items():
+            df[name] = column
+        df['atr'] = atr
+        for name, contribution in components.items():
+            df[f'score_{name}'] = contribution
+        df['score'] = score
+        df['signal'] = signal
+        return df
+
+    def simulate(self, df: pd.DataFrame) -> pd.DataFrame:
+        return simulate_trades(df, self.trailing_manager, self.position_size, self.fee_rate)
+
+    @staticmethod
+    def summarize(trades: pd.DataFrame) -> dict:
+        if trades.empty:
+            return {"trades": 0, "win_rate": 0.0, "total_profit": 0.0, "profit_factor": 0.0, "max_drawdown": 0.0}
+        profit = trades['profit'].to_numpy()
+        equity = np.cumsum(profit)
+        gains = profit[profit > 0].sum()
+        losses = -profit[profit < 0].sum()
+        return {
+            "trades": len(trades),
+            "win_rate": float((profit > 0).mean()),
+            "total_profit": float(equity[-1]),
+            "profit_factor": float(gains / losses) if losses else float("inf"),
+            "max_drawdown": float((np.maximum.accumulate(np.r_[0.0, equity]) - np.r_[0.0, equity]).max()),
+        }
+
+    def run(self, candles: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame, dict]:
+        df = self.signal_frame(candles)
+        trades = self.simulate(df)
+        return df, trades, self.summarize(trades)
+
+    def replay_live(self, candles: pd.DataFrame, bars: Optional[int] = None) -> np.ndarray:
+        """Scores the last ``bars`` candles the way the live loop does, one closed candle at a time.
+
+        Used to check that ``signal_frame`` reproduces the live scores.
+        """
+        engine = StreamingIndicatorEngine(self.vegas_tunnel.ema_spans(), *self.indicator_params, history=self.window)
+        # The large timeframe is resampled from the same candles into its own engine, as in the live loop
+        resampler = CandleResampler(self.interval, [self.large_timeframe]) if self.large_timeframe else None
+        large_engine = StreamingIndicatorEngine(self.vegas_tunnel.ema_spans(), *self.indicator_params,
+                                                history=self.window)
+        pipeline = SignalPipeline(self.vegas_tunnel, self.macd_rsi_logic, self.fib_support, self.candle_patterns,
+                                  self.scoring_system, self.strong_score)
+        records = candles[CANDLE_COLUMNS].to_dict("records")
+        first_scored = len(records) - (bars if bars is not None else len(records))
+        self.fib_support.reset()
+        scores = []
+        for index, candle in enumerate(records):
+            engine.update(candle)
+            if resampler is not None:
+                for _, large_candle in resampler.update([candle[column] for column in CANDLE_COLUMNS]):
+                    large_engine.update(dict(zip(CANDLE_COLUMNS, large_candle)))
+            if index < first_scored:
+                self.fib_support.update(candle)  # The live loop's swings span all earlier candles
+                continue
+            df = engine.frame()
+            if len(df) < 2:
+                scores.append(0.0)
+                continue
+            atr_value = df[engine.atr_column].iloc[-1]
+            atr_value = 0.0 if pd.isna(atr_value) else atr_value
+            large_timeframe_trend = self.vegas_tunnel.calculate_large_timeframe_trend(large_engine.frame())
+            scores.append(pipeline.evaluate(df, atr_value, large_timeframe_trend)['score'])
+        return np.array(scores, dtype=float)
+
+
+def main():
+    from config.constants import (ATR_PERIOD, INITIAL_STOP_LOSS_USD, INITIAL_TAKE_PROFIT_USD, KLINE_LIMIT,
+                                  LARGE_TIMEFRAME, MACD_FAST_PERIOD, MACD_SIGNAL_PERIOD, MACD_SLOW_PERIOD, RSI_PERIOD,
+                                  SCORED_CANDLE_PATTERNS, SIGNAL_SCORE_STRONG, TRAILING_TRIGGER_USD, VEGAS_EMA_LONG, VEGAS_EMA_MEDIUM,
+                                  VEGAS_EMA_SHORT)
+
+    parser = argparse.ArgumentParser(description="Backtest the signal engine on historical candles.")
+    parser.add_argument("candles", help=".csv or .npy file with timestamp, open, high, low, close, volume, "
+                                        "or a contract when --archive is given")
+    parser.add_argument("--archive", help="Read the candles of this contract from a CandleArchive directory")
+    parser.add_argument("--interval", default="1m", help="Candle interval (the archive's with --archive)")
+    parser.add_argument("--start", type=int, help="First candle timestamp (with --archive)")
+    parser.add_argument("--end", type=int, help="Last candle timestamp (with --archive)")
+    parser.add_argument("--verify", type=int, default=0, help="Replay the last N bars through the live path and compare")
+    parser.add_argument("--trades", help="Write the simulated trades to this CSV file")
+    parser.add_argument("--rules", help="Score with this JSON/YAML rule file instead of the default weights")
+    args = parser.parse_args()
+
+    backtester = Backtester(
+        VegasTunnel(VEGAS_EMA_SHORT, VEGAS_EMA_MEDIUM, VEGAS_EMA_LONG), MacdRsiLogic(), FibSupport(),
+        CandlePatterns(scored=SCORED_CANDLE_PATTERNS), RuleScoringSystem(args.rules) if args.rules else ScoringSystem(),
+        TrailingManager(INITIAL_STOP_LOSS_USD, INITIAL_TAKE_PROFIT_USD, TRAILING_TRIGGER_USD),
+        SIGNAL_SCORE_STRONG, KLINE_LIMIT, MACD_FAST_PERIOD, MACD_SLOW_PERIOD, MACD_SIGNAL_PERIOD,
+        RSI_PERIOD, ATR_PERIOD, interval=args.interval,
+        # Candles at or above the large timeframe have no larger trend to confirm against
+        large_timeframe=LARGE_TIMEFRAME if interval_seconds(LARGE_TIMEFRAME) > interval_seconds(args.interval) else None,
+    )
+    if args.archive:
+        candles = CandleArchive(args.archive).frame(args.candles, args.interval, args.start, args.end)
+    else:
+        candles = load_candles(args.candles)
+    started = time.perf_counter()
+    df, trades, summary = backtester.run(candles)
+    print(f"Backtested {len(df)} bars in {time.perf_counter() - started:.2f}s: {summary}")
+    if args.trades:
+        trades.to_csv(args.trades, index=False)
+    if args.verify:
+        live = backtester.replay_live(candles, args.verify)
+        vectorized = df['score'].to_numpy()[-args.verify:]
+        mismatches = int((~np.isclose(live, vectorized, atol=1e-9)).sum())
+        print(f"Live replay of the last {args.verify} bars: {mismatches} score mismatches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""Grid / random-search parameter sweep over historical candles.
+
+    python -m backtest.sweep candles.npy --space space.json --samples 2000 --out sweep.csv
+
+The candles and every indicator column that no swept parameter affects are computed once,
+placed in shared memory and read zero-copy by the worker processes. Workers cache the EMA
+columns per span, and batches are grouped by EMA periods so those caches are reused.
+"""
+import argparse
+import itertools
+import json
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backtest.engine import (Backtester, large_candle_closes, large_timeframe_trend_series, load_candles,
+                             simulate_trades)
+from market_data.candle_store import CANDLE_COLUMNS, interval_seconds
+from signal_engine.batch_indicators import compute_indicators, ema
+from signal_engine.candle_patterns import CandlePatterns
+from signal_engine.fib_support import FibSupport
+from signal_engine.macd_rsi_logic import MacdRsiLogic
+from signal_engine.scoring_system import ScoringSystem
+from signal_engine.vegas_tunnel import VegasTunnel
+from trading_assistant.trailing_manager import TrailingManager
+
+# Columns shared with the workers; none of them depend on a swept parameter
+BASE_COLUMNS = CANDLE_COLUMNS + ['MACDh_12_26_9', 'RSI_14', 'atr', 'fib_near', 'candle_pattern', 'large_close']
+WEIGHT_PREFIX = "weight_"
+
+
+def default_params() -> dict:
+    """Current values from config.constants, the starting point of every sweep."""
+    from config.constants import (ATR_MULTIPLIER, INITIAL_STOP_LOSS_USD, INITIAL_TAKE_PROFIT_USD, RSI_OVERBOUGHT,
+                                  RSI_OVERSOLD, SIGNAL_SCORE_STRONG, TRAILING_TRIGGER_USD, VEGAS_EMA_LONG,
+                                  VEGAS_EMA_MEDIUM, VEGAS_EMA_SHORT)
+    params = {
+        "ema_short": VEGAS_EMA_SHORT,
+        "ema_medium": VEGAS_EMA_MEDIUM,
+        "ema_long": VEGAS_EMA_LONG,
+        "rsi_overbought": RSI_OVERBOUGHT,
+        "rsi_oversold": RSI_OVERSOLD,
+        "strong_score": SIGNAL_SCORE_STRONG,
+        "stop_loss": INITIAL_STOP_LOSS_USD,
+        "take_profit": INITIAL_TAKE_PROFIT_USD,
+        "trailing_trigger": TRAILING_TRIGGER_USD,
+        "atr_multiplier": ATR_MULTIPLIER,
+        "high_atr_threshold": 5.0,
+    }
+    params.update({WEIGHT_PREFIX + name: weight for name, weight in ScoringSystem.DEFAULT_WEIGHTS.items()})
+    return params
+
+
+def grid(space: Dict[str, list]) -> List[dict]:
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+
+def random_sample(space: Dict[str, list], samples: int, seed: Optional[int] = None) -> List[dict]:
+    """Draws distinct combinations uniformly from the grid without building it."""
+    rng = random.Random(seed)
+    total = 1
+    for values in space.values():
+        total *= len(values)
+    if samples >= total:
+        return grid(space)
+    seen = set()
+    combos = []
+    while len(combos) < samples:
+        combo = tuple(rng.randrange(len(values)) for values in space.values())
+        if combo not in seen:
+            seen.add(combo)
+            combos.append({name: values[i] for (name, values), i in zip(space.items(), combo)})
+    return combos
+
+
+class SharedArray:
+    """A float64 matrix in shared memory; workers attach by name without copying."""
+
+    def __init__(self, shape, name: Optional[str] = None, data: Optional[np.ndarray] = None):
+        size = int(np.prod(shape)) * 8
+        self.shape = tuple(shape)
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(create=True, size=size) if self.owner else shared_memory.SharedMemory(name=name)
+        self.array = np.ndarray(self.shape, dtype=np.float64, buffer=self.shm.buf)
+        if data is not None:
+            self.array[:] = data
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self):
+        self.array = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def base_matrix(candles: pd.DataFrame, interval: str = "1m", large_timeframe: Optional[str] = "4h") -> np.ndarray:
+    """Candles plus the parameter-independent columns, in BASE_COLUMNS order.
+
+    ``large_close`` marks the candles that complete a ``large_timeframe`` candle; the
+    large-timeframe EMAs depend on the swept spans, so each combination computes them
+    from those closes.
+    """
+    df = compute_indicators(candles[CANDLE_COLUMNS].astype(float).copy(), [])
+    candle_patterns = CandlePatterns()
+    patterns = candle_patterns.scored_patterns(candle_patterns.pattern_columns(df))
+    any_pattern = np.zeros(len(df), dtype=bool)
+    for detected in patterns.values():
+        any_pattern |= detected
+    df['atr'] = np.nan_to_num(df['ATRr_14'].to_numpy(), nan=0.0)
+    df['fib_near'] = FibSupport().near_level_series(df)
+    df['candle_pattern'] = any_pattern
+    df['large_close'] = large_candle_closes(df, interval, large_timeframe) if large_timeframe else False
+    return df[BASE_COLUMNS].to_numpy(dtype=np.float64)
+
+
+_worker: dict = {}
+
+
+def _init_worker(shm_name: str, shape: tuple):
+    shared = SharedArray(shape, name=shm_name)
+    _worker['shared'] = shared  # Keeps the mapping alive for the life of the worker
+    _worker['base'] = pd.DataFrame(shared.array, columns=BASE_COLUMNS, copy=False)
+    _worker['emas'] = {}
+
+
+def _ema_column(span: int) -> pd.Series:
+    emas = _worker['emas']
+    if span not in emas:
+        emas[span] = ema(_worker['base']['close'], span)
+    return emas[span]
+
+
+def evaluate_params(base: pd.DataFrame, params: dict, ema_column=None) -> dict:
+    """Backtests one parameter combination on the shared base columns."""
+    params = {**default_params(), **params}
+    ema_column = ema_column or (lambda span: ema(base['close'], span))
+    vegas_tunnel = VegasTunnel(params['ema_short'], params['ema_medium'], params['ema_long'])
+    emas = pd.DataFrame({f'EMA_{span}': ema_column(span) for span in
+                         {vegas_tunnel.ema_short, vegas_tunnel.ema_medium, vegas_tunnel.ema_long}})
+    trend, strength = vegas_tunnel.identify_trend_series(emas)
+    macd_rsi_signals = MacdRsiLogic(params['rsi_overbought'], params['rsi_oversold']).signal_columns(base)
+    weights = {k[len(WEIGHT_PREFIX):]: v for k, v in params.items() if k.startswith(WEIGHT_PREFIX)}
+    scoring_system = ScoringSystem(weights, params['high_atr_threshold'])
+    atr = base['atr'].to_numpy()
+    large_trend = large_timeframe_trend_series(vegas_tunnel, base['close'], base['large_close'].to_numpy() > 0)
+    score = scoring_system.calculate_scores(trend, strength, macd_rsi_signals, base['fib_near'].to_numpy() > 0,
+                                            {'any': base['candle_pattern'].to_numpy() > 0}, atr, large_trend)
+    strong = score >= params['strong_score']
+    signal = np.where(strong & (trend == "uptrend"), 1, np.where(strong & (trend == "downtrend"), -1, 0))
+    signal[:1] = 0
+    trailing_manager = TrailingManager(params['stop_loss'], params['take_profit'], params['trailing_trigger'],
+                                       params['atr_multiplier'])
+    frame = base[['timestamp', 'high', 'low', 'close', 'atr']].assign(signal=signal)
+    return Backtester.summarize(simulate_trades(frame, trailing_manager))
+
+
+def _evaluate_batch(batch: List[dict]) -> List[dict]:
+    results = []
+    for params in batch:
+        summary = evaluate_params(_worker['base'], params, _ema_column)
+        results.append({**params, **summary})
+    return results
+
+
+class ParameterSweep:
+    """Evaluates many parameter combinations over one candle series with a process pool."""
+
+    def __init__(self, candles: pd.DataFrame, max_workers: Optional[int] = None, batch_size: int = 8,
+                 interval: str = "1m", large_timeframe: Optional[str] = "4h"):
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.base = base_matrix(candles, interval, large_timeframe)
+
+    def _batches(self, combos: Iterable[dict]) -> List[List[dict]]:
+        # Neighbouring batches share EMA periods, so each worker's EMA cache keeps hitting
+        ordered = sorted(combos, key=lambda p: (p.get('ema_short', 0), p.get('ema_medium', 0), p.get('ema_long', 0)))
+        return [ordered[i:i + self.batch_size] for i in range(0, len(ordered), self.batch_size)]
+
+    def run(self, combos: List[dict], rank_by: str = "total_profit") -> pd.DataFrame:
+        """Returns one row per combination with its backtest summary, best first."""
+        shared = SharedArray(self.base.shape, data=self.base)
+        try:
+            with ProcessPoolExecutor(self.max_workers, initializer=_init_worker,
+                                     initargs=(shared.name, shared.shape)) as executor:
+                rows = [row for batch in executor.map(_evaluate_batch, self._batches(combos)) for row in batch]
+        finally:
+            shared.close()
+        results = pd.DataFrame(rows)
+        if results.empty:
+            return results
+        return results.sort_values(rank_by, ascending=False, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep strategy parameters over historical candles.")
+    parser.add_argument("candles", help=".csv or .npy file with timestamp, open, high, low, close, volume")
+    parser.add_argument("--space", required=True, help='JSON object of parameter -> list of values, e.g. {"rsi_overbought": [65, 70, 75]}')
+    parser.add_argument("--samples", type=int, default=0, help="Random-search this many combinations instead of the full grid")
+    parser.add_argument("--interval", default="1m", help="Candle interval")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--rank-by", default="total_profit")
+    parser.add_argument("--out", help="Write the ranked table to this CSV file")
+    args = parser.parse_args()
+
+    with open(args.space) as f:
+        space = json.load(f)
+    unknown = set(space) - set(default_params())
+    if unknown:
+        parser.error(f"Unknown parameters: {', '.join(sorted(unknown))}")
+    combos = random_sample(space, args.samples, args.seed) if args.samples else grid(space)
+
+    started = time.perf_counter()
+    from config.constants import LARGE_TIMEFRAME
+    large_timeframe = LARGE_TIMEFRAME if interval_seconds(LARGE_TIMEFRAME) > interval_seconds(args.interval) else None
+    sweep = ParameterSweep(load_candles(args.candles), args.workers, interval=args.interval,
+                           large_timeframe=large_timeframe)
+    results = sweep.run(combos, args.rank_by)
+    print(f"Evaluated {len(results)} combinations in {time.perf_counter() - started:.1f}s")
+    print(results.head(20).to_string())
+    if args.out:
+        results.to_csv(args.out, index=False)
+
+
+if __name__ == "__main__":
+    main()
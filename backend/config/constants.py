@@ -4,6 +4,31 @@ TRADING_PAIR = "ETH_USDT"
 # Timeframe for K-lines
 KLINE_INTERVAL = "1m"
 KLINE_LIMIT = 100 # Number of recent k-lines to fetch
+CANDLE_STORE_CAPACITY = 10000 # Closed k-lines kept in memory per contract/interval
+HIGHER_TIMEFRAMES = ["5m", "15m", "1h", "4h"] # Resampled from KLINE_INTERVAL candles, each with its own indicators
+LARGE_TIMEFRAME = "4h" # Timeframe of the large-timeframe trend confirmation
+
+# Indicator warm-up
+WARMUP_TOLERANCE = 0.01 # Max weight the EMA seed may still carry after warm-up
+WARMUP_SNAPSHOT_DIR = "data/warmup" # Indicator state and candle snapshots for fast restarts
+WARMUP_SNAPSHOT_EVERY = 15 # Candles of an interval between its snapshots; also saved on shutdown
+
+# Candle archive
+CANDLE_ARCHIVE_DIR = "data/candles" # Append-only closed k-lines per contract/interval/day
+CANDLES_MAX_LIMIT = 5000 # Most candles /candles returns per request
+
+# Gate.io client
+GATEIO_POOL_SIZE = 8 # Worker threads and keep-alive connections for exchange calls
+
+# Multi-pair scanner
+SCANNER_CONTRACTS = [
+    "BTC_USDT", "ETH_USDT", "SOL_USDT", "XRP_USDT", "DOGE_USDT",
+    "BNB_USDT", "ADA_USDT", "AVAX_USDT", "LINK_USDT", "LTC_USDT",
+]
+SCANNER_HISTORY = 2000 # Closed k-lines kept per scanned contract (one request to backfill)
+SCANNER_LARGE_HISTORY = 500 # Closed LARGE_TIMEFRAME k-lines per scanned contract, enough for the tunnel EMAs to settle
+SCANNER_REQUEST_RATE = 10.0 # Exchange requests per second across all scanned contracts
+SCANNER_POOL_SIZE = 4 # Scanner worker threads and connections, separate from the trading client's
 
 # Vegas Tunnel EMA periods
 VEGAS_EMA_SHORT = 85
@@ -24,6 +49,9 @@ RSI_OVERSOLD = 30
 ATR_PERIOD = 14
 ATR_MULTIPLIER = 2.0
 
+# Candle patterns
+SCORED_CANDLE_PATTERNS = ["bullish_engulfing", "bearish_engulfing", "hammer", "shooting_star"] # Feed the score; the rest are columns only
+
 # Signal Scoring thresholds
 SIGNAL_SCORE_STRONG = 8
 SIGNAL_SCORE_MEDIUM = 6
@@ -34,8 +62,40 @@ INITIAL_STOP_LOSS_USD = 10.0
 INITIAL_TAKE_PROFIT_USD = 10.0
 TRAILING_TRIGGER_USD = 5.0
 
+# Position monitor
+PRICE_TICK_SIZE = 0.01 # ETH_USDT order_price_round; stops move only by whole ticks
+AMEND_RATE_PER_SECOND = 1.0 # Sustained stop amendments per second
+AMEND_BURST = 5 # Amendments allowed back to back
+TP_TRAIL_HYSTERESIS_ATR = 0.5 # ATRs the trailing take profit must gain before it is moved again
+POSITION_REFRESH_INTERVAL_SECONDS = 10 # Re-fetch positions when no fresher copy arrived
+
+# Telegram notifications
+TELEGRAM_QUEUE_SIZE = 1000 # Notifications waiting to be sent before new ones are dropped
+TELEGRAM_RATE_PER_SECOND = 1.0 # Telegram allows about one message per second per chat
+TELEGRAM_BURST = 3 # Messages allowed back to back
+TELEGRAM_COALESCE_SECONDS = 2.0 # Notifications within this window go out as one message
+TELEGRAM_MAX_RETRIES = 5 # Attempts after the first before a message is given up
+
+# Ticker cache (/price, /ticker)
+TICKER_STALE_SECONDS = 10 # A cached price older than this is flagged as stale
+
+# Live push (WebSocket / Server-Sent Events)
+EVENT_BUFFER_SIZE = 256 # Events buffered per client; the oldest are dropped when a client falls behind
+EVENT_KEEPALIVE_SECONDS = 15 # Idle interval before a keep-alive is sent
+
 # Database
-DATABASE_FILE = "sql_app.db"
+DATABASE_FILE = "sql_app.db" # Used when settings.DATABASE_URL is not set
+LEGACY_HISTORY_DATABASE_FILE = "trading_history.db" # Old sqlite3 history database, imported at startup
+DB_POOL_SIZE = 5 # Connections kept open in the engine's pool
+DB_MAX_OVERFLOW = 10 # Extra connections allowed under load
+DB_POOL_RECYCLE_SECONDS = 1800 # Reconnect pooled connections older than this
+DB_WRITE_QUEUE_SIZE = 10000 # Rows waiting for the background writer before producers block
+DB_WRITE_BATCH_SIZE = 500 # Rows inserted per transaction
+DB_FLUSH_INTERVAL_SECONDS = 1.0 # Idle wait before the writer re-checks for shutdown
+
+# Metrics and profiling
+METRICS_WINDOW = 1000 # Samples per stage the /metrics quantiles are computed over
+PROFILE_DIR = "data/profiles" # Where /profile captures are written
 
 # Telegram
 TELEGRAM_SIGNAL_NOTIFICATION_PREFIX = "📈 New Trading Signal!"
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 from typing import Optional
 
@@ -11,6 +12,23 @@ class Settings:
     GATE_IO_TRADE_SECRET: Optional[str] = os.getenv("GATE_IO_TRADE_SECRET")
     TELEGRAM_BOT_TOKEN: Optional[str] = os.getenv("TELEGRAM_BOT_TOKEN")
     TELEGRAM_CHAT_ID: Optional[str] = os.getenv("TELEGRAM_CHAT_ID")
+    TELEGRAM_API_BASE_URL: Optional[str] = os.getenv("TELEGRAM_API_BASE_URL") # e.g. a local stub server, http://127.0.0.1:8081/bot
     DATABASE_URL: Optional[str] = os.getenv("DATABASE_URL")
+    MARKET_DATA_MODE: str = os.getenv("MARKET_DATA_MODE", "rest") # "rest" polling or "websocket" streaming
+    GATE_IO_WS_URL: str = os.getenv("GATE_IO_WS_URL", "wss://fx-ws.gateio.ws/v4/ws/usdt") # Point at a replay server for testing
+    SCANNER_ENABLED: bool = os.getenv("SCANNER_ENABLED", "false").lower() == "true"
+    MARKET_DATA_RECORD_PATH: Optional[str] = os.getenv("MARKET_DATA_RECORD_PATH") # Record raw stream messages for replay
+    SCORING_RULES_PATH: str = os.getenv("SCORING_RULES_PATH", os.path.join(os.path.dirname(__file__), "scoring_rules.json")) # Reloaded when the file changes; must exist
+    SHADOW_STRATEGIES_PATH: Optional[str] = os.getenv("SHADOW_STRATEGIES_PATH") # JSON list of paper-traded scoring/trailing variants
+    GATEIO_RECORD_PATH: Optional[str] = os.getenv("GATEIO_RECORD_PATH") # Log every exchange response (.gz for gzip)
+    GATEIO_REPLAY_PATH: Optional[str] = os.getenv("GATEIO_REPLAY_PATH") # Run the loop from a recorded log instead of the exchange
+    GATEIO_REPLAY_SPEED: float = float(os.getenv("GATEIO_REPLAY_SPEED", "0")) # Multiple of real time, 0 for as fast as possible
+    GATEIO_REPLAY_DIR: Optional[str] = os.getenv("GATEIO_REPLAY_DIR") # Scratch database, candle archive and snapshots of a replay
 
 settings = Settings()
+if settings.GATEIO_REPLAY_PATH:
+    # A replay never touches the live database, archive or snapshots
+    if settings.GATEIO_REPLAY_DIR:
+        os.makedirs(settings.GATEIO_REPLAY_DIR, exist_ok=True)
+    else:
+        settings.GATEIO_REPLAY_DIR = tempfile.mkdtemp(prefix="replay-")
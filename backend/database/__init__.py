@@ -1 +1 @@
-from .db import create_connection, create_tables, save_history, get_history
+from .db import Base, SessionLocal, engine, get_db, get_history, init_db, save_history
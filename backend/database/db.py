@@ -1,53 +1,123 @@
-import sqlite3
-from sqlite3 import Error
-from typing import Optional
+import os
+from typing import List, Optional
 
-def create_connection(db_file: str) -> Optional[sqlite3.Connection]:
-    """Create a database connection to a SQLite database"""
-    conn = None
+from sqlalchemy import create_engine, event, inspect, insert, select
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+
+from config.constants import (DATABASE_FILE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE_SECONDS, DB_POOL_SIZE,
+                              LEGACY_HISTORY_DATABASE_FILE)
+from config.settings import settings
+
+if settings.GATEIO_REPLAY_PATH:
+    DATABASE_URL = f"sqlite:///{os.path.join(settings.GATEIO_REPLAY_DIR, os.path.basename(DATABASE_FILE))}"
+else:
+    DATABASE_URL = settings.DATABASE_URL or f"sqlite:///{DATABASE_FILE}"
+
+
+def _engine_options(url: str) -> dict:
+    """Pool settings for ``url``. In-memory SQLite keeps a single connection and is left alone."""
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/") == "sqlite:"):
+        return {"connect_args": {"check_same_thread": False}}
+    options = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_recycle": DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": True,
+    }
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+    return options
+
+
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """WAL lets readers run while the writer commits; NORMAL sync fsyncs only at checkpoints."""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-20000")  # 20 MB page cache
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
+
+# Objects stay readable after commit, so rows written by the background writer keep their ids
+SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+Base = declarative_base()
+
+
+def get_db():
+    db = SessionLocal()
     try:
-        conn = sqlite3.connect(db_file)
-        return conn
-    except Error as e:
-        print(e)
-    return None
-
-def create_tables(conn: sqlite3.Connection) -> None:
-    """Create database tables if they don't exist"""
-    sql_create_history_table = """CREATE TABLE IF NOT EXISTS history (
-                                    id integer PRIMARY KEY,
-                                    timestamp integer NOT NULL,
-                                    price real NOT NULL,
-                                    volume real NOT NULL,
-                                    signal_type text NOT NULL,
-                                    signal_strength real NOT NULL
-                                );"""
-    
+        yield db
+    finally:
+        db.close()
+
+
+def init_db(legacy_history_file: Optional[str] = LEGACY_HISTORY_DATABASE_FILE):
+    """Creates missing tables and indexes, then imports the legacy ``history`` table.
+
+    ``create_all`` only builds indexes together with a new table, so indexes added to
+    existing tables are created here one by one.
+    """
+    from database import models  # noqa: F401  Registers the tables on Base
+
+    Base.metadata.create_all(bind=engine)
+    inspector = inspect(engine)
+    existing = {table: {index['name'] for index in inspector.get_indexes(table)}
+                for table in inspector.get_table_names()}
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name not in existing.get(table.name, set()):
+                print(f"Creating index {index.name} on {table.name}.")
+                index.create(bind=engine, checkfirst=True)
+    if legacy_history_file:
+        migrate_legacy_history(legacy_history_file)
+
+
+def migrate_legacy_history(legacy_file: str) -> int:
+    """Copies rows of the old ``trading_history.db`` history table into the main database.
+
+    Rows are matched by id, so running it again only copies rows added since.
+    Returns the number of rows copied.
+    """
+    from database.models import History
+
+    if not os.path.exists(legacy_file) or os.path.abspath(legacy_file) == os.path.abspath(DATABASE_FILE):
+        return 0
+    legacy_engine = create_engine(f"sqlite:///{legacy_file}")
     try:
-        c = conn.cursor()
-        c.execute(sql_create_history_table)
-    except Error as e:
-        print(e)
+        if not inspect(legacy_engine).has_table(History.__tablename__):
+            return 0
+        with legacy_engine.connect() as legacy, Session(engine) as session:
+            known = set(session.scalars(select(History.id)))
+            rows = [dict(row._mapping) for row in legacy.execute(select(History.__table__))]
+            rows = [row for row in rows if row['id'] not in known]
+            if rows:
+                session.execute(insert(History), rows)
+                session.commit()
+                print(f"Migrated {len(rows)} rows from {legacy_file} into the history table.")
+            return len(rows)
+    finally:
+        legacy_engine.dispose()
+
 
-def save_history(conn: sqlite3.Connection, data: dict) -> None:
+def save_history(session: Session, data: dict) -> None:
     """Save trading history to database"""
-    sql = '''INSERT INTO history(timestamp, price, volume, signal_type, signal_strength)
-             VALUES(?,?,?,?,?)'''
-    try:
-        c = conn.cursor()
-        c.execute(sql, (data['timestamp'], data['price'], data['volume'], 
-                        data['signal_type'], data['signal_strength']))
-        conn.commit()
-    except Error as e:
-        print(e)
-
-def get_history(conn: sqlite3.Connection, limit: int = 100) -> list:
-    """Get trading history from database"""
-    sql = '''SELECT * FROM history ORDER BY timestamp DESC LIMIT ?'''
-    try:
-        c = conn.cursor()
-        c.execute(sql, (limit,))
-        return c.fetchall()
-    except Error as e:
-        print(e)
-        return []
+    from database.models import History
+
+    session.add(History(
+        timestamp=data['timestamp'], price=data['price'], volume=data['volume'],
+        signal_type=data['signal_type'], signal_strength=data['signal_strength'],
+    ))
+    session.commit()
+
+
+def get_history(session: Session, limit: int = 100) -> List:
+    """Get trading history from database, newest first"""
+    from database.models import History
+
+    return list(session.scalars(select(History).order_by(History.timestamp.desc()).limit(limit)))
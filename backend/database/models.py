@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .db import Base
 import datetime
 
 class Signal(Base):
     __tablename__ = "signals"
+    __table_args__ = (
+        Index("ix_signals_timestamp", "timestamp"),
+        Index("ix_signals_signal_type_timestamp", "signal_type", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     timestamp = Column(DateTime, default=datetime.datetime.utcnow)
@@ -27,6 +31,9 @@ class Signal(Base):
 
 class Trade(Base):
     __tablename__ = "trades"
+    __table_args__ = (
+        Index("ix_trades_signal_id_open_time", "signal_id", "open_time"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     signal_id = Column(Integer, ForeignKey("signals.id"))
@@ -44,6 +51,40 @@ class Trade(Base):
 
     signal = relationship("Signal", back_populates="trades")
 
+class ShadowSignal(Base):
+    """Hypothetical signal of a shadow strategy variant, one row per variant and cycle."""
+    __tablename__ = "shadow_signals"
+    __table_args__ = (
+        Index("ix_shadow_signals_variant_timestamp", "variant", "timestamp"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    variant = Column(String, nullable=False)
+    timestamp = Column(DateTime, default=datetime.datetime.utcnow)
+    candle_time = Column(DateTime) # Open time of the closed candle that was scored
+    price = Column(Float)
+    score = Column(Float)
+    trend_direction = Column(String)
+    signal_type = Column(String) # "BUY", "SELL" or "NEUTRAL"
+
+class ShadowTrade(Base):
+    """Paper trade of a shadow strategy variant, written when it closes."""
+    __tablename__ = "shadow_trades"
+    __table_args__ = (
+        Index("ix_shadow_trades_variant_close_time", "variant", "close_time"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    variant = Column(String, nullable=False)
+    direction = Column(String) # "long" or "short"
+    open_time = Column(DateTime)
+    close_time = Column(DateTime)
+    open_price = Column(Float)
+    close_price = Column(Float)
+    bars_held = Column(Integer)
+    exit_reason = Column(String) # "stop_loss" or "take_profit"
+    profit = Column(Float)
+
 class FundingPhase(Base):
     __tablename__ = "funding_phases"
 
@@ -65,3 +106,17 @@ class CapitalSnapshot(Base):
     funding_phase_id = Column(Integer, ForeignKey("funding_phases.id"))
 
     funding_phase = relationship("FundingPhase", back_populates="capital_snapshots")
+
+class History(Base):
+    """Rows of the legacy sqlite3 ``history`` table, now kept in the main database."""
+    __tablename__ = "history"
+    __table_args__ = (
+        Index("ix_history_timestamp", "timestamp"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    timestamp = Column(Float, nullable=False) # Unix seconds; TradingLogic writes fractional values
+    price = Column(Float, nullable=False)
+    volume = Column(Float, nullable=False)
+    signal_type = Column(String, nullable=False)
+    signal_strength = Column(Float, nullable=False)
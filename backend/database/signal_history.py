@@ -0,0 +1,124 @@
+import base64
+import datetime
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from database.models import Signal
+
+# Columns that can be requested through ``fields``; id and timestamp are always returned
+SIGNAL_FIELDS = [column.name for column in Signal.__table__.columns]
+DEFAULT_FIELDS = ["score", "details", "trend_direction", "signal_type"]
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(timestamp: datetime.datetime, signal_id: int) -> str:
+    raw = f"{timestamp.isoformat()}|{signal_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str):
+    try:
+        timestamp, signal_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.datetime.fromisoformat(timestamp), int(signal_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """Validates a comma-separated column list; ``all`` selects every Signal column."""
+    if not fields:
+        return DEFAULT_FIELDS
+    if fields == "all":
+        return SIGNAL_FIELDS
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SIGNAL_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown signal fields: {', '.join(unknown)}")
+    return names
+
+
+def fetch_signals(session: Session, limit: int = 50, cursor: Optional[str] = None, signal_type: Optional[str] = None,
+                  min_score: Optional[float] = None, max_score: Optional[float] = None,
+                  start: Optional[datetime.datetime] = None, end: Optional[datetime.datetime] = None,
+                  fields: Optional[List[str]] = None) -> dict:
+    """Returns one page of signals, newest first, and the cursor of the next page.
+
+    Pages are keyset-paginated on (timestamp, id): the next page continues strictly after
+    the last row of this one, so every page is an index range scan on signals(timestamp)
+    or signals(signal_type, timestamp) no matter how deep it is.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    fields = fields or DEFAULT_FIELDS
+    names = ["id", "timestamp"] + [name for name in fields if name not in ("id", "timestamp")]
+    query = select(*(getattr(Signal, name) for name in names))
+    if signal_type is not None:
+        query = query.where(Signal.signal_type == signal_type)
+    if min_score is not None:
+        query = query.where(Signal.score >= min_score)
+    if max_score is not None:
+        query = query.where(Signal.score <= max_score)
+    if start is not None:
+        query = query.where(Signal.timestamp >= start)
+    if end is not None:
+        query = query.where(Signal.timestamp <= end)
+    if cursor is not None:
+        after_timestamp, after_id = decode_cursor(cursor)
+        # The redundant "<=" bound lets the database seek straight to the cursor in the index
+        query = query.where(Signal.timestamp <= after_timestamp,
+                            or_(Signal.timestamp < after_timestamp, Signal.id < after_id))
+    query = query.order_by(Signal.timestamp.desc(), Signal.id.desc()).limit(limit + 1)
+
+    rows = session.execute(query).all()
+    items = [dict(zip(names, row)) for row in rows[:limit]]
+    for item in items:
+        if item["timestamp"] is not None:
+            item["timestamp"] = item["timestamp"].isoformat()
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last[1], last[0])
+    return {"items": items, "next_cursor": next_cursor}
+
+
+class SignalPageCache:
+    """Caches first pages (no cursor) per query; ``invalidate`` drops them when a signal is written.
+
+    Deeper pages are not cached: new signals only ever change the newest page.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._pages: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()  # Sync routes run on FastAPI's thread pool
+        self.generation = 0  # Bumped on every invalidation
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def get(self, key):
+        with self._lock:
+            page = self._pages.get(key)
+            if page is None:
+                self.stats["misses"] += 1
+                return None
+            self._pages.move_to_end(key)
+            self.stats["hits"] += 1
+            return page
+
+    def put(self, key, page: dict, generation: int):
+        """Stores ``page`` unless a signal was written since ``generation`` was read."""
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._pages[key] = page
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_entries:
+                self._pages.popitem(last=False)
+
+    def invalidate(self):
+        with self._lock:
+            self._pages.clear()
+            self.generation += 1
+            self.stats["invalidations"] += 1
@@ -0,0 +1,145 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+
+class DatabaseWriter:
+    """Write-behind queue for ORM rows.
+
+    The trading loop hands rows to ``put`` and moves on; a background task drains the
+    queue and inserts each batch in a single transaction on a dedicated writer thread,
+    so commits and fsyncs never run on the event loop. The queue is bounded: when the
+    database falls behind, ``put`` waits for space (counted in ``stats``) instead of
+    letting memory grow. ``close`` flushes everything still queued.
+    """
+
+    def __init__(self, session_factory, max_queue: int = 10000, batch_size: int = 500,
+                 flush_interval: float = 1.0, metrics=None):
+        self.session_factory = session_factory
+        self.metrics = metrics  # Optional CycleMetrics; records each flush as "db_flush"
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")  # SQLite has one writer
+        self.stats = {
+            "queued": 0, "written": 0, "batches": 0, "failed": 0, "dropped": 0,
+            "blocked_puts": 0, "blocked_seconds": 0.0, "max_depth": 0, "last_flush_seconds": 0.0,
+        }
+        self._listeners: List[Callable[[List], None]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = False
+
+    def add_listener(self, callback: Callable[[List], None]):
+        """Calls ``callback(rows)`` on the event loop after each committed batch."""
+        self._listeners.append(callback)
+
+    @property
+    def depth(self) -> int:
+        return self.queue.qsize()
+
+    async def put(self, row):
+        """Queues a row for insertion, waiting for space if the queue is full."""
+        if self.queue.full():
+            self.stats["blocked_puts"] += 1
+            started = time.monotonic()
+            await self.queue.put(row)
+            self.stats["blocked_seconds"] += time.monotonic() - started
+        else:
+            self.queue.put_nowait(row)
+        self.stats["queued"] += 1
+        self.stats["max_depth"] = max(self.stats["max_depth"], self.queue.qsize())
+
+    def put_nowait(self, row) -> bool:
+        """Queues a row without waiting; returns False (and counts a drop) if the queue is full."""
+        try:
+            self.queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            return False
+        self.stats["queued"] += 1
+        self.stats["max_depth"] = max(self.stats["max_depth"], self.queue.qsize())
+        return True
+
+    def _drain(self, batch: List) -> List:
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    def _commit(self, rows: List):
+        session = self.session_factory()
+        try:
+            session.add_all(rows)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _write(self, batch: List) -> int:
+        """Inserts ``batch`` in one transaction and returns the number of rows that failed.
+
+        If the transaction fails, the rows are retried one by one so a single bad row does
+        not take the rest of the batch with it.
+        """
+        try:
+            self._commit(batch)
+            return 0
+        except Exception as e:
+            print(f"Error writing a batch of {len(batch)} rows to the database: {e}. Retrying row by row.")
+        failed = 0
+        for row in batch:
+            try:
+                self._commit([row])
+            except Exception as e:
+                failed += 1
+                print(f"Error writing {type(row).__name__} to the database: {e}")
+        return failed
+
+    async def flush(self, batch: List):
+        if not batch:
+            return
+        started = time.monotonic()
+        try:
+            failed = await asyncio.get_running_loop().run_in_executor(self.executor, self._write, batch)
+            self.stats["written"] += len(batch) - failed
+            self.stats["failed"] += failed
+            self.stats["batches"] += 1
+            if failed < len(batch):
+                for callback in self._listeners:
+                    try:
+                        callback(batch)
+                    except Exception as e:
+                        print(f"Error in database writer listener: {e}")
+        finally:
+            self.stats["last_flush_seconds"] = time.monotonic() - started
+            if self.metrics is not None:
+                self.metrics.observe("db_flush", self.stats["last_flush_seconds"])
+            for _ in batch:
+                self.queue.task_done()
+
+    async def run(self):
+        self._task = asyncio.current_task()
+        # After close() the loop keeps going until the queue is empty
+        while not (self._stopped and self.queue.empty()):
+            try:
+                first = await asyncio.wait_for(self.queue.get(), self.flush_interval)
+            except asyncio.TimeoutError:
+                continue
+            # Let rows queued in the same cycle join this transaction
+            await asyncio.sleep(0)
+            await self.flush(self._drain([first]))
+
+    async def close(self):
+        """Stops the background task after it has written every row that is still queued."""
+        self._stopped = True
+        if self._task is not None and not self._task.done():
+            await self._task
+        else:
+            while not self.queue.empty():
+                await self.flush(self._drain([]))
+        self.executor.shutdown(wait=True)
@@ -2,10 +2,13 @@ import gate_api
 import os
 from dotenv import load_dotenv
 
+from gateio_client.trade_session import TradeSession
+
 load_dotenv()
 
 class GateioClient:
-    def __init__(self):
+    def __init__(self, settle: str = "usdt", pool_size: int = 8):
+        self.settle = settle
         self.read_key = os.getenv("GATE_IO_READ_ONLY_KEY")
         self.read_secret = os.getenv("GATE_IO_READ_ONLY_SECRET")
         self.trade_key = os.getenv("GATE_IO_TRADE_KEY")
@@ -16,28 +19,45 @@ class GateioClient:
             key=self.read_key,
             secret=self.read_secret
         )
-        self.api_client = gate_api.ApiClient(self.configuration)
+        # One keep-alive connection per worker thread so concurrent calls never re-handshake
+        self.read_config.connection_pool_maxsize = pool_size
+        self.api_client = gate_api.ApiClient(self.read_config)
         self.spot_api = gate_api.SpotApi(self.api_client)
         self.futures_api = gate_api.FuturesApi(self.api_client) # Assuming perpetual futures
 
+        # Trade session is built once and reused by every order action
+        self.trade_session = TradeSession(self.trade_key, self.trade_secret, settle, pool_size)
+
     def get_klines(self, currency_pair: str, interval: str = "1m", limit: int = 100):
-        """Fetches k-line data for a given currency pair and interval."""
+        """Fetches the most recent k-lines as [timestamp, open, high, low, close, volume] rows."""
         # Use the correct futures API method
         try:
-            klines = self.futures_api.list_futures_candlesticks(contract=currency_pair, interval=interval, limit=limit)
-            return klines # Return the result directly
+            klines = self.futures_api.list_futures_candlesticks(self.settle, currency_pair, interval=interval, limit=limit)
+            return [self._kline_row(kline) for kline in klines]
         except Exception as e:
             raise Exception(f"Error fetching klines: {e}") # Raise an exception
 
+    def get_klines_range(self, currency_pair: str, interval: str, start: int, end: int):
+        """Fetches k-lines with timestamps between start and end (unix seconds, inclusive)."""
+        try:
+            klines = self.futures_api.list_futures_candlesticks(
+                self.settle, currency_pair, interval=interval, _from=int(start), to=int(end))
+            return [self._kline_row(kline) for kline in klines]
+        except Exception as e:
+            raise Exception(f"Error fetching klines: {e}")
+
+    @staticmethod
+    def _kline_row(kline):
+        return [int(kline.t), float(kline.o), float(kline.h), float(kline.l), float(kline.c), float(kline.v)]
+
 
     def get_account_balance(self, currency: str = "USDT"):
         """Fetches the account balance for a given currency."""
         # Use the correct futures API method
         try:
-            accounts = self.futures_api.list_futures_accounts()
-            for account in accounts:
-                if account.currency == currency:
-                    return float(account.available)  # Assuming 'available' is the relevant balance
+            account = self.futures_api.list_futures_accounts(self.settle)
+            if account.currency == currency:
+                return float(account.available)  # Assuming 'available' is the relevant balance
             raise Exception(f"Currency {currency} not found in futures accounts")
         except Exception as e:
             print(f"Error fetching account balance: {e}")
@@ -46,62 +66,50 @@ class GateioClient:
     def get_open_positions(self, currency_pair: str):
         """Fetches open positions for a given currency pair, passing the contract."""
         try:
-            positions = self.futures_api.list_futures_positions(contract=currency_pair)
+            positions = self.futures_api.list_positions(self.settle, holding=True)
         except Exception as e:
             print(f"Error fetching open positions: {e}")
             return None
-        return positions
+        return [position.to_dict() for position in positions if position.contract == currency_pair]
 
-    def amend_order(self, contract: str, order_id: str, new_stop_loss: float = None, new_take_profit: float = None):
-        """Amends an existing order to update stop loss and/or take profit."""
-        order_configuration = gate_api.Configuration(
-            key=self.api_key,
-            secret=self.secret_key
-        )
-        order_api_client = gate_api.ApiClient(order_configuration)
-        futures_api = gate_api.FuturesApi(order_api_client)
-
-        new_stop_loss = str(new_stop_loss) if new_stop_loss is not None else None
-        new_take_profit = str(new_take_profit) if new_take_profit is not None else None
-        update_params = {}
-        if new_stop_loss is not None:
-            update_params["text"] = f"stop_loss:{new_stop_loss}"
-        if new_take_profit is not None:
-            update_params["text"] = f"take_profit:{new_take_profit}"
-
-        if len(update_params) == 0:
+    def get_contract_multiplier(self, contract: str) -> float:
+        """Base currency per contract (``quanto_multiplier``, e.g. 0.01 ETH for ETH_USDT)."""
+        try:
+            return float(self.futures_api.get_futures_contract(self.settle, contract).quanto_multiplier)
+        except Exception as e:
+            raise Exception(f"Error fetching contract {contract}: {e}")
+
+    def get_trigger_orders(self, contract: str):
+        """Open price-triggered orders (the stop loss / take profit orders) of a contract, as dicts."""
+        try:
+            orders = self.trade_session.list_trigger_orders(contract)
+        except Exception as e:
+            print(f"Error fetching trigger orders: {e}")
             return None
-        
+        return [order.to_dict() for order in orders]
+
+    def amend_trigger_order(self, contract: str, order: dict, trigger_price: float):
+        """Moves a stop loss / take profit order (a dict from get_trigger_orders) to a new trigger price."""
         try:
-            # Use the correct method: amend_futures_order
-            amended_order = futures_api.amend_futures_order(order_id=order_id, contract=contract, **update_params)
-            print(f"Order amended: {amended_order}")
+            amended_order = self.trade_session.replace_trigger_order(order, trigger_price)
+            print(f"Trigger order amended: {amended_order['id']} -> {trigger_price}")
             return amended_order
         except Exception as e:
-            print(f"Error amending order: {e}")
+            print(f"Error amending trigger order {order.get('id')}: {e}")
             return None
-        
+
     def place_order(self, currency_pair: str, side: str, amount: float, price: float = None):
         """Places a futures order."""
-        order_configuration = gate_api.Configuration(
-            key=self.order_api_key,
-            secret=self.order_secret_key
-        )
-        order_api_client = gate_api.ApiClient(order_configuration)
-        futures_api = gate_api.FuturesApi(order_api_client)
-        
+        size = int(amount) if side == "buy" else -int(amount) # Futures size is signed: positive long, negative short
         order = gate_api.FuturesOrder(
             contract=currency_pair,
-            side=side,
-            size=amount,
-            price=price if price is not None else None,
+            size=size,
+            price=str(price) if price is not None else "0", # Price 0 with ioc is a market order
             tif="ioc"
         )
 
         try:
-            # Assuming Gate.io spot API has a create_order method
-            # Need to confirm the exact method and parameters from SDK docs
-            created_order = futures_api.create_futures_order(order) # Placeholder method
+            created_order = self.trade_session.place_order(order)
             print(f"Order placed: {created_order}")
             return created_order
         except Exception as e:
@@ -110,16 +118,29 @@ class GateioClient:
 
     def cancel_order(self, currency_pair: str, order_id: str):
         """Cancels a futures order."""
-        order_configuration = gate_api.Configuration(
-            key=self.order_api_key,
-            secret=self.order_secret_key
-        )
-        order_api_client = gate_api.ApiClient(order_configuration)
-        futures_api = gate_api.FuturesApi(order_api_client)
         try:
-            canceled_order = futures_api.cancel_futures_order(order_id=order_id, contract=currency_pair)
+            canceled_order = self.trade_session.cancel_order(order_id)
             print(f"Order canceled: {canceled_order}")
             return canceled_order
         except Exception as e:
             print(f"Error canceling order: {e}")
             return None
+
+    def cancel_orders(self, currency_pair: str, order_ids: list):
+        """Cancels several futures orders at once."""
+        try:
+            canceled_orders = self.trade_session.cancel_orders(order_ids)
+            print(f"Orders canceled: {len(canceled_orders)}")
+            return canceled_orders
+        except Exception as e:
+            print(f"Error canceling orders: {e}")
+            return None
+
+    def warm_up_trade_session(self):
+        """Opens the trade connections ahead of the first order action."""
+        self.trade_session.warm_up()
+
+    def close(self):
+        """Releases the pooled read and trade connections."""
+        self.api_client.close()
+        self.trade_session.close()
@@ -0,0 +1,61 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from gateio_client.api_client import GateioClient
+
+
+class AsyncGateioClient:
+    """Asyncio front-end for GateioClient.
+
+    ``gate_api`` only offers blocking calls, so every request is offloaded to a dedicated
+    thread pool sized to match the client's keep-alive connection pool. The event loop
+    stays free to serve FastAPI requests and independent calls can be awaited together.
+    """
+
+    def __init__(self, client: GateioClient = None, max_workers: int = 8):
+        self.client = client if client is not None else GateioClient(pool_size=max_workers)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gateio")
+
+    async def run(self, func, *args, **kwargs):
+        """Runs any blocking callable (e.g. ``CandleStore.sync``) on the client's thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def get_klines(self, currency_pair: str, interval: str = "1m", limit: int = 100):
+        return await self.run(self.client.get_klines, currency_pair, interval, limit)
+
+    async def get_klines_range(self, currency_pair: str, interval: str, start: int, end: int):
+        return await self.run(self.client.get_klines_range, currency_pair, interval, start, end)
+
+    async def get_account_balance(self, currency: str = "USDT"):
+        return await self.run(self.client.get_account_balance, currency)
+
+    async def get_open_positions(self, currency_pair: str):
+        return await self.run(self.client.get_open_positions, currency_pair)
+
+    async def get_contract_multiplier(self, contract: str):
+        return await self.run(self.client.get_contract_multiplier, contract)
+
+    async def get_trigger_orders(self, contract: str):
+        return await self.run(self.client.get_trigger_orders, contract)
+
+    async def amend_trigger_order(self, contract: str, order: dict, trigger_price: float):
+        return await self.run(self.client.amend_trigger_order, contract, order, trigger_price)
+
+    async def place_order(self, currency_pair: str, side: str, amount: float, price: float = None):
+        return await self.run(self.client.place_order, currency_pair, side, amount, price)
+
+    async def cancel_order(self, currency_pair: str, order_id: str):
+        return await self.run(self.client.cancel_order, currency_pair, order_id)
+
+    async def cancel_orders(self, currency_pair: str, order_ids: list):
+        return await self.run(self.client.cancel_orders, currency_pair, order_ids)
+
+    async def warm_up_trade_session(self):
+        return await self.run(self.client.warm_up_trade_session)
+
+    def close(self):
+        """Stops the worker threads and releases the pooled connections."""
+        self.executor.shutdown(wait=False)
+        self.client.close()
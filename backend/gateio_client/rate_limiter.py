@@ -0,0 +1,54 @@
+import asyncio
+import threading
+import time
+
+
+class AsyncRateLimiter:
+    """Token bucket limiting how many exchange requests may be issued per second.
+
+    ``acquire`` waits for a token; ``try_acquire`` returns immediately, which suits callers
+    that would rather skip a stale request and retry with fresh data later.
+    ``acquire_blocking`` waits on a worker thread, for requests issued inside blocking
+    code such as ``CandleStore.sync``; a limiter should be used from one side only.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock()
+        self.throttled = 0
+        self._lock = asyncio.Lock()
+        self._thread_lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self) -> bool:
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        self.throttled += 1
+        return False
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                self.throttled += 1
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+    def acquire_blocking(self):
+        with self._thread_lock:
+            self._refill()
+            if self.tokens < 1:
+                self.throttled += 1
+                time.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
@@ -0,0 +1,241 @@
+"""Records GateioClient responses and replays them without network access.
+
+Set ``GATEIO_RECORD_PATH`` to log every response of a live run, then start the backend
+with ``GATEIO_REPLAY_PATH`` pointing at that log. The trading loop runs unchanged on the
+recorded responses, with a ``ReplayClock`` standing in for wall time and for the sleep
+between cycles, as fast as possible (``GATEIO_REPLAY_SPEED=0``) or N times real time.
+
+The log is append-only JSON lines, one call per line, gzip-compressed when the path
+ends in ``.gz``:
+
+    {"t": 1718000000.123, "m": "get_klines_range", "a": ["ETH_USDT", "1m", 1717999920, 1718000000], "r": [[...]]}
+
+``e`` replaces ``r`` when the call raised.
+"""
+import asyncio
+import gzip
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Dict, List, Optional
+
+# Recorded methods whose leading arguments pick the data series: (contract, interval)
+SERIES_METHODS = ("get_klines", "get_klines_range")
+RECORDED_METHODS = (
+    "get_klines", "get_klines_range", "get_account_balance", "get_open_positions", "get_contract_multiplier",
+    "get_trigger_orders", "amend_trigger_order", "place_order", "cancel_order", "cancel_orders",
+)
+
+
+class ReplayExhausted(Exception):
+    """The log has no more responses for a call."""
+
+
+def _encode(value):
+    """JSON-friendly copy of a response: gate_api models become dicts, tuples lists."""
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _encode(item) for key, item in value.items()}
+    return value
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+
+def _open(path: str, mode: str):
+    return gzip.open(path, mode + "t") if path.endswith(".gz") else open(path, mode)
+
+
+def load_calls(path: str) -> List[dict]:
+    """Reads the calls written by RecordingClient, oldest first."""
+    calls = []
+    with _open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                calls.append(json.loads(line))
+    return calls
+
+
+class RecordingClient:
+    """Wraps a GateioClient and appends every response it returns to ``path``.
+
+    Anything that is not a recorded call (``close``, ``warm_up_trade_session``, the
+    gate_api objects) is passed through to the wrapped client.
+    """
+
+    def __init__(self, client, path: str, clock=time.time):
+        self.client = client
+        self.path = path
+        self.clock = clock
+        self.stats = {"recorded": 0}
+        self._file = _open(path, "a")
+        self._lock = threading.Lock()  # Calls come from the async client's worker threads
+
+    def __getattr__(self, name):
+        attribute = getattr(self.client, name)
+        if name not in RECORDED_METHODS:
+            return attribute
+
+        def recorded(*args):
+            entry = {"t": round(self.clock(), 3), "m": name, "a": _encode(args)}
+            try:
+                result = attribute(*args)
+                entry["r"] = _encode(result)
+                return result
+            except Exception as e:
+                entry["e"] = str(e)
+                raise
+            finally:
+                self._write(entry)
+
+        return recorded
+
+    def _write(self, entry: dict):
+        with self._lock:
+            self._file.write(_dumps(entry) + "\n")
+            self._file.flush()
+            self.stats["recorded"] += 1
+
+    def close(self):
+        self.client.close()
+        with self._lock:
+            self._file.close()
+
+
+class ReplayClock:
+    """Virtual wall time for a replay.
+
+    ``time`` stands in for ``time.time`` (CandleStore, WarmupPlanner, TickerCache) and
+    ``sleep`` for the wait between cycles: it advances the clock at once and, with a
+    ``speed`` above 0, also sleeps the scaled-down real time.
+    """
+
+    def __init__(self, start: float = 0.0, speed: float = 0.0):
+        self.now = start
+        self.speed = speed  # 0 replays as fast as possible
+        self._lock = threading.Lock()
+
+    def time(self) -> float:
+        return self.now
+
+    def advance_to(self, timestamp: float):
+        """Moves the clock forward to ``timestamp``; it never goes back."""
+        with self._lock:
+            self.now = max(self.now, timestamp)
+
+    async def sleep(self, seconds: float):
+        with self._lock:
+            self.now += seconds
+        await asyncio.sleep(seconds / self.speed if self.speed > 0 else 0)
+
+
+class ReplayClient:
+    """Serves the responses of a recorded run in place of GateioClient.
+
+    Each call gets the oldest unused response recorded for the same method and arguments.
+    When the arguments differ, it falls back to the oldest unused response for the same
+    series only (contract and interval for candles, contract otherwise), and reports the
+    fallback as a replay error: the run has diverged from the recording and is no longer
+    reproducible. Serving a response moves the clock to the time it was recorded, and
+    ``prepare_sync`` moves it to the exact "now" each candle sync used live, so the candle
+    store sees the same "now" it saw live. ``finished`` is set once a call finds no
+    response left.
+    """
+
+    def __init__(self, path: str, clock: Optional[ReplayClock] = None):
+        calls = load_calls(path)
+        self.clock = clock if clock is not None else ReplayClock()
+        if calls:
+            self.clock.advance_to(calls[0]["t"])
+        self._by_series: Dict[tuple, deque] = defaultdict(deque)  # Per method and series, in recorded order
+        self._by_args: Dict[tuple, deque] = defaultdict(deque)  # Per method and arguments
+        for call in calls:
+            call["used"] = False
+            self._by_series[self._series(call["m"], call["a"])].append(call)
+            self._by_args[(call["m"], _dumps(call["a"]))].append(call)
+        self.finished = False
+        self.errors: List[str] = []  # Calls served from a recording with other arguments
+        self.stats = {"recorded": len(calls), "served": 0, "errors": 0, "missed": 0}
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if name not in RECORDED_METHODS:
+            raise AttributeError(name)
+        return lambda *args: self._serve(name, args)
+
+    @staticmethod
+    def _series(method: str, args) -> tuple:
+        return (method, _dumps(list(args[:2] if method in SERIES_METHODS else args[:1])))
+
+    def _serve(self, method: str, args: tuple):
+        encoded = _encode(args)
+        with self._lock:
+            call = self._take(method, encoded)
+        if call is None:
+            raise ReplayExhausted(f"No recorded response left for {method}{args}")
+        self.clock.advance_to(call["t"])
+        if "e" in call:
+            raise Exception(call["e"])
+        return call.get("r")
+
+    def _take(self, method: str, args: list) -> Optional[dict]:
+        call = self._pop_unused(self._by_args.get((method, _dumps(args))))
+        if call is None:
+            call = self._pop_unused(self._by_series.get(self._series(method, args)))
+            if call is None:
+                self.finished = True
+                self.stats["missed"] += 1
+                return None
+            error = f"{method}{tuple(args)} served the response recorded for {method}{tuple(call['a'])}"
+            print(f"Replay error: {error}")
+            self.errors.append(error)
+            self.stats["errors"] += 1
+        call["used"] = True
+        self.stats["served"] += 1
+        return call
+
+    def _pop_unused(self, calls: Optional[deque]) -> Optional[dict]:
+        return calls.popleft() if self._peek(calls) is not None else None
+
+    def prepare_sync(self, contract: str, interval: str, step: int):
+        """Moves the clock to the "now" the live CandleStore.sync of this series used.
+
+        Called by CandleStore.sync before it reads the clock. The ``end`` of the last of
+        the sync's paginated range requests was that "now"; a first sync (get_klines) read
+        the clock just before the recorded call time.
+        """
+        with self._lock:
+            pending = [call for call in (self._peek(self._by_series.get(self._series(method, [contract, interval])))
+                                         for method in SERIES_METHODS) if call is not None]
+            if not pending:
+                return
+            call = min(pending, key=lambda c: c["t"])
+            if call["m"] != "get_klines_range":
+                now = call["t"]
+            else:
+                now = call["a"][3]
+                for later in self._by_series[self._series(call["m"], call["a"])]:
+                    if later["used"] or later is call:
+                        continue
+                    if later["a"][2] != now + step:
+                        break
+                    now = later["a"][3]
+        self.clock.advance_to(now)
+
+    @staticmethod
+    def _peek(calls: Optional[deque]) -> Optional[dict]:
+        while calls and calls[0]["used"]:
+            calls.popleft()
+        return calls[0] if calls else None
+
+    def warm_up_trade_session(self):
+        pass
+
+    def close(self):
+        pass
@@ -0,0 +1,79 @@
+import threading
+from typing import Iterable, List, Optional
+
+import gate_api
+
+MAX_BATCH_CANCEL = 20  # Gate.io limit for cancel_batch_future_orders
+# Fields copied when a price-triggered order is re-created at a new trigger price
+TRIGGER_INITIAL_FIELDS = ("contract", "size", "price", "close", "tif", "reduce_only", "auto_size")
+TRIGGER_FIELDS = ("strategy_type", "price_type", "price", "rule", "expiration")
+
+
+class TradeSession:
+    """Long-lived authenticated futures session for order actions.
+
+    The configuration (and with it the request signer) and the urllib3 connection pool
+    are created once and reused, so moving a stop does not pay for a new client and a
+    cold TLS handshake. ``warm_up`` opens the connections ahead of the first order.
+    """
+
+    def __init__(self, key: Optional[str], secret: Optional[str], settle: str = "usdt", pool_size: int = 4):
+        self.settle = settle
+        self.configuration = gate_api.Configuration(key=key, secret=secret)
+        self.configuration.connection_pool_maxsize = pool_size
+        self.api_client = gate_api.ApiClient(self.configuration)
+        self.futures_api = gate_api.FuturesApi(self.api_client)
+        self._lock = threading.Lock()
+        self.warm = False
+
+    def warm_up(self):
+        """Makes one cheap authenticated call so the first real order reuses an open connection."""
+        with self._lock:
+            if self.warm:
+                return
+            try:
+                self.futures_api.list_futures_accounts(self.settle)
+                self.warm = True
+            except Exception as e:
+                print(f"Error warming up trade session: {e}")
+
+    def list_trigger_orders(self, contract: str) -> List:
+        """Open price-triggered orders of ``contract``; a position's stop loss and take profit are these."""
+        return self.futures_api.list_price_triggered_orders(self.settle, "open", contract=contract)
+
+    def replace_trigger_order(self, order: dict, trigger_price: float) -> dict:
+        """Moves a price-triggered order to ``trigger_price`` and returns the order now in force.
+
+        The exchange has no amendment for trigger orders, so a copy at the new price is
+        created first and the old one cancelled after, leaving the position covered by at
+        least one of them throughout.
+        """
+        initial = {field: order['initial'].get(field) for field in TRIGGER_INITIAL_FIELDS
+                   if order['initial'].get(field) is not None}
+        trigger = {**order['trigger'], 'price': str(trigger_price)}
+        replacement = gate_api.FuturesPriceTriggeredOrder(
+            initial=gate_api.FuturesInitialOrder(**initial),
+            trigger=gate_api.FuturesPriceTrigger(**{field: trigger.get(field) for field in TRIGGER_FIELDS
+                                                    if trigger.get(field) is not None}),
+            order_type=order.get('order_type'),
+        )
+        created = self.futures_api.create_price_triggered_order(self.settle, replacement)
+        self.futures_api.cancel_price_triggered_order(self.settle, str(order['id']))
+        return {**order, 'id': created.id, 'trigger': trigger}
+
+    def place_order(self, order: gate_api.FuturesOrder):
+        return self.futures_api.create_futures_order(self.settle, order)
+
+    def cancel_order(self, order_id: str):
+        return self.futures_api.cancel_futures_order(self.settle, str(order_id))
+
+    def cancel_orders(self, order_ids: Iterable[str]) -> List:
+        """Cancels many orders using batched requests."""
+        order_ids = [str(order_id) for order_id in order_ids]
+        results = []
+        for i in range(0, len(order_ids), MAX_BATCH_CANCEL):
+            results.extend(self.futures_api.cancel_batch_future_orders(self.settle, order_ids[i:i + MAX_BATCH_CANCEL]))
+        return results
+
+    def close(self):
+        self.api_client.close()
@@ -1,268 +1,647 @@
-from fastapi import FastAPI, Depends, BackgroundTasks
+from fastapi import FastAPI, Depends, BackgroundTasks, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from sqlalchemy.orm import Session
 import time
 import asyncio
+import datetime
+import os
 import pandas as pd
 
 from database import models, db
+from database.writer import DatabaseWriter
+from database.signal_history import SignalPageCache, fetch_signals, parse_fields
 from signal_engine.vegas_tunnel import VegasTunnel
 from signal_engine.macd_rsi_logic import MacdRsiLogic
 from signal_engine.fib_support import FibSupport
 from signal_engine.atr_trailing import AtrTrailing
 from signal_engine.candle_patterns import CandlePatterns
-from signal_engine.scoring_system import ScoringSystem
+from signal_engine.scoring_rules import RuleScoringSystem
+from signal_engine.streaming import StreamingIndicatorEngine
+from signal_engine.pipeline import SignalPipeline
 from trading_assistant.trailing_manager import TrailingManager
-from trading_assistant.telegram_notifier import TelegramNotifier
+from trading_assistant.telegram_notifier import NullNotifier, TelegramNotifier
+from trading_assistant.position_monitor import PositionMonitor
+from trading_assistant.scanner import MarketScanner
+from trading_assistant.event_hub import EventHub
+from trading_assistant.metrics import CycleMetrics
+from trading_assistant.shadow import ShadowStrategies, load_variants
 from gateio_client.api_client import GateioClient
+from gateio_client.async_client import AsyncGateioClient
+from gateio_client.recording import RecordingClient, ReplayClient, ReplayClock
+from market_data.candle_archive import CandleArchive
+from market_data.candle_store import CANDLE_COLUMNS, INTERVAL_SECONDS, CandleStore, interval_seconds
+from market_data.resampler import CandleResampler, MultiTimeframeFeed
+from market_data.ticker_cache import TickerCache, etag_matches
+from market_data.warmup import WarmupPlanner
+from market_data.ws_stream import GateFuturesStream
 from config.settings import settings
 from config.constants import *
 
 app = FastAPI()
 
-# Initialize database
-models.Base.metadata.create_all(bind=db.engine)
+# Per-stage latency of the trading cycle and the tasks around it, served on /metrics
+cycle_metrics = CycleMetrics(METRICS_WINDOW, profile_dir=PROFILE_DIR)
+
+# A replay serves a recorded run's exchange responses on a virtual clock, without network access.
+# It runs on its own scratch database, candle archive and snapshots (settings.GATEIO_REPLAY_DIR).
+replay_mode = bool(settings.GATEIO_REPLAY_PATH)
+candle_archive_dir = os.path.join(settings.GATEIO_REPLAY_DIR, "candles") if replay_mode else CANDLE_ARCHIVE_DIR
+warmup_snapshot_dir = os.path.join(settings.GATEIO_REPLAY_DIR, "warmup") if replay_mode else WARMUP_SNAPSHOT_DIR
+
+# Initialize database: tables, indexes and the legacy history import
+db.init_db(None if replay_mode else LEGACY_HISTORY_DATABASE_FILE)
+# Signals, trades and capital snapshots are inserted in batches off the event loop
+db_writer = DatabaseWriter(db.SessionLocal, DB_WRITE_QUEUE_SIZE, DB_WRITE_BATCH_SIZE, DB_FLUSH_INTERVAL_SECONDS,
+                           metrics=cycle_metrics)
+# Newest /signals pages, dropped whenever a batch with a new signal is committed
+signal_page_cache = SignalPageCache()
+
+
+def invalidate_signal_pages(rows):
+    if any(isinstance(row, models.Signal) for row in rows):
+        signal_page_cache.invalidate()
+
+
+db_writer.add_listener(invalidate_signal_pages)
 
 # Initialize components
-gateio_client = GateioClient()
+replay_clock = None
+if replay_mode:
+    replay_clock = ReplayClock(speed=settings.GATEIO_REPLAY_SPEED)
+    gateio_client = ReplayClient(settings.GATEIO_REPLAY_PATH, replay_clock)
+else:
+    gateio_client = GateioClient(pool_size=GATEIO_POOL_SIZE)
+    if settings.GATEIO_RECORD_PATH:
+        gateio_client = RecordingClient(gateio_client, settings.GATEIO_RECORD_PATH)
+clock = replay_clock.time if replay_clock is not None else time.time
+async_client = AsyncGateioClient(gateio_client, max_workers=GATEIO_POOL_SIZE)
+candle_store = CandleStore(gateio_client, CANDLE_STORE_CAPACITY, clock=clock)
+candle_archive = CandleArchive(candle_archive_dir)
+# Latest price per contract for /price and /ticker, fed by ticks and candle syncs
+ticker_cache = TickerCache(TICKER_STALE_SECONDS, clock=clock)
 vegas_tunnel = VegasTunnel(VEGAS_EMA_SHORT, VEGAS_EMA_MEDIUM, VEGAS_EMA_LONG)
 macd_rsi_logic = MacdRsiLogic()
 fib_support = FibSupport()
 atr_trailing = AtrTrailing() # ATR_PERIOD is for calculation, not trailing levels
-candle_patterns = CandlePatterns()
-scoring_system = ScoringSystem()
+candle_patterns = CandlePatterns(scored=SCORED_CANDLE_PATTERNS)
+# Weights, conflicts and caps come from a rule file that is reloaded when it changes
+scoring_system = RuleScoringSystem(settings.SCORING_RULES_PATH)
+signal_pipeline = SignalPipeline(vegas_tunnel, macd_rsi_logic, fib_support, candle_patterns, scoring_system, SIGNAL_SCORE_STRONG,
+                                 metrics=cycle_metrics)
+indicator_engine = StreamingIndicatorEngine(
+    vegas_tunnel.ema_spans(),
+    MACD_FAST_PERIOD, MACD_SLOW_PERIOD, MACD_SIGNAL_PERIOD,
+    RSI_PERIOD, ATR_PERIOD,
+    history=KLINE_LIMIT,
+)
+# Higher timeframes are resampled from the same candles, each with its own indicator state
+timeframe_engines = {
+    interval: StreamingIndicatorEngine(
+        vegas_tunnel.ema_spans(),
+        MACD_FAST_PERIOD, MACD_SLOW_PERIOD, MACD_SIGNAL_PERIOD,
+        RSI_PERIOD, ATR_PERIOD,
+        history=KLINE_LIMIT,
+    )
+    for interval in HIGHER_TIMEFRAMES
+}
+timeframe_feed = MultiTimeframeFeed(
+    CandleResampler(KLINE_INTERVAL, HIGHER_TIMEFRAMES), timeframe_engines,
+    on_closed=lambda interval, row: candle_store.add_closed(TRADING_PAIR, interval, row),
+)
+warmup_planner = WarmupPlanner(candle_store, warmup_snapshot_dir, WARMUP_TOLERANCE, clock=clock, archive=candle_archive)
 trailing_manager = TrailingManager(INITIAL_STOP_LOSS_USD, INITIAL_TAKE_PROFIT_USD, TRAILING_TRIGGER_USD)
 # Handle potential None values for Telegram credentials
 telegram_bot_token = settings.TELEGRAM_BOT_TOKEN if settings.TELEGRAM_BOT_TOKEN else "" # TODO: Add proper error handling if None
 telegram_chat_id = settings.TELEGRAM_CHAT_ID if settings.TELEGRAM_CHAT_ID else ""  # TODO: Add proper error handling if None
-if not telegram_bot_token or not telegram_chat_id:  
-    raise ValueError("Telegram bot token or chat ID not set. Please configure TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID in your settings.")
+if replay_mode:
+    telegram_notifier = NullNotifier(max_queue=TELEGRAM_QUEUE_SIZE, metrics=cycle_metrics)
+else:
+    if not telegram_bot_token or not telegram_chat_id:
+        raise ValueError("Telegram bot token or chat ID not set. Please configure TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID in your settings.")
+    telegram_notifier = TelegramNotifier(
+        telegram_bot_token, telegram_chat_id, settings.TELEGRAM_API_BASE_URL,
+        max_queue=TELEGRAM_QUEUE_SIZE, rate=TELEGRAM_RATE_PER_SECOND, burst=TELEGRAM_BURST,
+        coalesce_window=TELEGRAM_COALESCE_SECONDS, max_retries=TELEGRAM_MAX_RETRIES, metrics=cycle_metrics,
+    )
+
+# Live events for dashboard clients connected to /ws or /events
+event_hub = EventHub(EVENT_BUFFER_SIZE)
+
+
+def publish_adjustment(contract, position_id, stop_loss, take_profit):
+    event_hub.publish("adjustment", {"contract": contract, "position_id": position_id,
+                                     "stop_loss": stop_loss, "take_profit": take_profit})
+    telegram_notifier.send_adjustment_notification(contract, position_id, stop_loss, take_profit)
+
+
+def publish_tick(contract, price, timestamp=None):
+    ticker_cache.update(contract, price, timestamp)
+    position_monitor.on_price(contract, price, timestamp)
+    # The level index is sorted, so looking up the closest Fib level per tick is a bisect
+    nearest = fib_support.levels.nearest(price) if contract == TRADING_PAIR else None
+    fib_level = {"price": nearest[0], "name": nearest[1]} if nearest else None
+    event_hub.publish("price", {"contract": contract, "price": price, "timestamp": timestamp, "fib_level": fib_level})
+
+
+position_monitor = PositionMonitor(
+    async_client, trailing_manager, TRADING_PAIR,
+    INITIAL_STOP_LOSS_USD, INITIAL_TAKE_PROFIT_USD,
+    tick_size=PRICE_TICK_SIZE,
+    amend_rate=AMEND_RATE_PER_SECOND, amend_burst=AMEND_BURST,
+    refresh_interval=POSITION_REFRESH_INTERVAL_SECONDS,
+    on_amended=publish_adjustment,
+    metrics=cycle_metrics,
+    tp_hysteresis_atr=TP_TRAIL_HYSTERESIS_ATR,
+)
+
+# Shadow strategies: scoring/trailing variants paper-traded on the live cycle's indicators
+shadow_strategies = None
+if settings.SHADOW_STRATEGIES_PATH:
+    shadow_strategies = ShadowStrategies(
+        load_variants(settings.SHADOW_STRATEGIES_PATH, INITIAL_STOP_LOSS_USD, INITIAL_TAKE_PROFIT_USD,
+                      TRAILING_TRIGGER_USD, SIGNAL_SCORE_STRONG),
+        signal_pipeline, db_writer, metrics=cycle_metrics,
+    )
+
+# Queue depths and counters kept by the background components, exported as gauges
+cycle_metrics.add_collector(lambda: {
+    "db_writer_depth": db_writer.depth,
+    "db_writer_written_total": db_writer.stats["written"],
+    "db_writer_failed_total": db_writer.stats["failed"],
+    "db_writer_blocked_seconds_total": db_writer.stats["blocked_seconds"],
+    "telegram_queue_depth": telegram_notifier.dispatcher.queue.qsize(),
+    "telegram_sent_total": telegram_notifier.dispatcher.stats["sent"],
+    "telegram_dropped_total": telegram_notifier.dispatcher.stats["dropped"],
+    "telegram_retries_total": telegram_notifier.dispatcher.stats["retries"],
+    "amendments_total": position_monitor.stats["amendments"],
+    "amendments_throttled_total": position_monitor.stats["throttled"],
+    "event_subscribers": len(event_hub.subscribers),
+    "events_dropped": event_hub.dropped,
+    "candle_requests_total": candle_store.stats["requests"],
+})
+
+# Streaming market data: each closed candle wakes the trading cycle instead of a fixed 60s sleep
+cycle_trigger = asyncio.Event()
+market_stream = None
+if settings.MARKET_DATA_MODE == "websocket" and not replay_mode:
+    market_stream = GateFuturesStream(
+        candle_store, TRADING_PAIR, KLINE_INTERVAL, settings.GATE_IO_WS_URL,
+        on_candle_closed=lambda contract, interval, row: cycle_trigger.set(),
+        on_tick=publish_tick,
+        resync=lambda contract, interval: async_client.run(candle_store.sync, contract, interval, KLINE_LIMIT),
+        record_path=settings.MARKET_DATA_RECORD_PATH,
+    )
+
+# Multi-pair scanner: scores SCANNER_CONTRACTS in a process pool and publishes them ranked
+market_scanner = None
+if settings.SCANNER_ENABLED and not replay_mode:
+    # Its own client and thread pool, so a burst of scan requests never queues a stop amendment
+    market_scanner = MarketScanner(
+        AsyncGateioClient(max_workers=SCANNER_POOL_SIZE), SCANNER_CONTRACTS,
+        params={
+            'ema_short': VEGAS_EMA_SHORT, 'ema_medium': VEGAS_EMA_MEDIUM, 'ema_long': VEGAS_EMA_LONG,
+            'macd_fast': MACD_FAST_PERIOD, 'macd_slow': MACD_SLOW_PERIOD, 'macd_signal': MACD_SIGNAL_PERIOD,
+            'rsi_length': RSI_PERIOD, 'atr_length': ATR_PERIOD,
+            'strong_score': SIGNAL_SCORE_STRONG, 'window': KLINE_LIMIT,
+            'scored_patterns': SCORED_CANDLE_PATTERNS,
+        },
+        interval=KLINE_INTERVAL, history=SCANNER_HISTORY, request_rate=SCANNER_REQUEST_RATE,
+        on_price=lambda contract, price, timestamp: ticker_cache.update(contract, price, timestamp, source="scanner"),
+        # Scored like the live pair: the same rule file and the large-timeframe trend
+        large_timeframe=LARGE_TIMEFRAME, large_history=SCANNER_LARGE_HISTORY, scoring_system=scoring_system,
+    )
+
+
+async def wait_for_next_cycle():
+    """Waits for the next closed candle when streaming, or the refresh interval when polling."""
+    if replay_clock is not None:
+        await replay_clock.sleep(SIGNAL_REFRESH_INTERVAL_SECONDS)
+        return
+    if market_stream is None:
+        await asyncio.sleep(SIGNAL_REFRESH_INTERVAL_SECONDS)
+        return
+    try:
+        # The timeout keeps the loop running on REST data while the stream is down
+        await asyncio.wait_for(cycle_trigger.wait(), SIGNAL_REFRESH_INTERVAL_SECONDS)
+    except asyncio.TimeoutError:
+        pass
+    cycle_trigger.clear()
+
+
+snapshot_saved = {}  # interval -> last candle timestamp in its saved warm-up snapshot
+
+
+async def save_snapshot(interval: str, engine, force: bool = False):
+    """Writes the warm-up snapshot of ``interval`` off the event loop, once every
+    WARMUP_SNAPSHOT_EVERY candles unless ``force``d."""
+    last_timestamp = engine.last_timestamp
+    saved = snapshot_saved.get(interval)
+    if last_timestamp is None or last_timestamp == saved:
+        return
+    if not force and saved is not None and \
+            last_timestamp - saved < WARMUP_SNAPSHOT_EVERY * interval_seconds(interval):
+        return
+    snapshot_saved[interval] = last_timestamp
+    # Copied on the loop, written on a worker thread
+    state, candles = warmup_planner.snapshot(TRADING_PAIR, interval, engine)
+    await async_client.run(warmup_planner.write_snapshot, TRADING_PAIR, interval, state, candles)
 
-telegram_notifier = TelegramNotifier(telegram_bot_token, telegram_chat_id)  
+
+async def sync_candles(contract: str, interval: str, backfill: int):
+    """Returns the up-to-date candle buffer, only hitting REST when no live stream covers it."""
+    if market_stream is not None and market_stream.connected and interval == market_stream.interval:
+        return candle_store.buffer(contract, interval)
+    return await async_client.run(candle_store.sync, contract, interval, backfill)
 
 
 async def run_trading_logic():
     """Scheduled task to run trading signal and management logic."""
-    while True:
-        print("Running trading logic...")
-        
-        # 1. Fetch k-line data
-        klines_data = gateio_client.get_klines(TRADING_PAIR, KLINE_INTERVAL, KLINE_LIMIT)
-        if not klines_data:
-            print("Failed to fetch k-line data. Skipping this cycle.")
-            await asyncio.sleep(SIGNAL_REFRESH_INTERVAL_SECONDS)
-            continue
-            
-        # 1.1 Fetch large time frame k-line data
-        klines_data_large_tf = gateio_client.get_klines(TRADING_PAIR, "4h", 100)
-        if not klines_data_large_tf:
-            print("Failed to fetch large time frame k-line data. Skipping this cycle.")
-            await asyncio.sleep(SIGNAL_REFRESH_INTERVAL_SECONDS)
-            continue
-        
-        df_large_tf = pd.DataFrame(klines_data_large_tf, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df_large_tf[['open', 'high', 'low', 'close', 'volume']] = df_large_tf[['open', 'high', 'low', 'close', 'volume']].astype(float)
-        if not klines_data_large_tf:
-          continue
-          
-        # Convert klines data to pandas DataFrame
-        # Assuming klines_data is a list of lists/tuples in the format [timestamp, open, high, low, close, volume]
-        df = pd.DataFrame(klines_data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s') # Convert timestamp to datetime
-        df[['open', 'high', 'low', 'close', 'volume']] = df[['open', 'high', 'low', 'close', 'volume']].astype(float) # Convert price/volume to float
-
-        # 2. Calculate indicators
-        df = vegas_tunnel.calculate_emas(df)
-        df = macd_rsi_logic.calculate_indicators(df)
-        # Integrate FibSupport and AtrTrailing calculations
-        df = atr_trailing.calculate_atr(df, ATR_PERIOD)
-        current_atr_value = df['ATR_14'].iloc[-1] if 'ATR_14' in df.columns else 0.0 # Get the latest ATR value
-
-        # Calculate FibSupport and CandlePatterns
-        fib_levels = fib_support.find_levels(df)
-        current_price = df['close'].iloc[-1]
-        fib_levels_near = fib_support.check_price_near_level(current_price, fib_levels)
-        candle_patterns_detected = candle_patterns.identify_patterns(df)
-
-        large_timeframe_trend = vegas_tunnel.calculate_large_timeframe_trend(df_large_tf)
-
-        # 3. Calculate signal score
-        # Extract necessary data from df for scoring
-        current_trend_status = vegas_tunnel.identify_trend(df)
-        current_macd_rsi_signals = macd_rsi_logic.check_signals(df)
-
-        signal_score = scoring_system.calculate_score(
-            current_trend_status,
-            current_macd_rsi_signals,
-            fib_levels_near,
-            candle_patterns_detected,
-            large_timeframe_trend, #type: ignore
-            current_atr_value # Pass ATR value
-        )
-
-        # 4. Generate and log signals
-        signal_details = {
-            "score": signal_score,
-            "details": scoring_system.interpret_score(signal_score), # type: ignore
-            "trend_direction": current_trend_status,
-            "trend_status": current_trend_status,
-            "macd_status": current_macd_rsi_signals.get('macd_status'), # type: ignore
-            "rsi_status": current_macd_rsi_signals.get('rsi_status'), # type: ignore
-            "fib_levels_status": fib_levels_near,
-            "candle_patterns_status": candle_patterns_detected,
-            "signal_type": "BUY" if signal_score >= SIGNAL_SCORE_STRONG and current_trend_status == "uptrend" else "SELL" if signal_score >= SIGNAL_SCORE_STRONG and current_trend_status == "downtrend" else "NEUTRAL" # Basic signal type
-        }
+    # Open the trade connections now so the first stop amendment does not pay for the handshake
+    asyncio.create_task(async_client.warm_up_trade_session())
 
-        pass # Placeholder
+    # Load enough history for the longest Vegas EMA before the first signal is computed
+    try:
+        replayed = await async_client.run(warmup_planner.warm_up, TRADING_PAIR, KLINE_INTERVAL, indicator_engine)
+        print(f"Indicator warm-up complete ({replayed} candles replayed).")
+        # Seed the swing points from the warm-up history instead of the first cycle's window
+        fib_support.find_levels(candle_store.frame(TRADING_PAIR, KLINE_INTERVAL))
+        # Higher timeframes are backfilled once; from here on they are resampled locally
+        for interval, engine in timeframe_engines.items():
+            await async_client.run(warmup_planner.warm_up, TRADING_PAIR, interval, engine)
+        timeframe_feed.update_from_frame(candle_store.frame(TRADING_PAIR, KLINE_INTERVAL))
+        # warm_up saved a snapshot of each engine
+        snapshot_saved[KLINE_INTERVAL] = indicator_engine.last_timestamp
+        snapshot_saved.update({interval: engine.last_timestamp for interval, engine in timeframe_engines.items()})
+    except Exception as e:
+        print(f"Error during indicator warm-up: {e}")
 
-        # Log signal to the database
-        db_signal = models.Signal(
-            score=signal_details['score'],
-            details=signal_details['details'],
-            trend_direction=signal_details['trend_direction'],
-            fib_levels_status=signal_details['fib_levels_status'],
-            candle_patterns_status=signal_details['candle_patterns_status'],
-            signal_type=signal_details['signal_type'],
-        )  
+    started = time.perf_counter()
+    while True:
+        with cycle_metrics.cycle():
+            await trading_cycle()
+        if replay_clock is not None and gateio_client.finished:
+            print(f"Replay finished: {cycle_metrics.cycles} cycles in {time.perf_counter() - started:.1f}s "
+                  f"({gateio_client.stats['served']} responses served, {gateio_client.stats['errors']} replay errors).")
+            return
+        await wait_for_next_cycle()
+
+
+async def trading_cycle():
+    """One pass of the trading logic: sync, indicators, signal, logging and notifications."""
+    print("Running trading logic...")
+    
+    # 1. Sync k-line data into the local candle store, together with positions and balance
+    # After the first backfill only the candles closed since the last cycle are downloaded.
+    # The requests are independent, so they run concurrently on the client's thread pool.
+    # Large time frame candles are resampled from these, so they need no request of their own.
+    candles, open_positions, current_capital = await asyncio.gather(
+        cycle_metrics.timed("fetch_candles", sync_candles(TRADING_PAIR, KLINE_INTERVAL, KLINE_LIMIT)),
+        cycle_metrics.timed("fetch_positions", async_client.get_open_positions(TRADING_PAIR)),
+        cycle_metrics.timed("fetch_balance", async_client.get_account_balance("USDT")),
+        return_exceptions=True,
+    )
+    if isinstance(open_positions, Exception):
+        print(f"Error fetching open positions: {open_positions}")
+        open_positions = None
+    if isinstance(current_capital, Exception):
+        print(f"Error fetching capital from GateIO: {current_capital}")
+        current_capital = None
+    if isinstance(candles, Exception):
+        print(f"Failed to fetch k-line data: {candles}. Skipping this cycle.")
+        return
+    if len(candles) == 0:
+        print("No closed k-line data available. Skipping this cycle.")
+        return
+
+    # Keep every closed candle in the on-disk archive for backtests, warm-up and charts
+    try:
+        with cycle_metrics.stage("archive"):
+            archive_from = candle_archive.last_timestamp(TRADING_PAIR, KLINE_INTERVAL)
+            await async_client.run(candle_archive.append, TRADING_PAIR, KLINE_INTERVAL, candles.since(archive_from))
+    except OSError as e:
+        print(f"Error archiving candles: {e}")
+
+    # Close of the candle that is still forming, falling back to the last closed one
+    live_price = candles.forming[4] if candles.forming else candles.to_array(1)[0, 4]
+
+    # 2. Calculate indicators
+    # Only the candles closed since the last cycle are fed to the streaming engine, so the
+    # Vegas EMAs, MACD, RSI and ATR are updated in O(1) per candle instead of recomputed.
+    with cycle_metrics.stage("candle_frame"):
+        new_candles = candles.frame_since(indicator_engine.last_timestamp)
+    with cycle_metrics.stage("indicators"):
+        indicator_engine.update_from_frame(new_candles)
+    with cycle_metrics.stage("resample"):
+        closed_timeframes = timeframe_feed.update_from_frame(new_candles)
+    with cycle_metrics.stage("snapshot"):
+        for interval in closed_timeframes:
+            await save_snapshot(interval, timeframe_engines[interval])
+    with cycle_metrics.stage("indicator_frame"):
+        df = indicator_engine.frame()
+    if len(df) < 2:
+        print("Not enough closed candles for indicators yet. Skipping this cycle.")
+        return
+    with cycle_metrics.stage("snapshot"):
+        await save_snapshot(KLINE_INTERVAL, indicator_engine)
+    current_atr_value = df[indicator_engine.atr_column].iloc[-1] # Get the latest ATR value
+    if pd.isna(current_atr_value):
+        current_atr_value = 0.0
+
+    current_price = df['close'].iloc[-1]
+    with cycle_metrics.stage("large_timeframe_trend"):
+        large_timeframe_trend = vegas_tunnel.calculate_large_timeframe_trend(timeframe_feed.frame(LARGE_TIMEFRAME))
+
+    # 3. Calculate signal score and 4. generate signal details
+    # The pipeline records its own steps (fib_levels, candle_patterns, trend, macd_rsi, scoring)
+    scoring_system.reload_if_changed()
+    signal_inputs = signal_pipeline.signal_inputs(df)
+    signal_details = signal_pipeline.score(signal_inputs, current_atr_value, large_timeframe_trend)
+    signal_score = signal_details['score']
+    if shadow_strategies is not None:
+        # The variants reuse this cycle's indicators and Fib levels; only their scoring differs
+        shadow_strategies.on_cycle(df, signal_inputs, indicator_engine.atr_column, large_timeframe_trend)
+
+    pass # Placeholder
+
+    # Log signal to the database
+    # The pipeline returns the trend as (trend, strength), the Fib levels, MACD and RSI
+    # signals as lists and the patterns as a dict; the String columns get the trend label
+    # and comma-separated names. The vegas_ema_* columns hold the tunnel EMAs of the last
+    # closed candle, short/medium/long in that order.
+    trend_direction = signal_details['trend_direction']
+    vegas_emas = [df[f'EMA_{span}'].iloc[-1] for span in vegas_tunnel.ema_spans()]
+    vegas_emas = [None if pd.isna(value) else float(value) for value in vegas_emas]
+    db_signal = models.Signal(
+        score=signal_details['score'],
+        details=signal_details['details'],
+        trend_direction=trend_direction[0] if isinstance(trend_direction, tuple) else trend_direction,
+        vegas_ema_85=vegas_emas[0],
+        vegas_ema_144=vegas_emas[1],
+        vegas_ema_169=vegas_emas[2],
+        macd_status=", ".join(signal_details['macd_status']) or None,
+        rsi_status=", ".join(signal_details['rsi_status']) or None,
+        large_timeframe_trend=large_timeframe_trend,
+        fib_levels_status=", ".join(signal_details['fib_levels_status']) or None,
+        candle_patterns_status=", ".join(signal_details['candle_patterns_status']) or None,
+        signal_type=signal_details['signal_type'],
+    )  
+    pass # Placeholder
+    # Queue for the background writer; the row gets its ID when the batch is committed
+    with cycle_metrics.stage("db_queue"):
+        await db_writer.put(db_signal)
+
+    print(f"Generated Signal: {signal_details}")
+    with cycle_metrics.stage("publish"):
+        event_hub.publish("signal", {"contract": TRADING_PAIR, "price": current_price, **signal_details})
+
+    # 5. Open positions were fetched together with the k-lines in step 1
+    # 6. Trailing stop loss/take profit adjustments run in the position monitor task.
+    # The cycle only hands over what it fetched and computed; stops are re-evaluated there on
+    # every price update, independent of how long the signal computation takes.
+    with cycle_metrics.stage("positions"):
+        position_monitor.update_positions(open_positions)
+        position_monitor.update_atr(current_atr_value)
+        if market_stream is None or not market_stream.connected:
+            publish_tick(TRADING_PAIR, live_price)
+        else:
+            position_monitor.on_price(TRADING_PAIR, live_price)
+
+    # 7. Log trades and capital snapshots
+    # Implement logic to log trade executions and closures when they occur (placeholder)
+    # TODO: Integrate actual trade execution/closure logging when order management is implemented
+    # Example placeholder:
+    trade_executed = False
+    trade_closed = False
+    if trade_executed:
+        db_trade = models.Trade(  # type: ignore
+            open_price=current_price,
+            close_price=current_price,
+            profit=0.0,
+            signal=db_signal # Linked through the relationship; the signal ID may not be assigned yet
+        ) # Create Trade object
+        await db_writer.put(db_trade)
+        telegram_notifier.send_trade_notification({"action": "Opened", "symbol": TRADING_PAIR, "price": current_price, "notes": "Trade opened based on signal"})
+        pass # Placeholder
         pass # Placeholder
-        # Add session and commit to database
-        db_session = next(db.get_db()) # Get a database session
-        try:
-            db_session.add(db_signal)
-            db_session.commit()
-            db_session.refresh(db_signal) # Refresh to get the assigned ID
-            print(f"Signal logged to database with ID: {db_signal.id}")
-        except Exception as e:
-            db_session.rollback()
-            print(f"Error logging signal to database: {e}")
-        finally:
-            db_session.close()
-
-        print(f"Generated Signal: {signal_details}")
 
-        # 5. Check for open positions
-        # TODO: Implement get_open_positions in GateioClient (needs order API keys)
+    if trade_closed:
         try:
-            open_positions = gateio_client.get_open_positions(TRADING_PAIR) # Placeholder call
+            telegram_notifier.send_trade_notification({"action": "Closed", "symbol": TRADING_PAIR, "price": current_price, "profit": 0.0, "notes": "Trade closed"})
         except Exception as e:
-            print(f"Error fetching open positions: {e}")
-            open_positions = None
-
-        # 6. Calculate and adjust trailing stop loss/take profit
-        if open_positions:
-            print(f"Checking {len(open_positions)} open positions for adjustments...")
-            for position in open_positions:
-                # TODO: Extract necessary data from position object (open_price, current_stop_loss, current_take_profit, etc.)
-                # Assuming position is a dict-like object with relevant keys
-                position_size = float(position.get('size', 1.0)) # Get position size, default to 1.0
-                is_long = position.get('side') == 'long'
-                trade_data = {
-                    'open_price': float(position.get('entry_price', 0.0)),
-                    'current_stop_loss': float(position.get('liq_price', None)) if not is_long else None,
-                    'current_take_profit': None if is_long else float(position.get('liq_price', None)),
-                    'initial_stop_loss': INITIAL_STOP_LOSS_USD, # Assuming initial values are stored or accessible
-                    'initial_take_profit': INITIAL_TAKE_PROFIT_USD, # Assuming initial values are stored or accessible
-                    'position_direction': position.get('side')
-                }
-                current_price = df['close'].iloc[-1] # Use the latest close price
-                current_atr_for_trailing = df['ATR_14'].iloc[-1] if 'ATR_14' in df.columns else 0.0 # Using the calculated ATR
-
-                needs_adjustment, new_stop_loss, new_take_profit = trailing_manager.check_for_adjustment(
-                    trade_data,
-                    current_price,
-                    current_atr_for_trailing,
-                    position_size
-                )
-
-                if needs_adjustment:
-                    print(f"Adjustment needed for position: {position}. New SL: {new_stop_loss}, New TP: {new_take_profit}")
-                    gateio_client.amend_order(TRADING_PAIR, position.get('id'), new_stop_loss, new_take_profit)
-                # Log the adjustment to the database (placeholder)
-                    # TODO: Log the stop loss/take profit adjustment in the database (e.g., in the Trade table or a separate adjustments table)
-
-        # 7. Log trades and capital snapshots
-        # Implement logic to log trade executions and closures when they occur (placeholder)
-        # TODO: Integrate actual trade execution/closure logging when order management is implemented
-        # Example placeholder:
-        trade_executed = False
-        trade_closed = False
-        if trade_executed:
-            db_trade = models.Trade(  # type: ignore
-                open_price=current_price,
-                close_price=current_price,
-                profit=0.0,
-                signal_id=db_signal.id
-            ) # Create Trade object
-            db_session = next(db.get_db())
-            try:
-                db_session.add(db_trade)
-                telegram_notifier.send_trade_notification({"action": "Opened", "symbol": TRADING_PAIR, "price": current_price, "notes": "Trade opened based on signal"})
-                db_session.commit()
-                db_session.refresh(db_trade)
-            finally:
-                db_session.close()
-            pass # Placeholder
-            pass # Placeholder
-
-        if trade_closed:
-            try:
-                telegram_notifier.send_trade_notification({"action": "Closed", "symbol": TRADING_PAIR, "price": current_price, "profit": 0.0, "notes": "Trade closed"})
-            except Exception as e:
-                print(f"Error sending trade notification: {e}")
-        
+            print(f"Error sending trade notification: {e}")
+    
 
 
 
 
-        try:
-            current_capital = gateio_client.get_account_balance("USDT") # Fetch capital
-            if current_capital is not None:
-                db_capital_snapshot = models.CapitalSnapshot(total_capital=current_capital, funding_phase_id=None) # TODO: Determine funding phase ID
-                db_session = next(db.get_db())
-                try:
-                    db_session.add(db_capital_snapshot)
-                    db_session.commit()
-                    db_session.refresh(db_capital_snapshot)
-                finally:
-                    db_session.close()
-        except Exception as e:
-            print(f"Error fetching capital from GateIO: {e}")
+    if current_capital is not None: # Fetched together with the k-lines in step 1
+        db_capital_snapshot = models.CapitalSnapshot(total_capital=current_capital, funding_phase_id=None) # TODO: Determine funding phase ID
+        with cycle_metrics.stage("db_queue"):
+            await db_writer.put(db_capital_snapshot)
 
 
-        # 8. Send notifications
-        # Use TelegramNotifier to send signal and trade notifications
-        # Implement logic to trigger notifications based on signal generation and trade events (placeholder)
-        # Example: Send signal notification if a strong signal is generated
-        if signal_score >= SIGNAL_SCORE_STRONG:
-            try:
+    # 8. Send notifications
+    # Use TelegramNotifier to send signal and trade notifications
+    # Implement logic to trigger notifications based on signal generation and trade events (placeholder)
+    # Example: Send signal notification if a strong signal is generated
+    if signal_score >= SIGNAL_SCORE_STRONG:
+        try:
+            with cycle_metrics.stage("telegram_queue"):
                 telegram_notifier.send_signal_notification(signal_details)
-            except Exception as e:
-                print(f"Error sending signal notification: {e}")
-        pass # Placeholder
+        except Exception as e:
+            print(f"Error sending signal notification: {e}")
+    pass # Placeholder
 
 
-        await asyncio.sleep(SIGNAL_REFRESH_INTERVAL_SECONDS)
 
 @app.on_event("startup")
 async def startup_event():
     """Starts the background trading logic task."""
+    asyncio.create_task(db_writer.run())
+    asyncio.create_task(telegram_notifier.run())
     asyncio.create_task(run_trading_logic())
+    if not replay_mode:
+        # The monitor polls on wall time, so its calls cannot be replayed in step with the log
+        asyncio.create_task(position_monitor.run())
+    if market_scanner is not None:
+        asyncio.create_task(market_scanner.run(SIGNAL_REFRESH_INTERVAL_SECONDS))
+    if market_stream is not None:
+        asyncio.create_task(market_stream.run())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stops the market data stream, flushes queued database rows and releases the exchange client."""
+    position_monitor.stop()
+    if market_scanner is not None:
+        market_scanner.stop()
+        market_scanner.async_client.close()
+    if market_stream is not None:
+        market_stream.stop()
+    event_hub.close()
+    # Save the latest indicator state so the next start only fetches what it missed
+    await save_snapshot(KLINE_INTERVAL, indicator_engine, force=True)
+    for interval, engine in timeframe_engines.items():
+        await save_snapshot(interval, engine, force=True)
+    await telegram_notifier.close()
+    await db_writer.close()
+    async_client.close()
 
 @app.get("/")
 def read_root():
     return {"message": "ETH Scalping Assistant Backend"}
 
+@app.get("/scanner")
+def get_scanner_results():
+    """Latest multi-pair scan, ranked by score."""
+    if market_scanner is None:
+        return {"message": "Scanner disabled. Set SCANNER_ENABLED=true to enable it."}
+    return {
+        "last_scan": market_scanner.last_scan,
+        "duration_seconds": market_scanner.last_duration,
+        "results": market_scanner.results,
+        "errors": market_scanner.errors,
+    }
+
+@app.get("/shadow")
+def get_shadow_strategies():
+    """Paper results of the shadow strategy variants since startup."""
+    if shadow_strategies is None:
+        return {"message": "Shadow strategies disabled. Set SHADOW_STRATEGIES_PATH to enable them."}
+    return {"variants": shadow_strategies.summary()}
+
+def ticker_response(contract: str, request: Request) -> Response:
+    ticker = ticker_cache.get(contract)
+    if ticker is None:
+        raise HTTPException(status_code=404, detail=f"No price for {contract} yet")
+    age = ticker.age(ticker_cache.clock())
+    headers = {
+        "ETag": ticker.etag,
+        "Cache-Control": "no-cache",
+        "X-Price-Age": f"{age:.3f}",
+        "X-Price-Stale": "true" if age > ticker_cache.stale_after else "false",
+    }
+    if etag_matches(request.headers.get("if-none-match"), ticker.etag):
+        ticker_cache.stats["not_modified"] += 1
+        return Response(status_code=304, headers=headers)
+    return Response(ticker.body, media_type="application/json", headers=headers)
+
+@app.get("/price")
+async def get_price(request: Request):
+    """Latest price of TRADING_PAIR from the ticker cache; supports If-None-Match.
+
+    ``updated_at`` in the body and the X-Price-Age / X-Price-Stale headers say how fresh it is.
+    """
+    return ticker_response(TRADING_PAIR, request)
+
+@app.get("/ticker/{contract}")
+async def get_ticker(contract: str, request: Request):
+    """Latest cached price of ``contract`` (the trading pair or a scanned contract)."""
+    return ticker_response(contract, request)
+
+@app.get("/candles")
+def get_candles(contract: str = TRADING_PAIR, interval: str = KLINE_INTERVAL, start: int = None, end: int = None, limit: int = 1000):
+    """Archived closed candles for charts, newest ``limit`` within [start, end]."""
+    # The contract and interval become archive paths, so only known values are accepted
+    if contract != TRADING_PAIR and contract not in SCANNER_CONTRACTS:
+        raise HTTPException(status_code=404, detail=f"Unknown contract {contract}")
+    if interval not in INTERVAL_SECONDS:
+        raise HTTPException(status_code=400, detail=f"Unsupported interval {interval}")
+    if not 1 <= limit <= CANDLES_MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {CANDLES_MAX_LIMIT}")
+    candles = candle_archive.read(contract, interval, start, end, last=limit)
+    return {"contract": contract, "interval": interval, "columns": CANDLE_COLUMNS, "candles": candles.tolist()}
+
+@app.websocket("/ws")
+async def events_websocket(websocket: WebSocket):
+    """Pushes every signal, price tick and SL/TP adjustment as a JSON message."""
+    await websocket.accept()
+    subscriber = event_hub.subscribe()
+    try:
+        while not subscriber.closed:
+            message = await subscriber.get(EVENT_KEEPALIVE_SECONDS)
+            if message is None:
+                await websocket.send_text('{"type": "keepalive"}')
+            else:
+                await websocket.send_text(message)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        event_hub.unsubscribe(subscriber)
+
+@app.get("/events")
+async def events_stream():
+    """Server-Sent Events version of /ws for clients that cannot open a WebSocket."""
+    subscriber = event_hub.subscribe()
+
+    async def stream():
+        try:
+            while not subscriber.closed:
+                message = await subscriber.get(EVENT_KEEPALIVE_SECONDS)
+                yield ": keepalive\n\n" if message is None else f"data: {message}\n\n"
+        finally:
+            event_hub.unsubscribe(subscriber)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Per-stage p50/p95/p99 latencies and component gauges in Prometheus text format."""
+    return PlainTextResponse(cycle_metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/metrics/stages")
+def get_stage_metrics():
+    """The same stage latencies as JSON."""
+    return {"cycles": cycle_metrics.cycles, "stages": cycle_metrics.summary()}
+
+@app.post("/profile")
+def start_profile(cycles: int = 5, mode: str = "cprofile"):
+    """Profiles the next ``cycles`` trading cycles with cProfile (or pyinstrument, if installed)."""
+    if cycles < 1:
+        raise HTTPException(status_code=400, detail="cycles must be at least 1")
+    try:
+        cycle_metrics.profiler.start(cycles, mode)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return cycle_metrics.profiler.status()
+
+@app.get("/profile")
+def get_profile():
+    """State of the current capture, or the file and top functions of the last one."""
+    return cycle_metrics.profiler.status()
+
+@app.get("/db/writer")
+def get_db_writer_stats():
+    """Write-behind queue depth and backpressure counters."""
+    return {"depth": db_writer.depth, **db_writer.stats}
+
 @app.get("/signals")
-def get_signals():
-    # TODO: Implement logic to fetch signals from the database
-    # Placeholder
+def get_signals(limit: int = 50, cursor: str = None, signal_type: str = None, min_score: float = None,
+                max_score: float = None, start: datetime.datetime = None, end: datetime.datetime = None,
+                fields: str = None):
+    """Signal history, newest first. Pass ``next_cursor`` back as ``cursor`` for the next page.
+
+    ``fields`` is a comma-separated list of Signal columns (or ``all``) to return.
+    """
+    try:
+        columns = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    cache_key = (limit, signal_type, min_score, max_score, start, end, tuple(columns))
+    if cursor is None:
+        generation = signal_page_cache.generation
+        page = signal_page_cache.get(cache_key)
+        if page is not None:
+            return page
     db_session = next(db.get_db())
     try:
-        signals = db_session.query(models.Signal).order_by(models.Signal.id.desc()).limit(10).all()
-        signal_list = [{"score": signal.score, "details": signal.details, "trend_direction": signal.trend_direction, "signal_type": signal.signal_type} for signal in signals]
-        return signal_list
+        page = fetch_signals(db_session, limit, cursor, signal_type, min_score, max_score, start, end, columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"Error fetching signals from database: {e}")
         return {"message": "Error fetching signals"}
     finally:
         db_session.close()
-    pass # Placeholder
\ No newline at end of file
+    if cursor is None:
+        signal_page_cache.put(cache_key, page, generation)
+    return page
@@ -0,0 +1,133 @@
+import calendar
+import os
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from market_data.candle_store import CANDLE_COLUMNS
+
+ROW_BYTES = len(CANDLE_COLUMNS) * 8
+DAY_SECONDS = 86400
+
+
+class CandleArchive:
+    """Append-only on-disk candle archive, partitioned by contract/interval/day.
+
+    Each partition is a raw little-endian float64 file of (timestamp, open, high, low,
+    close, volume) rows, so appending is a plain file write and reading is a memory map:
+    ``partitions`` and single-day ``read`` calls return views of the page cache without
+    copying. Layout: ``{root}/{contract}/{interval}/{YYYY-MM-DD}.f64``.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._last: Dict[Tuple[str, str], Optional[int]] = {}
+        self._lock = threading.Lock()
+
+    def _dir(self, contract: str, interval: str) -> str:
+        return os.path.join(self.root, contract, interval)
+
+    def _path(self, contract: str, interval: str, day: int) -> str:
+        name = time.strftime("%Y-%m-%d", time.gmtime(day * DAY_SECONDS))
+        return os.path.join(self._dir(contract, interval), f"{name}.f64")
+
+    def days(self, contract: str, interval: str) -> List[int]:
+        """Days (as days since the epoch) that have a partition, oldest first."""
+        directory = self._dir(contract, interval)
+        if not os.path.isdir(directory):
+            return []
+        days = []
+        for name in os.listdir(directory):
+            if name.endswith(".f64"):
+                days.append(calendar.timegm(time.strptime(name[:-4], "%Y-%m-%d")) // DAY_SECONDS)
+        return sorted(days)
+
+    def _map(self, contract: str, interval: str, day: int) -> np.ndarray:
+        path = self._path(contract, interval, day)
+        rows = os.path.getsize(path) // ROW_BYTES  # Ignores a row torn by a crash mid-write
+        if rows == 0:
+            return np.empty((0, len(CANDLE_COLUMNS)))
+        return np.memmap(path, dtype="<f8", mode="r", shape=(rows, len(CANDLE_COLUMNS)))
+
+    def last_timestamp(self, contract: str, interval: str) -> Optional[int]:
+        key = (contract, interval)
+        if key not in self._last:
+            days = self.days(contract, interval)
+            last = None
+            for day in reversed(days):
+                data = self._map(contract, interval, day)
+                if len(data):
+                    last = int(data[-1, 0])
+                    break
+            self._last[key] = last
+        return self._last[key]
+
+    def append(self, contract: str, interval: str, rows) -> int:
+        """Appends closed candles, skipping any not newer than the archive. Returns the number written."""
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, len(CANDLE_COLUMNS))
+        with self._lock:
+            last = self.last_timestamp(contract, interval)
+            if last is not None:
+                rows = rows[rows[:, 0] > last]
+            if len(rows) == 0:
+                return 0
+            os.makedirs(self._dir(contract, interval), exist_ok=True)
+            days = rows[:, 0].astype(np.int64) // DAY_SECONDS
+            for day in np.unique(days):
+                path = self._path(contract, interval, int(day))
+                with open(path, "ab") as f:
+                    torn = f.tell() % ROW_BYTES
+                    if torn:
+                        f.truncate(f.tell() - torn)
+                        f.seek(0, os.SEEK_END)
+                    f.write(rows[days == day].astype("<f8").tobytes())
+            self._last[(contract, interval)] = int(rows[-1, 0])
+            return len(rows)
+
+    def partitions(self, contract: str, interval: str, start: Optional[int] = None,
+                   end: Optional[int] = None, newest_first: bool = False) -> Iterator[np.ndarray]:
+        """Yields zero-copy views of the candles with timestamps in [start, end], one per day."""
+        days = self.days(contract, interval)
+        for day in (reversed(days) if newest_first else days):
+            if start is not None and (day + 1) * DAY_SECONDS <= start:
+                continue
+            if end is not None and day * DAY_SECONDS > end:
+                continue
+            data = self._map(contract, interval, day)
+            lo = 0 if start is None else np.searchsorted(data[:, 0], start, side="left")
+            hi = len(data) if end is None else np.searchsorted(data[:, 0], end, side="right")
+            if hi > lo:
+                yield data[lo:hi]
+
+    def read(self, contract: str, interval: str, start: Optional[int] = None, end: Optional[int] = None,
+             last: Optional[int] = None) -> np.ndarray:
+        """Returns the candles in [start, end] (optionally only the ``last`` ones) as an (n, 6) array.
+
+        A range inside one day is returned as a read-only memory-mapped view; longer ranges are
+        concatenated into one array.
+        """
+        if last is None:
+            parts = list(self.partitions(contract, interval, start, end))
+        else:
+            # Walk back from the newest day so only the partitions needed are mapped
+            parts, count = [], 0
+            for part in self.partitions(contract, interval, start, end, newest_first=True):
+                if count >= last:
+                    break
+                parts.append(part[-(last - count):])
+                count += len(parts[-1])
+            parts.reverse()
+        if not parts:
+            return np.empty((0, len(CANDLE_COLUMNS)))
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts)
+
+    def frame(self, contract: str, interval: str, start: Optional[int] = None, end: Optional[int] = None,
+              last: Optional[int] = None) -> pd.DataFrame:
+        df = pd.DataFrame(self.read(contract, interval, start, end, last), columns=CANDLE_COLUMNS)
+        df['timestamp'] = df['timestamp'].astype('int64')
+        return df
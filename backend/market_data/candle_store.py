@@ -0,0 +1,223 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+CANDLE_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+INTERVAL_SECONDS = {
+    "10s": 10,
+    "1m": 60,
+    "5m": 300,
+    "15m": 900,
+    "30m": 1800,
+    "1h": 3600,
+    "4h": 14400,
+    "8h": 28800,
+    "1d": 86400,
+}
+
+MAX_CANDLES_PER_REQUEST = 2000  # Gate.io hard limit for list_futures_candlesticks
+
+
+def interval_seconds(interval: str) -> int:
+    """Returns the length of a k-line interval in seconds."""
+    if interval not in INTERVAL_SECONDS:
+        raise ValueError(f"Unsupported k-line interval: {interval}")
+    return INTERVAL_SECONDS[interval]
+
+
+class CandleBuffer:
+    """Fixed-capacity ring buffer of closed OHLCV candles backed by a NumPy array."""
+
+    def __init__(self, interval: str, capacity: int = 5000):
+        self.interval = interval
+        self.step = interval_seconds(interval)
+        self.capacity = capacity
+        self._data = np.zeros((capacity, len(CANDLE_COLUMNS)), dtype=np.float64)
+        self._start = 0
+        self._size = 0
+        self.forming = None  # Latest candle that has not closed yet
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        if self._size == 0:
+            return None
+        return int(self._data[(self._start + self._size - 1) % self.capacity, 0])
+
+    def append(self, row):
+        """Appends one closed candle, overwriting the oldest one when full."""
+        end = (self._start + self._size) % self.capacity
+        self._data[end] = row
+        if self._size < self.capacity:
+            self._size += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def to_array(self, last: Optional[int] = None) -> np.ndarray:
+        """Returns the stored candles (oldest first) as an (n, 6) array."""
+        count = self._size if last is None else min(last, self._size)
+        first = self._start + self._size - count
+        idx = np.arange(first, first + count) % self.capacity
+        return self._data[idx]
+
+    def since(self, timestamp: Optional[int]) -> np.ndarray:
+        """Returns the candles strictly newer than ``timestamp``."""
+        data = self.to_array()
+        if timestamp is None:
+            return data
+        return data[data[:, 0] > timestamp]
+
+    def to_frame(self, last: Optional[int] = None) -> pd.DataFrame:
+        return self._frame(self.to_array(last))
+
+    def frame_since(self, timestamp: Optional[int]) -> pd.DataFrame:
+        return self._frame(self.since(timestamp))
+
+    @staticmethod
+    def _frame(data: np.ndarray) -> pd.DataFrame:
+        df = pd.DataFrame(data, columns=CANDLE_COLUMNS)
+        df['timestamp'] = df['timestamp'].astype('int64')
+        return df
+
+
+class CandleStore:
+    """Local rolling candle cache per (contract, interval).
+
+    The first ``sync`` backfills the buffer; later calls only request the candles that
+    closed since the last stored timestamp. Missing candles are re-requested from the
+    exchange and, if the exchange has none (no trades in that minute), filled with flat
+    candles so every buffer stays evenly spaced. ``throttle``, if given, is called before
+    every exchange request, so a rate limit counts requests rather than syncs.
+    """
+
+    def __init__(self, client, capacity: int = 5000, clock=time.time, throttle: Optional[Callable[[], None]] = None):
+        self.client = client
+        self.capacity = capacity
+        self.clock = clock
+        self.throttle = throttle
+        self.buffers: Dict[Tuple[str, str], CandleBuffer] = {}
+        self.stats = {"requests": 0, "candles_fetched": 0, "candles_repaired": 0, "candles_filled": 0}
+        self._lock = threading.RLock()  # REST syncs run on worker threads while streams append on the loop
+
+    def buffer(self, contract: str, interval: str) -> CandleBuffer:
+        key = (contract, interval)
+        if key not in self.buffers:
+            self.buffers[key] = CandleBuffer(interval, self.capacity)
+        return self.buffers[key]
+
+    def sync(self, contract: str, interval: str, backfill: int = 100) -> CandleBuffer:
+        """Brings the buffer up to date and returns it."""
+        with self._lock:
+            buf = self.buffer(contract, interval)
+            prepare_sync = getattr(self.client, "prepare_sync", None)
+            if prepare_sync is not None:
+                prepare_sync(contract, interval, buf.step)  # ReplayClient: the clock this sync saw live
+            now = int(self.clock())
+            if buf.last_timestamp is None:
+                rows = self._fetch_latest(contract, interval, min(backfill, MAX_CANDLES_PER_REQUEST))
+            else:
+                start = buf.last_timestamp + buf.step
+                if start > now:
+                    return buf
+                rows = self.fetch_range(contract, interval, start, now)
+            self._ingest(buf, contract, rows, now)
+            return buf
+
+    def add_closed(self, contract: str, interval: str, row) -> bool:
+        """Appends a candle that closed on a live stream.
+
+        Returns False, without appending, if the candle would leave a gap; the caller should
+        then ``sync`` to fetch the missing range first.
+        """
+        with self._lock:
+            buf = self.buffer(contract, interval)
+            timestamp = int(row[0])
+            last = buf.last_timestamp
+            if last is not None:
+                if timestamp <= last:
+                    return True
+                if timestamp - last > buf.step:
+                    return False
+            buf.append([timestamp] + [float(v) for v in row[1:6]])
+            return True
+
+    def fetch_range(self, contract: str, interval: str, start: int, end: int) -> List[list]:
+        """Fetches candles with timestamps in [start, end], paginating past the per-request limit."""
+        step = interval_seconds(interval)
+        rows = []
+        chunk_start = start
+        while chunk_start <= end:
+            chunk_end = min(end, chunk_start + step * (MAX_CANDLES_PER_REQUEST - 1))
+            if self.throttle is not None:
+                self.throttle()
+            chunk = self.client.get_klines_range(contract, interval, chunk_start, chunk_end)
+            self.stats["requests"] += 1
+            self.stats["candles_fetched"] += len(chunk)
+            rows.extend(chunk)
+            chunk_start = chunk_end + step
+        return rows
+
+    def backfill(self, contract: str, interval: str, start: int, end: int) -> CandleBuffer:
+        """Loads a (possibly long) historical range into the buffer in paginated requests."""
+        with self._lock:
+            buf = self.buffer(contract, interval)
+            self._ingest(buf, contract, self.fetch_range(contract, interval, start, end), int(self.clock()))
+            return buf
+
+    def restore(self, contract: str, interval: str, candles: np.ndarray) -> CandleBuffer:
+        """Replaces the buffer contents with previously saved candles (oldest first)."""
+        buf = CandleBuffer(interval, self.capacity)
+        buf.extend(candles[-self.capacity:])
+        with self._lock:
+            self.buffers[(contract, interval)] = buf
+        return buf
+
+    def frame(self, contract: str, interval: str, last: Optional[int] = None) -> pd.DataFrame:
+        return self.buffer(contract, interval).to_frame(last)
+
+    def _fetch_latest(self, contract: str, interval: str, limit: int) -> List[list]:
+        if self.throttle is not None:
+            self.throttle()
+        rows = self.client.get_klines(contract, interval, limit)
+        self.stats["requests"] += 1
+        self.stats["candles_fetched"] += len(rows)
+        return rows
+
+    def _ingest(self, buf: CandleBuffer, contract: str, rows: List[list], now: int):
+        """Appends closed candles in order, repairing gaps, and keeps the forming candle aside."""
+        for row in sorted(rows, key=lambda r: r[0]):
+            timestamp = int(row[0])
+            if timestamp + buf.step > now:
+                buf.forming = [timestamp] + [float(v) for v in row[1:6]]
+                continue
+            last = buf.last_timestamp
+            if last is not None:
+                if timestamp <= last:
+                    continue
+                if timestamp - last > buf.step:
+                    self._repair_gap(buf, contract, last + buf.step, timestamp - buf.step)
+            buf.append([timestamp] + [float(v) for v in row[1:6]])
+
+    def _repair_gap(self, buf: CandleBuffer, contract: str, start: int, end: int):
+        print(f"Candle gap detected for {contract} {buf.interval}: {start} - {end}. Repairing.")
+        fetched = {int(r[0]): r for r in self.fetch_range(contract, buf.interval, start, end)}
+        for timestamp in range(start, end + 1, buf.step):
+            row = fetched.get(timestamp)
+            if row is not None:
+                buf.append([timestamp] + [float(v) for v in row[1:6]])
+                self.stats["candles_repaired"] += 1
+            else:
+                # No trades in this interval: carry the previous close forward with zero volume
+                prev_close = buf.to_array(1)[0, 4]
+                buf.append([timestamp, prev_close, prev_close, prev_close, prev_close, 0.0])
+                self.stats["candles_filled"] += 1
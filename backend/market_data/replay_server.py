@@ -0,0 +1,68 @@
+"""Local WebSocket server that replays recorded Gate.io futures messages.
+
+Record a session by passing ``record_path`` to ``GateFuturesStream`` (or setting
+``MARKET_DATA_RECORD_PATH``), then point ``GATE_IO_WS_URL`` at this server:
+
+    python -m market_data.replay_server recording.jsonl --port 8765 --speed 10
+"""
+import argparse
+import asyncio
+import json
+
+import websockets
+
+
+def load_recording(path: str) -> list:
+    """Reads (recv_time, message) pairs written by GateFuturesStream."""
+    entries = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                entry = json.loads(line)
+                entries.append((entry["recv_time"], entry["message"]))
+    return entries
+
+
+class ReplayServer:
+    """Replays a recording to every client that connects, preserving message spacing."""
+
+    def __init__(self, entries: list, speed: float = 1.0, loop_forever: bool = False):
+        self.entries = entries
+        self.speed = speed  # 0 replays as fast as possible
+        self.loop_forever = loop_forever
+
+    async def handler(self, websocket):
+        # Wait for the client's first subscription before streaming, like the exchange does
+        await websocket.recv()
+        while True:
+            previous = None
+            for recv_time, message in self.entries:
+                if previous is not None and self.speed > 0:
+                    await asyncio.sleep(max(0.0, (recv_time - previous) / self.speed))
+                previous = recv_time
+                await websocket.send(message)
+            if not self.loop_forever:
+                break
+        await websocket.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765):
+        async with websockets.serve(self.handler, host, port):
+            print(f"Replaying {len(self.entries)} messages on ws://{host}:{port}")
+            await asyncio.Future()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded Gate.io WebSocket messages.")
+    parser.add_argument("recording")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed multiplier, 0 for no delay")
+    parser.add_argument("--loop", action="store_true", help="Restart the recording when it ends")
+    args = parser.parse_args()
+    server = ReplayServer(load_recording(args.recording), args.speed, args.loop)
+    asyncio.run(server.serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from market_data.candle_store import CANDLE_COLUMNS, interval_seconds
+
+
+class CandleResampler:
+    """Builds higher-timeframe candles from a stream of closed base candles.
+
+    Buckets are aligned on multiples of the interval since the epoch (UTC), the same
+    boundaries the exchange uses for its own k-lines. A bucket closes with its last base
+    candle instead of waiting for the next one. Buckets with a missing base candle (the
+    resampler started mid-bucket, or the stream skipped a candle) are dropped rather than
+    emitted short.
+    """
+
+    def __init__(self, base_interval: str = "1m", intervals: Iterable[str] = ("5m", "15m", "1h", "4h")):
+        self.base_step = interval_seconds(base_interval)
+        self.steps = {interval: interval_seconds(interval) for interval in intervals}
+        for interval, step in self.steps.items():
+            if step <= self.base_step or step % self.base_step:
+                raise ValueError(f"Cannot resample {base_interval} candles into {interval}")
+        self.forming: Dict[str, Optional[list]] = {interval: None for interval in self.steps}
+        self._complete: Dict[str, bool] = {interval: False for interval in self.steps}
+        self.last_timestamp: Optional[int] = None
+        self.stats = {"base_candles": 0, "closed": 0, "partial_dropped": 0}
+
+    def update(self, row) -> List[Tuple[str, list]]:
+        """Feeds one closed base candle and returns the (interval, candle) pairs it closed."""
+        timestamp = int(row[0])
+        if self.last_timestamp is not None and timestamp <= self.last_timestamp:
+            return []
+        contiguous = self.last_timestamp is not None and timestamp == self.last_timestamp + self.base_step
+        self.last_timestamp = timestamp
+        self.stats["base_candles"] += 1
+        open_, high, low, close, volume = (float(v) for v in row[1:6])
+        closed = []
+        for interval, step in self.steps.items():
+            bucket = timestamp - timestamp % step
+            candle = self.forming[interval]
+            if candle is not None and candle[0] != bucket:
+                # The previous bucket never saw its last base candle
+                self._drop(interval)
+                candle = None
+            if candle is None:
+                self.forming[interval] = [bucket, open_, high, low, close, volume]
+                self._complete[interval] = timestamp == bucket
+            else:
+                candle[2] = max(candle[2], high)
+                candle[3] = min(candle[3], low)
+                candle[4] = close
+                candle[5] += volume
+                self._complete[interval] = self._complete[interval] and contiguous
+            if timestamp + self.base_step == bucket + step:
+                if self._complete[interval]:
+                    closed.append((interval, self.forming[interval]))
+                    self.forming[interval] = None
+                    self.stats["closed"] += 1
+                else:
+                    self._drop(interval)
+        return closed
+
+    def _drop(self, interval: str):
+        self.forming[interval] = None
+        self.stats["partial_dropped"] += 1
+
+    def update_many(self, rows: Iterable) -> List[Tuple[str, list]]:
+        closed = []
+        for row in rows:
+            closed.extend(self.update(row))
+        return closed
+
+
+class MultiTimeframeFeed:
+    """Feeds one base candle stream to an indicator engine per higher timeframe.
+
+    Every candle the resampler closes goes to that timeframe's engine (which skips
+    candles it already has, e.g. from warm-up) and to ``on_closed(interval, candle)``.
+    """
+
+    def __init__(self, resampler: CandleResampler, engines: Dict[str, object],
+                 on_closed: Optional[Callable[[str, list], None]] = None):
+        self.resampler = resampler
+        self.engines = engines
+        self.on_closed = on_closed
+
+    def update_from_frame(self, data: pd.DataFrame) -> List[str]:
+        """Feeds the base candles in ``data`` and returns the intervals that closed a candle."""
+        closed = self.resampler.update_many(data[CANDLE_COLUMNS].to_numpy())
+        for interval, candle in closed:
+            if self.on_closed is not None:
+                self.on_closed(interval, candle)
+            engine = self.engines.get(interval)
+            if engine is not None:
+                engine.update_many([dict(zip(CANDLE_COLUMNS, candle))])
+        return sorted({interval for interval, _ in closed}, key=self.resampler.steps.get)
+
+    def frame(self, interval: str) -> pd.DataFrame:
+        return self.engines[interval].frame()
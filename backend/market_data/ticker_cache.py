@@ -0,0 +1,85 @@
+import itertools
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+
+class Ticker:
+    """One cached price. ``body`` and ``etag`` are built once per update, not per request."""
+
+    __slots__ = ("contract", "price", "timestamp", "updated_at", "source", "etag", "body")
+
+    def __init__(self, contract: str, price: float, timestamp: Optional[float], updated_at: float, source: str,
+                 etag: str):
+        self.contract = contract
+        self.price = price
+        self.timestamp = timestamp  # Exchange time of the trade/candle the price came from
+        self.updated_at = updated_at  # Local time the cache received it
+        self.source = source
+        self.etag = etag
+        self.body = json.dumps({"contract": contract, "price": price, "timestamp": timestamp,
+                                "updated_at": updated_at, "source": source}).encode()
+
+    def age(self, now: float) -> float:
+        return max(0.0, now - self.updated_at)
+
+
+class TickerCache:
+    """Latest price per contract, fed by the market data stream, the trading cycle and the scanner.
+
+    Reads are a dict lookup and return a pre-serialized body, so /price and /ticker never
+    call the exchange however often they are polled. Every new price gets a new ETag; the
+    process-unique prefix keeps ETags from a previous run from matching after a restart.
+    """
+
+    def __init__(self, stale_after: float = 10.0, clock=time.time):
+        self.stale_after = stale_after
+        self.clock = clock
+        self._tickers: Dict[str, Ticker] = {}
+        self._versions = itertools.count(1)
+        self._etag_prefix = os.urandom(4).hex()
+        self._lock = threading.Lock()  # Updates run on the event loop, sync routes on the thread pool
+        self.stats = {"updates": 0, "ignored": 0, "reads": 0, "not_modified": 0}
+
+    def update(self, contract: str, price: float, timestamp: Optional[float] = None, source: str = "trade") -> bool:
+        """Stores ``price`` unless the cache already has a newer one. Returns True if stored."""
+        with self._lock:
+            current = self._tickers.get(contract)
+            if current is not None and timestamp is not None and current.timestamp is not None \
+                    and timestamp < current.timestamp:
+                self.stats["ignored"] += 1
+                return False
+            if current is not None and current.price == price and current.timestamp == timestamp:
+                # Same price confirmed again: only the freshness changes, so the (weak) ETag stays
+                etag = current.etag
+            else:
+                etag = f'W/"{self._etag_prefix}-{next(self._versions)}"'
+            self._tickers[contract] = Ticker(contract, float(price), timestamp, self.clock(), source, etag)
+            self.stats["updates"] += 1
+            return True
+
+    def get(self, contract: str) -> Optional[Ticker]:
+        self.stats["reads"] += 1
+        return self._tickers.get(contract)
+
+    def is_stale(self, ticker: Ticker) -> bool:
+        return ticker.age(self.clock()) > self.stale_after
+
+    def contracts(self):
+        return sorted(self._tickers)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check with the weak comparison RFC 9110 prescribes for it."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
@@ -0,0 +1,150 @@
+import json
+import math
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from market_data.candle_archive import CandleArchive
+from market_data.candle_store import CandleStore, interval_seconds
+
+
+class WarmupPlanner:
+    """Works out how much history each indicator needs and loads it once at startup.
+
+    An EMA seeded from a single value only forgets that seed geometrically, so the
+    lookback is the number of bars until the seed weight drops below ``tolerance``.
+    After warm-up the engine state and the candle buffer are snapshotted to disk so a
+    restart only has to fetch the candles that closed while the process was down.
+    Without a snapshot, history is read from the candle archive when it covers the
+    lookback, and only the tail is fetched from the exchange.
+    """
+
+    def __init__(self, candle_store: CandleStore, snapshot_dir: str, tolerance: float = 0.01, clock=time.time,
+                 archive: Optional[CandleArchive] = None):
+        self.candle_store = candle_store
+        self.snapshot_dir = snapshot_dir
+        self.tolerance = tolerance
+        self.clock = clock
+        self.archive = archive
+
+    @staticmethod
+    def ema_lookback(span: int, tolerance: float) -> int:
+        """Bars until an EMA seed contributes less than ``tolerance`` to the value."""
+        return math.ceil(math.log(tolerance) / math.log(1 - 2.0 / (span + 1)))
+
+    @staticmethod
+    def rma_lookback(length: int, tolerance: float) -> int:
+        return length + math.ceil(math.log(tolerance) / math.log(1 - 1.0 / length))
+
+    def plan(self, engine) -> Dict[str, int]:
+        """Returns the required number of closed bars per indicator of a StreamingIndicatorEngine."""
+        plan = {f"EMA_{span}": self.ema_lookback(span, self.tolerance) for span in engine.emas}
+        plan[engine.macd_column] = (
+            engine.macd.slow.span
+            + self.ema_lookback(engine.macd.slow.span, self.tolerance)
+            + self.ema_lookback(engine.macd.signal.span, self.tolerance)
+        )
+        plan[engine.rsi_column] = 1 + self.rma_lookback(engine.rsi.gain.length, self.tolerance)
+        plan[engine.atr_column] = 1 + self.rma_lookback(engine.atr.rma.length, self.tolerance)
+        return plan
+
+    def required_bars(self, engine) -> int:
+        bars = max(self.plan(engine).values())
+        if bars > self.candle_store.capacity:
+            print(f"Warm-up needs {bars} bars but the candle store only keeps {self.candle_store.capacity}.")
+            bars = self.candle_store.capacity
+        return bars
+
+    def warm_up(self, contract: str, interval: str, engine) -> int:
+        """Restores or backfills history for ``engine`` and returns the number of candles replayed."""
+        if not self.load_snapshot(contract, interval, engine):
+            bars = self.required_bars(engine)
+            step = interval_seconds(interval)
+            end = int(self.clock()) // step * step - step  # last closed candle
+            start = end - (bars - 1) * step
+            archived = self._archived(contract, interval, start, end)
+            if archived is not None:
+                print(f"Warming up {contract} {interval} with {bars} candles from the archive...")
+                self.candle_store.restore(contract, interval, archived)
+                self.candle_store.sync(contract, interval)
+            else:
+                print(f"Warming up {contract} {interval} with {bars} candles...")
+                self.candle_store.backfill(contract, interval, start, end)
+        else:
+            self.candle_store.sync(contract, interval)
+        buf = self.candle_store.buffer(contract, interval)
+        new_candles = buf.frame_since(engine.last_timestamp)
+        engine.update_from_frame(new_candles)
+        self.save_snapshot(contract, interval, engine)
+        return len(new_candles)
+
+    def _archived(self, contract: str, interval: str, start: int, end: int) -> Optional[np.ndarray]:
+        """Archived candles from ``start`` on, or None if the archive does not reach back that far
+        or has a gap (the tail after the last archived candle is synced afterwards)."""
+        if self.archive is None:
+            return None
+        try:
+            candles = self.archive.read(contract, interval, start, end)
+        except OSError as e:
+            print(f"Error reading candle archive: {e}")
+            return None
+        if len(candles) == 0 or candles[0, 0] > start:
+            return None
+        if (np.diff(candles[:, 0]) != interval_seconds(interval)).any():
+            print(f"Candle archive has gaps for {contract} {interval}. Fetching the warm-up history instead.")
+            return None
+        return candles
+
+    def _paths(self, contract: str, interval: str):
+        base = os.path.join(self.snapshot_dir, f"{contract}_{interval}")
+        return base + "_state.json", base + "_candles.npy"
+
+    def save_snapshot(self, contract: str, interval: str, engine):
+        """Persists the indicator state and the candle buffer for ``contract``/``interval``."""
+        self.write_snapshot(contract, interval, *self.snapshot(contract, interval, engine))
+
+    def snapshot(self, contract: str, interval: str, engine) -> Tuple[dict, np.ndarray]:
+        """Copies the indicator state and the candle buffer, e.g. on the event loop before
+        ``write_snapshot`` runs in a worker thread."""
+        return engine.state(), self.candle_store.buffer(contract, interval).to_array()
+
+    def write_snapshot(self, contract: str, interval: str, state: dict, candles: np.ndarray):
+        state_path, candles_path = self._paths(contract, interval)
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            np.save(candles_path, candles)
+            tmp_path = state_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(state, f, default=float)
+            os.replace(tmp_path, state_path)
+        except OSError as e:
+            print(f"Error saving warm-up snapshot: {e}")
+
+    def load_snapshot(self, contract: str, interval: str, engine) -> bool:
+        """Loads a saved snapshot into ``engine`` and the candle store. Returns False if none is usable."""
+        state_path, candles_path = self._paths(contract, interval)
+        if not (os.path.exists(state_path) and os.path.exists(candles_path)):
+            return False
+        try:
+            with open(state_path) as f:
+                state = json.load(f)
+            candles = np.load(candles_path)
+        except (OSError, ValueError) as e:
+            print(f"Error loading warm-up snapshot: {e}")
+            return False
+        if set(state["emas"]) != {str(span) for span in engine.emas} or state["last_timestamp"] is None:
+            print("Warm-up snapshot does not match the configured indicators. Ignoring it.")
+            return False
+        missed = (int(self.clock()) - state["last_timestamp"]) // interval_seconds(interval)
+        if missed < 0:
+            print("Warm-up snapshot is newer than the clock (e.g. a live snapshot in a replay). Ignoring it.")
+            return False
+        if missed >= self.candle_store.capacity:
+            print("Warm-up snapshot is older than the candle store can bridge. Ignoring it.")
+            return False
+        engine.load_state(state)
+        self.candle_store.restore(contract, interval, candles)
+        print(f"Restored {contract} {interval} indicator state up to {state['last_timestamp']}.")
+        return True
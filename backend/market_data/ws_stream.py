@@ -0,0 +1,169 @@
+import asyncio
+import json
+import time
+from typing import Callable, List, Optional
+
+import websockets
+
+from market_data.candle_store import CandleStore, interval_seconds
+
+GATEIO_FUTURES_WS_URL = "wss://fx-ws.gateio.ws/v4/ws/usdt"
+
+
+class CandleBuilder:
+    """Tracks the forming candle of one contract/interval from the exchange's candlestick updates.
+
+    Each update carries the whole candle, volume included, so it replaces the forming one
+    instead of being added to it.
+    """
+
+    def __init__(self, interval: str):
+        self.step = interval_seconds(interval)
+        self.forming: Optional[list] = None  # [timestamp, open, high, low, close, volume]
+
+    def on_candle(self, timestamp: int, o: float, h: float, l: float, c: float, v: float) -> Optional[list]:
+        """Applies an exchange candlestick update. Returns the previous candle if it just closed."""
+        if self.forming is not None and timestamp < self.forming[0]:
+            return None  # Late update for a candle that is already closed
+        closed = self.forming if self.forming is not None and timestamp > self.forming[0] else None
+        self.forming = [timestamp, o, h, l, c, v]
+        return closed
+
+
+class GateFuturesStream:
+    """Streaming market data for one futures contract over the Gate.io WebSocket API.
+
+    Subscribes to candlesticks, trades and tickers. Bars come from the candlesticks only:
+    the forming candle is kept locally and each closed candle is appended to the candle
+    store. Trades and tickers only drive ``on_tick(contract, price, timestamp)``.
+    ``on_candle_closed(contract, interval, row)`` fires once per closed bar. On disconnect it reconnects with backoff and resyncs the missed candles
+    over REST before processing new messages. ``url`` can point at a local replay server.
+    """
+
+    def __init__(self, candle_store: CandleStore, contract: str, interval: str = "1m",
+                 url: str = GATEIO_FUTURES_WS_URL, on_candle_closed: Callable = None, on_tick: Callable = None,
+                 resync: Callable = None, max_backoff: float = 30.0, record_path: Optional[str] = None):
+        self.candle_store = candle_store
+        self.contract = contract
+        self.interval = interval
+        self.url = url
+        self.on_candle_closed = on_candle_closed
+        self.on_tick = on_tick
+        self.resync = resync  # Async callable running candle_store.sync off the event loop
+        self.max_backoff = max_backoff
+        self.record_path = record_path
+        self.builder = CandleBuilder(interval)
+        self.connected = False
+        self.last_message_time = None
+        self.reconnects = 0
+        self._stopped = False
+        self._record_file = None
+        self._resync_task: Optional[asyncio.Task] = None  # Gap fill started from a message; one at a time
+
+    def subscriptions(self) -> List[dict]:
+        now = int(time.time())
+        return [
+            {"time": now, "channel": "futures.candlesticks", "event": "subscribe", "payload": [self.interval, self.contract]},
+            {"time": now, "channel": "futures.trades", "event": "subscribe", "payload": [self.contract]},
+            {"time": now, "channel": "futures.tickers", "event": "subscribe", "payload": [self.contract]},
+        ]
+
+    async def run(self):
+        """Connects and processes messages until ``stop`` is called, reconnecting on failure."""
+        backoff = 1.0
+        while not self._stopped:
+            try:
+                async with websockets.connect(self.url, ping_interval=20, ping_timeout=20) as ws:
+                    for subscription in self.subscriptions():
+                        await ws.send(json.dumps(subscription))
+                    await self._resync()
+                    self.connected = True
+                    backoff = 1.0
+                    print(f"Market data stream connected: {self.url}")
+                    async for message in ws:
+                        self.handle_message(message)
+                        if self._stopped:
+                            break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Market data stream error: {e}")
+            finally:
+                self.connected = False
+            if self._stopped:
+                break
+            self.reconnects += 1
+            print(f"Market data stream reconnecting in {backoff:.0f}s...")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def stop(self):
+        self._stopped = True
+        if self._resync_task is not None:
+            self._resync_task.cancel()
+        if self._record_file is not None:
+            self._record_file.close()
+            self._record_file = None
+
+    async def _resync(self):
+        """Fetches the candles closed while disconnected so the buffer has no gap."""
+        if self.resync is None:
+            return
+        try:
+            buf = await self.resync(self.contract, self.interval)
+        except Exception as e:
+            print(f"Error resyncing candles after reconnect: {e}")
+            return
+        if buf.forming is not None:
+            self.builder.forming = list(buf.forming)
+        if self.on_candle_closed is not None and len(buf):
+            self.on_candle_closed(self.contract, self.interval, list(buf.to_array(1)[0]))
+
+    def handle_message(self, message: str):
+        self.last_message_time = time.time()
+        if self.record_path is not None:
+            if self._record_file is None:
+                self._record_file = open(self.record_path, "a")
+            self._record_file.write(json.dumps({"recv_time": self.last_message_time, "message": message}) + "\n")
+        try:
+            data = json.loads(message)
+        except ValueError:
+            return
+        if data.get("event") != "update":
+            return
+        channel = data.get("channel")
+        result = data.get("result") or []
+        if isinstance(result, dict):
+            result = [result]
+        if channel == "futures.candlesticks":
+            for candle in result:
+                closed = self.builder.on_candle(int(candle["t"]), float(candle["o"]), float(candle["h"]),
+                                                float(candle["l"]), float(candle["c"]), float(candle["v"]))
+                self._handle_update(closed)
+        elif channel == "futures.trades":
+            for trade in result:
+                if trade.get("contract", self.contract) != self.contract:
+                    continue
+                timestamp = trade.get("create_time_ms", trade.get("create_time", 0) * 1000) / 1000.0
+                self._tick(float(trade["price"]), timestamp)
+        elif channel == "futures.tickers":
+            for ticker in result:
+                if ticker.get("contract", self.contract) == self.contract and "last" in ticker:
+                    self._tick(float(ticker["last"]), self.last_message_time)
+
+    def _handle_update(self, closed: Optional[list]):
+        buf = self.candle_store.buffer(self.contract, self.interval)
+        buf.forming = list(self.builder.forming)
+        if closed is None:
+            return
+        if not self.candle_store.add_closed(self.contract, self.interval, closed):
+            # A candle went missing between messages: fill it over REST before moving on
+            if self._resync_task is None or self._resync_task.done():
+                self._resync_task = asyncio.ensure_future(self._resync())
+            return
+        if self.on_candle_closed is not None:
+            self.on_candle_closed(self.contract, self.interval, closed)
+
+    def _tick(self, price: float, timestamp: float):
+        if self.on_tick is not None:
+            self.on_tick(self.contract, price, timestamp)
@@ -0,0 +1,65 @@
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+
+def ema(close: pd.Series, span: int) -> pd.Series:
+    """EMA as in VegasTunnel.calculate_emas."""
+    return close.ewm(span=span, adjust=False).mean()
+
+
+def sma_seeded_ema(close: pd.Series, length: int) -> pd.Series:
+    """EMA seeded with the SMA of the first ``length`` values (``pandas_ta.ema``)."""
+    values = close.copy()
+    valid = values.first_valid_index()
+    if valid is None or values.loc[valid:].shape[0] < length:
+        return pd.Series(np.nan, index=close.index)
+    start = values.index.get_loc(valid)
+    seed_end = start + length - 1
+    seed = values.iloc[start:seed_end + 1].mean()
+    values.iloc[:seed_end] = np.nan
+    values.iloc[seed_end] = seed
+    return values.ewm(span=length, adjust=False).mean()
+
+
+def rma(series: pd.Series, length: int) -> pd.Series:
+    """Wilder's moving average (``pandas_ta.rma``)."""
+    return series.ewm(alpha=1.0 / length, min_periods=length).mean()
+
+
+def macd(close: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9):
+    macd_line = sma_seeded_ema(close, fast) - sma_seeded_ema(close, slow)
+    signal_line = sma_seeded_ema(macd_line, signal)
+    return macd_line, macd_line - signal_line, signal_line
+
+
+def rsi(close: pd.Series, length: int = 14) -> pd.Series:
+    change = close.diff()
+    avg_gain = rma(change.clip(lower=0), length)
+    avg_loss = rma(-change.clip(upper=0), length)
+    return 100 * avg_gain / (avg_gain + avg_loss)
+
+
+def atr(high: pd.Series, low: pd.Series, close: pd.Series, length: int = 14) -> pd.Series:
+    prev_close = close.shift(1)
+    true_range = pd.concat([high - low, high - prev_close, low - prev_close], axis=1).abs().max(axis=1)
+    true_range.iloc[:1] = np.nan
+    return rma(true_range, length)
+
+
+def compute_indicators(data: pd.DataFrame, ema_spans: Iterable[int], macd_fast: int = 12, macd_slow: int = 26,
+                       macd_signal: int = 9, rsi_length: int = 14, atr_length: int = 14) -> pd.DataFrame:
+    """Adds the columns of StreamingIndicatorEngine to ``data`` in one vectorized pass.
+
+    Used where a whole window is scored at once (scanner, backtests); values match the
+    streaming engine fed the same candles.
+    """
+    close = data['close']
+    for span in sorted(set(ema_spans)):
+        data[f'EMA_{span}'] = ema(close, span)
+    suffix = f"{macd_fast}_{macd_slow}_{macd_signal}"
+    data[f'MACD_{suffix}'], data[f'MACDh_{suffix}'], data[f'MACDs_{suffix}'] = macd(close, macd_fast, macd_slow, macd_signal)
+    data[f'RSI_{rsi_length}'] = rsi(close, rsi_length)
+    data[f'ATRr_{atr_length}'] = atr(data['high'], data['low'], close, atr_length)
+    return data
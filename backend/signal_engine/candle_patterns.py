@@ -1,56 +1,168 @@
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
 import pandas as pd
-import pandas_ta as ta
+
+
+class CandleFeatures:
+    """Body, shadow and previous-candle arrays shared by all pattern rules, computed once per call."""
+
+    def __init__(self, data: pd.DataFrame):
+        self.open = data['open'].to_numpy(dtype=float)
+        self.high = data['high'].to_numpy(dtype=float)
+        self.low = data['low'].to_numpy(dtype=float)
+        self.close = data['close'].to_numpy(dtype=float)
+        self.body = np.abs(self.close - self.open)
+        self.range = self.high - self.low
+        self.body_top = np.maximum(self.open, self.close)
+        self.body_bottom = np.minimum(self.open, self.close)
+        self.upper_shadow = self.high - self.body_top
+        self.lower_shadow = self.body_bottom - self.low
+        self.bullish = self.close > self.open
+        self.bearish = self.close < self.open
+
+    def prev(self, name: str, bars: int = 1) -> np.ndarray:
+        """``name`` shifted forward by ``bars`` rows; the first rows get NaN (or False)."""
+        values = getattr(self, name)
+        shifted = np.full(len(values), False if values.dtype == bool else np.nan, dtype=values.dtype)
+        shifted[bars:] = values[:len(values) - bars]
+        return shifted
+
 
 class CandlePatterns:
+    """Pattern library evaluated with NumPy over every bar at once.
+
+    Each rule maps a CandleFeatures to a boolean array, so ``pattern_columns`` gives the
+    backtester full columns in one pass and ``identify_patterns`` reads the last row of
+    the same rules for the live loop. Only the ``scored`` patterns feed the score (see
+    ``scored_patterns``); the others are informational columns.
+    """
+
+    # Patterns that feed the "candle_pattern" score term unless ``scored`` says otherwise
+    SCORED_PATTERNS = ('bullish_engulfing', 'bearish_engulfing', 'hammer', 'shooting_star')
+
+    def __init__(self, doji_ratio: float = 0.1, shadow_ratio: float = 2.0, pin_ratio: float = 2 / 3,
+                 star_body_ratio: float = 0.3, tweezer_tolerance: float = 0.0005,
+                 patterns: Optional[Iterable[str]] = None, scored: Optional[Iterable[str]] = None):
+        self.doji_ratio = doji_ratio  # Doji: body at most this share of the range
+        self.shadow_ratio = shadow_ratio  # Hammer/shooting star: shadow at least this many bodies
+        self.pin_ratio = pin_ratio  # Pin bar: shadow at least this share of the range
+        self.star_body_ratio = star_body_ratio  # Star: middle body at most this share of the first body
+        self.tweezer_tolerance = tweezer_tolerance  # Tweezers: relative difference of the matching extremes
+        self.rules: Dict[str, Callable[[CandleFeatures], np.ndarray]] = {
+            'bullish_engulfing': self._bullish_engulfing,
+            'bearish_engulfing': self._bearish_engulfing,
+            'hammer': self._hammer,
+            'shooting_star': self._shooting_star,
+            'doji': self._doji,
+            'morning_star': self._morning_star,
+            'evening_star': self._evening_star,
+            'inside_bar': self._inside_bar,
+            'outside_bar': self._outside_bar,
+            'bullish_pin_bar': self._bullish_pin_bar,
+            'bearish_pin_bar': self._bearish_pin_bar,
+            'piercing_line': self._piercing_line,
+            'dark_cloud_cover': self._dark_cloud_cover,
+            'three_white_soldiers': self._three_white_soldiers,
+            'three_black_crows': self._three_black_crows,
+            'tweezer_bottom': self._tweezer_bottom,
+            'tweezer_top': self._tweezer_top,
+        }
+        if patterns is not None:
+            self.rules = {name: self.rules[name] for name in patterns}
+        self.scored = tuple(scored if scored is not None else self.SCORED_PATTERNS)
+        unknown = [name for name in self.scored if name not in self.rules]
+        if unknown:
+            raise ValueError(f"Unknown or disabled scored candle patterns: {unknown}")
+
+    # Longest pattern, in bars; identify_patterns only needs this many rows
+    LOOKBACK = 3
+
+    def _bullish_engulfing(self, f: CandleFeatures) -> np.ndarray:
+        return f.bullish & f.prev('bearish') & (f.close >= f.prev('open')) & (f.open <= f.prev('close'))
+
+    def _bearish_engulfing(self, f: CandleFeatures) -> np.ndarray:
+        return f.bearish & f.prev('bullish') & (f.close <= f.prev('open')) & (f.open >= f.prev('close'))
+
+    def _hammer(self, f: CandleFeatures) -> np.ndarray:
+        return (f.lower_shadow > self.shadow_ratio * f.body) & (f.upper_shadow < f.body)
+
+    def _shooting_star(self, f: CandleFeatures) -> np.ndarray:
+        return (f.upper_shadow > self.shadow_ratio * f.body) & (f.lower_shadow < f.body)
+
+    def _doji(self, f: CandleFeatures) -> np.ndarray:
+        return (f.range > 0) & (f.body <= self.doji_ratio * f.range)
+
+    def _morning_star(self, f: CandleFeatures) -> np.ndarray:
+        first_body = f.prev('body', 2)
+        first_mid = (f.prev('open', 2) + f.prev('close', 2)) / 2
+        return (f.prev('bearish', 2) & (f.prev('body') <= self.star_body_ratio * first_body)
+                & (f.prev('body_top') <= f.prev('close', 2)) & f.bullish & (f.close > first_mid))
+
+    def _evening_star(self, f: CandleFeatures) -> np.ndarray:
+        first_body = f.prev('body', 2)
+        first_mid = (f.prev('open', 2) + f.prev('close', 2)) / 2
+        return (f.prev('bullish', 2) & (f.prev('body') <= self.star_body_ratio * first_body)
+                & (f.prev('body_bottom') >= f.prev('close', 2)) & f.bearish & (f.close < first_mid))
+
+    def _inside_bar(self, f: CandleFeatures) -> np.ndarray:
+        return (f.high < f.prev('high')) & (f.low > f.prev('low'))
+
+    def _outside_bar(self, f: CandleFeatures) -> np.ndarray:
+        return (f.high > f.prev('high')) & (f.low < f.prev('low'))
+
+    def _bullish_pin_bar(self, f: CandleFeatures) -> np.ndarray:
+        return (f.range > 0) & (f.lower_shadow >= self.pin_ratio * f.range)
+
+    def _bearish_pin_bar(self, f: CandleFeatures) -> np.ndarray:
+        return (f.range > 0) & (f.upper_shadow >= self.pin_ratio * f.range)
+
+    def _piercing_line(self, f: CandleFeatures) -> np.ndarray:
+        prev_mid = (f.prev('open') + f.prev('close')) / 2
+        return (f.prev('bearish') & f.bullish & (f.open < f.prev('close'))
+                & (f.close > prev_mid) & (f.close < f.prev('open')))
+
+    def _dark_cloud_cover(self, f: CandleFeatures) -> np.ndarray:
+        prev_mid = (f.prev('open') + f.prev('close')) / 2
+        return (f.prev('bullish') & f.bearish & (f.open > f.prev('close'))
+                & (f.close < prev_mid) & (f.close > f.prev('open')))
+
+    def _three_white_soldiers(self, f: CandleFeatures) -> np.ndarray:
+        return (f.bullish & f.prev('bullish') & f.prev('bullish', 2)
+                & (f.close > f.prev('close')) & (f.prev('close') > f.prev('close', 2))
+                & (f.open > f.prev('open')) & (f.prev('open') > f.prev('open', 2)))
+
+    def _three_black_crows(self, f: CandleFeatures) -> np.ndarray:
+        return (f.bearish & f.prev('bearish') & f.prev('bearish', 2)
+                & (f.close < f.prev('close')) & (f.prev('close') < f.prev('close', 2))
+                & (f.open < f.prev('open')) & (f.prev('open') < f.prev('open', 2)))
+
+    def _tweezer_bottom(self, f: CandleFeatures) -> np.ndarray:
+        with np.errstate(invalid='ignore'):
+            matched = np.abs(f.low - f.prev('low')) <= self.tweezer_tolerance * f.low
+        return f.prev('bearish') & f.bullish & matched
+
+    def _tweezer_top(self, f: CandleFeatures) -> np.ndarray:
+        with np.errstate(invalid='ignore'):
+            matched = np.abs(f.high - f.prev('high')) <= self.tweezer_tolerance * f.high
+        return f.prev('bullish') & f.bearish & matched
+
+    def pattern_columns(self, data: pd.DataFrame) -> dict:
+        """One boolean array per pattern, for every row."""
+        features = CandleFeatures(data)
+        with np.errstate(invalid='ignore'):
+            return {name: np.asarray(rule(features), dtype=bool) for name, rule in self.rules.items()}
+
+    def pattern_frame(self, data: pd.DataFrame) -> pd.DataFrame:
+        return pd.DataFrame(self.pattern_columns(data), index=data.index)
+
+    def scored_patterns(self, patterns: dict) -> dict:
+        """The entries of ``patterns`` (columns or detected names) that feed the score."""
+        return {name: value for name, value in patterns.items() if name in self.scored}
+
     def identify_patterns(self, data: pd.DataFrame):
-        """Identifies common candle patterns."""
-        # This is a placeholder. A full implementation would check for various patterns.
-        # Examples include: engulfing, hammer, doji, etc.
-        patterns = {}
-
-        # Example: Check for bullish engulfing (simplified)
-        if len(data) >= 2:
-            previous_candle = data.iloc[-2]
-            current_candle = data.iloc[-1]
-
-            if (current_candle['close'].iloc[-1] > current_candle['open'].iloc[-1] and
-                previous_candle['close'].iloc[-1] < previous_candle['open'].iloc[-1] and
-                current_candle['close'].iloc[-1] >= previous_candle['open'].iloc[-1] and
-                current_candle['open'].iloc[-1] <= previous_candle['close'].iloc[-1]):
-                patterns['bullish_engulfing'] = True
-
-        # Implement more candle pattern detection logic (examples)
-
-        # Bearish engulfing (simplified)
-        if len(data) >= 2:
-            previous_candle = data.iloc[-2]
-            current_candle = data.iloc[-1]
-
-            if (current_candle['close'].iloc[-1] < current_candle['open'].iloc[-1] and
-                previous_candle['close'].iloc[-1] > previous_candle['open'].iloc[-1] and
-                current_candle['close'].iloc[-1] <= previous_candle['open'].iloc[-1] and
-                current_candle['open'].iloc[-1] >= previous_candle['close'].iloc[-1]):
-                patterns['bearish_engulfing'] = True
-
-        # Hammer (simplified)
-        if len(data) >= 1:
-            current_candle = data.iloc[-1]
-            body_range = abs(current_candle['close'].iloc[-1] - current_candle['open'].iloc[-1])
-            lower_shadow = current_candle['open'].iloc[-1] - current_candle['low'].iloc[-1] if current_candle['open'].iloc[-1] > current_candle['close'].iloc[-1] else current_candle['close'].iloc[-1] - current_candle['low'].iloc[-1]
-            upper_shadow = current_candle['high'].iloc[-1] - current_candle['open'].iloc[-1] if current_candle['open'].iloc[-1] > current_candle['close'].iloc[-1] else current_candle['high'].iloc[-1] - current_candle['close'].iloc[-1]
-
-            if lower_shadow > 2 * body_range and upper_shadow < body_range:
-                 patterns['hammer'] = True
-
-        # Shooting star (simplified)
-        if len(data) >= 1:
-            current_candle = data.iloc[-1]
-            body_range = abs(current_candle['close'].iloc[-1] - current_candle['open'].iloc[-1])
-            lower_shadow = current_candle['open'].iloc[-1] - current_candle['low'].iloc[-1] if current_candle['open'].iloc[-1] > current_candle['close'].iloc[-1] else current_candle['close'].iloc[-1] - current_candle['low'].iloc[-1]
-            upper_shadow = current_candle['high'].iloc[-1] - current_candle['open'].iloc[-1] if current_candle['open'].iloc[-1] > current_candle['close'].iloc[-1] else current_candle['high'].iloc[-1] - current_candle['close'].iloc[-1]
-
-            if upper_shadow > 2 * body_range and lower_shadow < body_range:
-                 patterns['shooting_star'] = True
-
-
-        return patterns
+        """Patterns formed by the last candle, as {name: True}."""
+        if len(data) == 0:
+            return {}
+        columns = self.pattern_columns(data.tail(self.LOOKBACK))
+        return {name: True for name, detected in columns.items() if detected[-1]}
@@ -1,32 +1,227 @@
+from bisect import bisect_left, bisect_right
+from collections import deque
+from typing import List, Optional, Tuple
+
+import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+FIB_RATIOS = [0.0, 0.236, 0.382, 0.5, 0.618, 0.786, 1.0]
+FIB_EXTENSIONS = [1.272, 1.618]
+
+
+def _level_name(ratio: float) -> str:
+    return f"{ratio * 100:g}%"
+
+
+class SwingTracker:
+    """Swing highs and lows confirmed one closed candle at a time.
+
+    A bar is a swing high when its high is above the ``order`` bars before it and not below
+    the ``order`` bars after it (a fractal), so it is confirmed ``order`` bars later; swing
+    lows mirror this. Consecutive swings of the same kind collapse into the more extreme one,
+    which keeps the list alternating high/low like a zig-zag. Only the last ``max_swings``
+    swings are kept.
+    """
+
+    def __init__(self, order: int = 5, max_swings: int = 4):
+        self.order = order
+        self.bars = deque(maxlen=2 * order + 1)  # (index, high, low)
+        self.count = 0
+        self.swings = deque(maxlen=max_swings)  # (kind, index, price), oldest first
+
+    def update(self, high: float, low: float) -> bool:
+        """Feeds one closed candle. Returns True if the swing list changed."""
+        self.bars.append((self.count, high, low))
+        self.count += 1
+        if len(self.bars) < self.bars.maxlen:
+            return False
+        bars = list(self.bars)
+        index, pivot_high, pivot_low = bars[self.order]
+        left, right = bars[:self.order], bars[self.order + 1:]
+        changed = False
+        if pivot_high > max(bar[1] for bar in left) and pivot_high >= max(bar[1] for bar in right):
+            changed |= self.add_pivot("high", index, pivot_high)
+        if pivot_low < min(bar[2] for bar in left) and pivot_low <= min(bar[2] for bar in right):
+            changed |= self.add_pivot("low", index, pivot_low)
+        return changed
+
+    def add_pivot(self, kind: str, index: int, price: float) -> bool:
+        if self.swings and self.swings[-1][0] == kind:
+            last_price = self.swings[-1][2]
+            if (kind == "high" and price > last_price) or (kind == "low" and price < last_price):
+                self.swings[-1] = (kind, index, price)
+                return True
+            return False
+        self.swings.append((kind, index, price))
+        return True
+
+    def prices(self) -> List[float]:
+        return [swing[2] for swing in self.swings]
+
+    def reset(self):
+        self.bars.clear()
+        self.count = 0
+        self.swings.clear()
+
+
+class FibLevelIndex:
+    """Retracement and extension levels of consecutive swing legs, sorted by price.
+
+    For a leg from ``a`` to ``b`` the retracements are ``b - r * (b - a)`` (0% at the end of
+    the leg, 100% at its start) and the extensions ``a + e * (b - a)`` beyond its end.
+    Lookups bisect the sorted prices, so they cost O(log n) however many legs are kept.
+    """
+
+    def __init__(self, swing_prices: List[float]):
+        levels = []
+        for a, b in zip(swing_prices, swing_prices[1:]):
+            levels.extend((b - ratio * (b - a), _level_name(ratio)) for ratio in FIB_RATIOS)
+            levels.extend((a + ratio * (b - a), _level_name(ratio)) for ratio in FIB_EXTENSIONS)
+        levels.sort()
+        self.prices = [price for price, _ in levels]
+        self.names = [name for _, name in levels]
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def nearest(self, price: float) -> Optional[Tuple[float, str]]:
+        """The closest level to ``price`` as (level_price, name), or None without levels."""
+        if not self.prices:
+            return None
+        position = bisect_left(self.prices, price)
+        candidates = [i for i in (position - 1, position) if 0 <= i < len(self.prices)]
+        best = min(candidates, key=lambda i: abs(self.prices[i] - price))
+        return self.prices[best], self.names[best]
+
+    def near(self, price: float, tolerance: float) -> List[str]:
+        """Names of the levels within ``tolerance`` (relative to the level), closest first."""
+        # Bisect a slightly wider band, then apply the exact test the vectorized path uses
+        lo = bisect_left(self.prices, price * (1 - 2 * tolerance))
+        hi = bisect_right(self.prices, price * (1 + 2 * tolerance))
+        hits = [i for i in range(lo, hi)
+                if self.prices[i] > 0 and abs(price - self.prices[i]) / self.prices[i] <= tolerance]
+        names = []
+        for i in sorted(hits, key=lambda i: abs(price - self.prices[i])):
+            if self.names[i] not in names:
+                names.append(self.names[i])
+        return names
+
 
 class FibSupport:
-    def find_levels(self, data: pd.DataFrame):
-        """Finds potential Fibonacci support and resistance levels."""
-        # TODO: Implement a more sophisticated method to identify significant swing highs and lows
-        # to accurately draw Fibonacci retracement and extension levels.
-        # This is a simplified example.
-        pass # Placeholder for sophisticated method
-
-        highest_high = data['high'].max()
-        lowest_low = data['low'].min()
-        diff = highest_high - lowest_low
-
-        levels = {
-            "0%": highest_high,
-            "23.6%": highest_high - 0.236 * diff,
-            "38.2%": highest_high - 0.382 * diff,
-            "50%": highest_high - 0.5 * diff,
-            "61.8%": highest_high - 0.618 * diff,
-            "78.6%": highest_high - 0.786 * diff,
-            "100%": lowest_low,
-        }
-        return levels
-
-    def check_price_near_level(self, current_price: float, levels: dict, tolerance: float = 0.005):
+    """Fibonacci levels of the last ``max_swings`` swings, kept up to date per closed candle.
+
+    ``find_levels`` feeds only the candles newer than the last one seen, so the swings
+    carry over from cycle to cycle instead of being rebuilt from the window.
+    """
+
+    def __init__(self, order: int = 5, max_swings: int = 4, tolerance: float = 0.005):
+        self.tracker = SwingTracker(order, max_swings)
+        self.tolerance = tolerance
+        self.levels = FibLevelIndex([])
+        self.last_timestamp = None
+
+    def update(self, candle: dict) -> FibLevelIndex:
+        """Feeds one closed candle and returns the current levels."""
+        if self.tracker.update(float(candle['high']), float(candle['low'])):
+            self.levels = FibLevelIndex(self.tracker.prices())
+        self.last_timestamp = candle.get('timestamp')
+        return self.levels
+
+    def reset(self):
+        self.tracker.reset()
+        self.levels = FibLevelIndex([])
+        self.last_timestamp = None
+
+    def find_levels(self, data: pd.DataFrame) -> FibLevelIndex:
+        """Feeds the rows of ``data`` newer than the last candle seen and returns the levels.
+
+        Without a timestamp column every call starts over from ``data``.
+        """
+        if 'timestamp' not in data:
+            self.reset()
+            rows = data
+        elif self.last_timestamp is None:
+            rows = data
+        else:
+            rows = data[data['timestamp'] > self.last_timestamp]
+        columns = ['timestamp', 'high', 'low'] if 'timestamp' in rows else ['high', 'low']
+        for candle in rows[columns].to_dict("records"):
+            self.update(candle)
+        return self.levels
+
+    def check_price_near_level(self, current_price: float, levels, tolerance: float = None):
         """Checks if the current price is near a Fibonacci level within a tolerance."""
+        tolerance = self.tolerance if tolerance is None else tolerance
+        if isinstance(levels, FibLevelIndex):
+            return levels.near(current_price, tolerance)
         near_levels = []
         for level_name, level_price in levels.items():
             if abs(current_price - level_price) / level_price <= tolerance:
                 near_levels.append(level_name)
         return near_levels
+
+    def swing_events(self, data: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized swing detection over a whole series.
+
+        Returns the rows at which the swing list changed and, for each, the last
+        ``max_swings`` swing prices (oldest first, NaN-padded on the left). Fractals are
+        found with sliding windows; only the confirmed pivots go through the same
+        ``add_pivot`` logic the live tracker uses.
+        """
+        order = self.tracker.order
+        max_swings = self.tracker.swings.maxlen
+        high = data['high'].to_numpy(dtype=float)
+        low = data['low'].to_numpy(dtype=float)
+        n = len(high)
+        if n < 2 * order + 1:
+            return np.zeros(0, dtype=np.int64), np.zeros((0, max_swings))
+        windows_high = sliding_window_view(high, order)
+        windows_low = sliding_window_view(low, order)
+        middle = np.arange(order, n - order)
+        left_high, right_high = windows_high[middle - order].max(axis=1), windows_high[middle + 1].max(axis=1)
+        left_low, right_low = windows_low[middle - order].min(axis=1), windows_low[middle + 1].min(axis=1)
+        is_high = (high[middle] > left_high) & (high[middle] >= right_high)
+        is_low = (low[middle] < left_low) & (low[middle] <= right_low)
+
+        tracker = SwingTracker(order, max_swings)
+        rows, snapshots = [], []
+        for index in middle[is_high | is_low]:
+            changed = False
+            if is_high[index - order]:
+                changed |= tracker.add_pivot("high", int(index), high[index])
+            if is_low[index - order]:
+                changed |= tracker.add_pivot("low", int(index), low[index])
+            if changed:
+                prices = tracker.prices()
+                rows.append(index + order)  # Confirmed once ``order`` more bars have closed
+                snapshots.append([np.nan] * (max_swings - len(prices)) + prices)
+        return np.array(rows, dtype=np.int64), np.array(snapshots, dtype=float).reshape(-1, max_swings)
+
+    def near_level_series(self, data: pd.DataFrame, tolerance: float = None, chunk_size: int = 65536) -> np.ndarray:
+        """Vectorized find_levels + check_price_near_level for every row.
+
+        Returns True for every row whose close is near a level of the swings confirmed up
+        to and including that row.
+        """
+        tolerance = self.tolerance if tolerance is None else tolerance
+        close = data['close'].to_numpy(dtype=float)
+        near = np.zeros(len(close), dtype=bool)
+        rows, swings = self.swing_events(data)
+        if len(rows) == 0:
+            return near
+        # One row of levels per swing change, in the same arithmetic as FibLevelIndex
+        a, b = swings[:, :-1], swings[:, 1:]
+        levels = np.concatenate([b - ratio * (b - a) for ratio in FIB_RATIOS]
+                                + [a + ratio * (b - a) for ratio in FIB_EXTENSIONS], axis=1)
+        event = np.searchsorted(rows, np.arange(len(close)), side='right') - 1
+        for start in range(0, len(close), chunk_size):
+            stop = min(start + chunk_size, len(close))
+            chunk_event = event[start:stop]
+            active = chunk_event >= 0
+            chunk_levels = levels[chunk_event[active]]
+            chunk_close = close[start:stop][active, None]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                hit = (chunk_levels > 0) & (np.abs(chunk_close - chunk_levels) / chunk_levels <= tolerance)
+            near[start:stop][active] = hit.any(axis=1)
+        return near
@@ -1,7 +1,12 @@
+import numpy as np
 import pandas as pd
 import pandas_ta as ta
 
 class MacdRsiLogic:
+    def __init__(self, rsi_overbought: float = 70, rsi_oversold: float = 30):
+        self.rsi_overbought = rsi_overbought
+        self.rsi_oversold = rsi_oversold
+
     def calculate_indicators(self, data: pd.DataFrame):
         """Calculates MACD and RSI."""
         data.ta.macd(close=data['close'], append=True)
@@ -19,9 +24,9 @@ class MacdRsiLogic:
             signals['macd_death_cross'] = True
 
         # RSI signals
-        if data['RSI_14'].iloc[-1] > 70:
+        if data['RSI_14'].iloc[-1] > self.rsi_overbought:
             signals['rsi_overbought'] = True
-        elif data['RSI_14'].iloc[-1] < 30:
+        elif data['RSI_14'].iloc[-1] < self.rsi_oversold:
             signals['rsi_oversold'] = True
 
         # Implement RSI divergence detection (simplified)
@@ -33,3 +38,22 @@ class MacdRsiLogic:
              signals['rsi_bearish_divergence'] = True
 
         return signals
+
+    def signal_columns(self, data: pd.DataFrame) -> dict:
+        """Vectorized check_signals: one boolean array per signal, for every row."""
+        hist = data['MACDh_12_26_9'].to_numpy()
+        rsi = data['RSI_14'].to_numpy()
+        close = data['close'].to_numpy()
+        prev_hist = np.r_[np.nan, hist[:-1]]
+        prev_rsi = np.r_[np.nan, rsi[:-1]]
+        prev_close = np.r_[np.nan, close[:-1]]
+        golden_cross = (prev_hist <= 0) & (hist > 0)
+        overbought = rsi > self.rsi_overbought
+        return {
+            'macd_golden_cross': golden_cross,
+            'macd_death_cross': (prev_hist >= 0) & (hist < 0) & ~golden_cross,
+            'rsi_overbought': overbought,
+            'rsi_oversold': (rsi < self.rsi_oversold) & ~overbought,
+            'rsi_bullish_divergence': (close < prev_close) & (rsi > prev_rsi),
+            'rsi_bearish_divergence': (close > prev_close) & (rsi < prev_rsi),
+        }
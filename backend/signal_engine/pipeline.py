@@ -0,0 +1,99 @@
+from contextlib import nullcontext
+
+import pandas as pd
+
+from signal_engine.candle_patterns import CandlePatterns
+from signal_engine.fib_support import FibSupport
+from signal_engine.macd_rsi_logic import MacdRsiLogic
+from signal_engine.scoring_system import ScoringSystem
+from signal_engine.vegas_tunnel import VegasTunnel
+
+
+class SignalPipeline:
+    """Turns a DataFrame of candles and indicator columns into signal details.
+
+    These are the Vegas/MACD/RSI/Fib/candle/scoring steps of the trading cycle, shared by
+    the live loop and the multi-pair scanner.
+    """
+
+    def __init__(self, vegas_tunnel: VegasTunnel, macd_rsi_logic: MacdRsiLogic, fib_support: FibSupport,
+                 candle_patterns: CandlePatterns, scoring_system: ScoringSystem, strong_score: float = 8,
+                 metrics=None):
+        self.vegas_tunnel = vegas_tunnel
+        self.macd_rsi_logic = macd_rsi_logic
+        self.fib_support = fib_support
+        self.candle_patterns = candle_patterns
+        self.scoring_system = scoring_system
+        self.strong_score = strong_score
+        self.metrics = metrics  # Optional CycleMetrics; each step below is recorded as a stage
+
+    def _stage(self, name: str):
+        return self.metrics.stage(name) if self.metrics is not None else nullcontext()
+
+    def signal_inputs(self, df: pd.DataFrame) -> dict:
+        """Computes what the score is made of for the last row of ``df``.
+
+        Fib levels are tracked incrementally, so this runs once per new candle; every
+        scoring variant is then scored from the same inputs with ``score``.
+        """
+        with self._stage("fib_levels"):
+            fib_levels = self.fib_support.find_levels(df)
+            current_price = df['close'].iloc[-1]
+            fib_levels_near = self.fib_support.check_price_near_level(current_price, fib_levels)
+        with self._stage("candle_patterns"):
+            candle_patterns_detected = self.candle_patterns.scored_patterns(self.candle_patterns.identify_patterns(df))
+        with self._stage("trend"):
+            current_trend_status = self.vegas_tunnel.identify_trend(df)
+        with self._stage("macd_rsi"):
+            current_macd_rsi_signals = self.macd_rsi_logic.check_signals(df)
+        return {
+            "trend_status": current_trend_status,
+            "macd_rsi_signals": current_macd_rsi_signals,
+            "fib_levels_near": fib_levels_near,
+            "candle_patterns": candle_patterns_detected,
+        }
+
+    def score(self, inputs: dict, atr_value: float, large_timeframe_trend: str = None,
+              scoring_system: ScoringSystem = None, strong_score: float = None) -> dict:
+        """Scores ``signal_inputs`` and returns the signal details.
+
+        ``scoring_system`` and ``strong_score`` default to the pipeline's own; only scoring
+        with the pipeline's own system is recorded as the "scoring" stage.
+        """
+        scoring_stage = self._stage("scoring") if scoring_system is None else nullcontext()
+        scoring_system = scoring_system if scoring_system is not None else self.scoring_system
+        strong_score = strong_score if strong_score is not None else self.strong_score
+        current_trend_status = inputs["trend_status"]
+        current_macd_rsi_signals = inputs["macd_rsi_signals"]
+        fib_levels_near = inputs["fib_levels_near"]
+        candle_patterns_detected = inputs["candle_patterns"]
+
+        with scoring_stage:
+            signal_score = scoring_system.calculate_score(
+                current_trend_status,
+                current_macd_rsi_signals,
+                fib_levels_near,
+                candle_patterns_detected,
+                large_timeframe_trend, #type: ignore
+                atr_value # Pass ATR value
+            )
+
+        # identify_trend returns (trend, strength); the signal direction comes from the label
+        trend_label = scoring_system.trend_label(current_trend_status)
+
+        return {
+            "score": signal_score,
+            "details": scoring_system.interpret_score(signal_score), # type: ignore
+            "trend_direction": current_trend_status,
+            "trend_status": current_trend_status,
+            # Names of the MACD and RSI signals that fired, e.g. ["macd_golden_cross"]
+            "macd_status": [name for name, fired in current_macd_rsi_signals.items() if fired and name.startswith('macd_')],
+            "rsi_status": [name for name, fired in current_macd_rsi_signals.items() if fired and name.startswith('rsi_')],
+            "fib_levels_status": fib_levels_near,
+            "candle_patterns_status": candle_patterns_detected,
+            "signal_type": "BUY" if signal_score >= strong_score and trend_label == "uptrend" else "SELL" if signal_score >= strong_score and trend_label == "downtrend" else "NEUTRAL" # Basic signal type
+        }
+
+    def evaluate(self, df: pd.DataFrame, atr_value: float, large_timeframe_trend: str = None) -> dict:
+        """Scores the last row of ``df`` and returns the signal details."""
+        return self.score(self.signal_inputs(df), atr_value, large_timeframe_trend)
@@ -0,0 +1,305 @@
+"""Declarative scoring rules, compiled into a vectorized evaluator.
+
+A rule file (JSON, or YAML when PyYAML is installed) lists the score components, the
+conflicts that are deducted and the caps of the total:
+
+    {
+      "features": {"high_atr": {"column": "atr", "above": 5.0}},
+      "components": [
+        {"name": "trend", "when": ["uptrend", "downtrend"], "weight": 2, "scale": "trend_strength"},
+        {"name": "large_timeframe", "when": ["uptrend & large_uptrend", "downtrend & large_downtrend"], "weight": 2}
+      ],
+      "conflicts": [
+        {"name": "high_atr", "when": ["high_atr"], "weight": 1.0}
+      ],
+      "caps": {"min": 0, "max": 10}
+    }
+
+A component applies to a row when any of its ``when`` clauses holds; a clause is a
+conjunction of features joined by ``&``, each optionally negated with ``!``. Components add
+their weight (times ``1 + strength`` with ``"scale": "trend_strength"``, capped by an
+optional ``cap``), conflicts subtract it, in file order. ``DEFAULT_RULES`` reproduces
+ScoringSystem's weights, so both score every bar identically.
+"""
+import json
+import os
+from typing import Dict, Optional
+
+import numpy as np
+
+from signal_engine.scoring_system import ScoringSystem
+
+try:
+    import yaml
+except ImportError:  # Optional: only needed for .yaml/.yml rule files
+    yaml = None
+
+# Boolean features score_features derives from the indicator columns
+MACD_RSI_FEATURES = (
+    "macd_golden_cross", "macd_death_cross", "rsi_overbought", "rsi_oversold",
+    "rsi_bullish_divergence", "rsi_bearish_divergence",
+)
+BASE_FEATURES = ("uptrend", "downtrend", *MACD_RSI_FEATURES, "fib_near", "candle_pattern",
+                 "large_uptrend", "large_downtrend")
+# Numeric columns a rule file can define threshold features on
+THRESHOLD_COLUMNS = ("atr", "strength")
+SCALES = ("trend_strength",)
+
+DEFAULT_RULES = {
+    "features": {"high_atr": {"column": "atr", "above": 5.0}},
+    "components": [
+        {"name": "trend", "when": ["uptrend", "downtrend"], "weight": 2, "scale": "trend_strength"},
+        {"name": "macd_cross", "when": ["macd_golden_cross", "macd_death_cross"], "weight": 1.5},
+        {"name": "rsi_extreme", "when": ["rsi_overbought", "rsi_oversold"], "weight": 0.5},
+        {"name": "rsi_divergence", "when": ["rsi_bullish_divergence", "rsi_bearish_divergence"], "weight": 1.0},
+        {"name": "fib_level", "when": ["fib_near"], "weight": 2},
+        {"name": "candle_pattern", "when": ["candle_pattern"], "weight": 1.5},
+        {"name": "large_timeframe", "when": ["uptrend & large_uptrend", "downtrend & large_downtrend"], "weight": 2},
+    ],
+    "conflicts": [
+        {"name": "macd_conflict", "when": ["uptrend & macd_death_cross", "downtrend & macd_golden_cross"], "weight": 1.0},
+        {"name": "rsi_conflict", "when": ["uptrend & rsi_overbought", "downtrend & rsi_oversold"], "weight": 0.5},
+        {"name": "high_atr", "when": ["high_atr"], "weight": 1.0},
+    ],
+    "caps": {"min": 0, "max": 10},
+}
+
+
+def load_rules(path: str) -> dict:
+    """Reads a rule file; .yaml/.yml files need PyYAML, anything else is parsed as JSON."""
+    with open(path) as f:
+        if path.endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise ValueError("PyYAML is not installed")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def score_features(trend: np.ndarray, strength: np.ndarray, macd_rsi_signals: dict, fib_levels_near: np.ndarray,
+                   candle_patterns: dict, atr_value: np.ndarray, large_timeframe_trend=None) -> Dict[str, np.ndarray]:
+    """The indicator state every rule set is evaluated on, computed once per bar series.
+
+    Takes the same arrays as ScoringSystem.score_components.
+    """
+    n = len(trend)
+    any_pattern = np.zeros(n, dtype=bool)
+    for detected in candle_patterns.values():
+        any_pattern |= detected
+    if large_timeframe_trend is None:
+        large_timeframe_trend = "sideways"
+    large_timeframe_trend = np.asarray(large_timeframe_trend, dtype=object)
+    features = {
+        "uptrend": trend == "uptrend",
+        "downtrend": trend == "downtrend",
+        "fib_near": np.asarray(fib_levels_near, dtype=bool),
+        "candle_pattern": any_pattern,
+        "large_uptrend": np.broadcast_to(large_timeframe_trend == "uptrend", (n,)),
+        "large_downtrend": np.broadcast_to(large_timeframe_trend == "downtrend", (n,)),
+        "strength": strength,
+        "atr": atr_value,
+    }
+    for name in MACD_RSI_FEATURES:
+        features[name] = macd_rsi_signals[name]
+    return features
+
+
+class CompiledRules:
+    """A validated rule set, evaluated with one boolean mask per distinct clause.
+
+    Compiling parses every clause once; evaluating a series costs a few array operations
+    per clause and component, whatever the number of rows.
+    """
+
+    def __init__(self, rules: dict):
+        self.thresholds = {}
+        for name, spec in (rules.get("features") or {}).items():
+            if name in BASE_FEATURES:
+                raise ValueError(f"Feature {name} is built in")
+            if spec.get("column") not in THRESHOLD_COLUMNS:
+                raise ValueError(f"Feature {name}: column must be one of {', '.join(THRESHOLD_COLUMNS)}")
+            if ("above" in spec) == ("below" in spec):
+                raise ValueError(f"Feature {name}: give exactly one of above/below")
+            self.thresholds[name] = (spec["column"], "above" in spec, float(spec.get("above", spec.get("below"))))
+        self.components = []  # (name, clauses, signed weight, scale, cap)
+        for section, sign in (("components", 1), ("conflicts", -1)):
+            for rule in rules.get(section) or []:
+                self.components.append(self._compile_rule(rule, sign))
+        if not self.components:
+            raise ValueError("A rule set needs at least one component or conflict")
+        names = [component[0] for component in self.components]
+        if len(set(names)) != len(names):
+            raise ValueError("Component names must be unique")
+        caps = rules.get("caps") or {}
+        self.min_score = float(caps.get("min", -np.inf))
+        self.max_score = float(caps.get("max", np.inf))
+
+    def _compile_rule(self, rule: dict, sign: int) -> tuple:
+        name = rule.get("name")
+        if not name or "weight" not in rule:
+            raise ValueError(f"Every rule needs a name and a weight: {rule}")
+        when = rule.get("when") or []
+        if isinstance(when, str):
+            when = [when]
+        clauses = [self._parse_clause(clause) for clause in when]
+        if not clauses:
+            raise ValueError(f"Rule {name} has no conditions")
+        scale = rule.get("scale")
+        if scale is not None and scale not in SCALES:
+            raise ValueError(f"Rule {name}: unknown scale {scale}")
+        weight = float(rule["weight"])
+        cap = None if rule.get("cap") is None else float(rule["cap"])
+        if not np.isfinite(weight) or (cap is not None and np.isnan(cap)):
+            raise ValueError(f"Rule {name}: weight and cap must be numbers")
+        return name, clauses, sign * weight, scale, cap
+
+    def _parse_clause(self, clause: str) -> tuple:
+        terms = []
+        for term in clause.split("&"):
+            term = term.strip()
+            negated = term.startswith("!")
+            feature = term[1:].strip() if negated else term
+            if feature not in BASE_FEATURES and feature not in self.thresholds:
+                raise ValueError(f"Unknown feature: {feature}")
+            terms.append((feature, negated))
+        return tuple(sorted(terms))
+
+    def _feature(self, features: dict, name: str) -> np.ndarray:
+        if name in self.thresholds:
+            column, above, value = self.thresholds[name]
+            return features[column] > value if above else features[column] < value
+        return features[name]
+
+    def evaluate(self, features: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """What each component adds to every row (negative for conflicts), in rule order."""
+        masks = {}
+        components = {}
+        for name, clauses, weight, scale, cap in self.components:
+            applies = None
+            for clause in clauses:
+                if clause not in masks:
+                    mask = None
+                    for feature, negated in clause:
+                        values = self._feature(features, feature)
+                        values = ~values if negated else values
+                        mask = values if mask is None else mask & values
+                    masks[clause] = mask
+                applies = masks[clause] if applies is None else applies | masks[clause]
+            value = weight * (1 + features["strength"]) if scale == "trend_strength" else weight
+            if cap is not None:
+                value = np.minimum(value, cap)
+            components[name] = np.where(applies, value, 0.0)
+        return components
+
+    def total(self, components: Dict[str, np.ndarray]) -> np.ndarray:
+        score = None
+        for contribution in components.values():
+            score = contribution if score is None else score + contribution
+        return np.maximum(self.min_score, np.minimum(self.max_score, score))
+
+    def check(self):
+        """Scores a bar with no feature set and one with all set, both ways; raises if either fails."""
+        for flag in (False, True):
+            row = {name: flag for name in BASE_FEATURES}
+            row.update({"strength": float(flag), "atr": 100.0 if flag else 0.0})
+            series = {name: np.array([value]) for name, value in row.items()}
+            scores = (self.score_row(row), float(self.total(self.evaluate(series))[0]))
+            if not (np.isfinite(scores[0]) and scores[0] == scores[1]):
+                raise ValueError(f"Rules score a test bar as {scores}")
+
+    def score_row(self, features: dict) -> float:
+        """evaluate + total for one bar of plain Python values.
+
+        Skips the per-call overhead of one-element arrays; the arithmetic is the same
+        double-precision operations in the same order, so the result is identical.
+        """
+        score = None
+        for _, clauses, weight, scale, cap in self.components:
+            applies = any(all(bool(self._feature(features, feature)) != negated for feature, negated in clause)
+                          for clause in clauses)
+            value = weight * (1 + features["strength"]) if scale == "trend_strength" else weight
+            if cap is not None:
+                value = min(value, cap)
+            contribution = value if applies else 0.0
+            score = contribution if score is None else score + contribution
+        return float(max(self.min_score, min(self.max_score, score)))
+
+
+class RuleScoringSystem(ScoringSystem):
+    """ScoringSystem driven by a rule file instead of hard-coded weights.
+
+    ``reload_if_changed`` re-reads the file when its modification time changes, so the
+    trading task picks up new rules on its next cycle. A file that fails to load or
+    validate, or that disappears, is reported and the previous rules stay in effect. A
+    ``path`` that does not exist at construction is an error, not a fallback to the
+    default rules.
+    """
+
+    def __init__(self, path: Optional[str] = None, rules: Optional[dict] = None):
+        self.path = path
+        self.mtime = None
+        self.version = 0
+        self.missing = False  # The file disappeared after it was loaded; reported once
+        self.rules = rules if rules is not None else DEFAULT_RULES
+        self.compiled = CompiledRules(self.rules)
+        self.compiled.check()
+        if path is not None:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Scoring rules file not found: {path}")
+            self.reload_if_changed()
+
+    @property
+    def weights(self) -> Dict[str, float]:
+        return {name: abs(weight) for name, _, weight, _, _ in self.compiled.components}
+
+    def reload_if_changed(self) -> bool:
+        """Reloads the rule file if it changed since the last load. Returns True if reloaded."""
+        if self.path is None:
+            return False
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            if not self.missing:
+                self.missing = True
+                print(f"Scoring rules file {self.path} disappeared; keeping version {self.version} until it is back.")
+            return False
+        self.missing = False
+        if mtime == self.mtime:
+            return False
+        self.mtime = mtime
+        try:
+            rules = load_rules(self.path)
+            compiled = CompiledRules(rules)
+            compiled.check()  # Swap in only rules that can score
+        except Exception as e:
+            print(f"Error loading scoring rules from {self.path}: {e}")
+            return False
+        self.rules, self.compiled = rules, compiled
+        self.version += 1
+        print(f"Scoring rules loaded from {self.path} (version {self.version}).")
+        return True
+
+    def score_components(self, trend: np.ndarray, strength: np.ndarray, macd_rsi_signals: dict,
+                         fib_levels_near: np.ndarray, candle_patterns: dict, atr_value: np.ndarray,
+                         large_timeframe_trend=None) -> Dict[str, np.ndarray]:
+        return self.compiled.evaluate(score_features(trend, strength, macd_rsi_signals, fib_levels_near,
+                                                     candle_patterns, atr_value, large_timeframe_trend))
+
+    def total_score(self, components: Dict[str, np.ndarray]) -> np.ndarray:
+        return self.compiled.total(components)
+
+    def calculate_score(self, trend_status, macd_rsi_signals: dict, fib_levels_near: list, candle_patterns: dict,
+                        large_timeframe_trend: str, atr_value: float):
+        """Scores one bar with the same rules and arithmetic as the vectorized path."""
+        trend, strength = trend_status if isinstance(trend_status, tuple) else (trend_status, 0.0)
+        features = {name: bool(macd_rsi_signals.get(name)) for name in MACD_RSI_FEATURES}
+        features.update({
+            "uptrend": trend == "uptrend",
+            "downtrend": trend == "downtrend",
+            "fib_near": bool(fib_levels_near),
+            "candle_pattern": bool(candle_patterns),
+            "large_uptrend": large_timeframe_trend == "uptrend",
+            "large_downtrend": large_timeframe_trend == "downtrend",
+            "strength": float(strength),
+            "atr": float(atr_value),
+        })
+        return self.compiled.score_row(features)
@@ -1,71 +1,153 @@
+from typing import Dict
+
+import numpy as np
+
+
 class ScoringSystem:
-    def calculate_score(self, trend_status: str, macd_rsi_signals: dict, fib_levels_near: list, candle_patterns: dict, large_timeframe_trend: str, atr_value: float):
+    DEFAULT_WEIGHTS = {
+        'trend': 2,
+        'macd_cross': 1.5,
+        'rsi_extreme': 0.5,
+        'rsi_divergence': 1.0,
+        'fib_level': 2,
+        'candle_pattern': 1.5,
+        'large_timeframe': 2,
+        'macd_conflict': 1.0,
+        'rsi_conflict': 0.5,
+        'high_atr': 1.0,
+    }
+
+    def __init__(self, weights: dict = None, high_atr_threshold: float = 5.0):
+        self.weights = {**self.DEFAULT_WEIGHTS, **(weights or {})}
+        self.high_atr_threshold = high_atr_threshold
+
+    @staticmethod
+    def trend_label(trend_status) -> str:
+        """The trend label of identify_trend's (trend, strength) tuple, or of a plain label."""
+        return trend_status[0] if isinstance(trend_status, tuple) else trend_status
+
+    def calculate_score(self, trend_status, macd_rsi_signals: dict, fib_levels_near: list, candle_patterns: dict, large_timeframe_trend: str, atr_value: float):
         """Calculates a signal score based on various factors."""
         score = 0
+        weights = self.weights
+        # identify_trend returns (trend, strength); the checks below compare the label
+        trend = self.trend_label(trend_status)
 
         # Trend direction confirmation with strength
         if isinstance(trend_status, tuple):  # New format returns (trend, strength)
-            trend, strength = trend_status
+            strength = trend_status[1]
             if trend == "uptrend":
-                score += 2 * (1 + strength)  # Scale score by trend strength
+                score += weights['trend'] * (1 + strength)  # Scale score by trend strength
             elif trend == "downtrend":
-                score += 2 * (1 + strength)
+                score += weights['trend'] * (1 + strength)
 
         # Short-term momentum (MACD)
         if macd_rsi_signals.get('macd_golden_cross'):
-            score += 1.5
+            score += weights['macd_cross']
         elif macd_rsi_signals.get('macd_death_cross'):
-            score += 1.5
+            score += weights['macd_cross']
 
         # RSI signals
         if macd_rsi_signals.get('rsi_overbought') or macd_rsi_signals.get('rsi_oversold'):
              # Basic scoring for overbought/oversold, will need refinement based on strategy
-            score += 0.5 # Reduced score for just overbought/oversold without divergence
+            score += weights['rsi_extreme'] # Reduced score for just overbought/oversold without divergence
         # Add scoring for RSI divergence
         if macd_rsi_signals.get('rsi_bullish_divergence'):
-            score += 1.0 # Example score for bullish divergence
+            score += weights['rsi_divergence'] # Example score for bullish divergence
         elif macd_rsi_signals.get('rsi_bearish_divergence'):
-            score += 1.0 # Example score for bearish divergence
+            score += weights['rsi_divergence'] # Example score for bearish divergence
 
 
         # Fibonacci support/resistance
         if fib_levels_near:
-            score += 2
+            score += weights['fib_level']
 
         # Candle patterns
         if candle_patterns:
-            score += 1.5
+            score += weights['candle_pattern']
 
         # Large timeframe support
-        if (trend_status == "uptrend" and large_timeframe_trend == "uptrend") or \
-           (trend_status == "downtrend" and large_timeframe_trend == "downtrend"):
-            score += 2
+        if (trend == "uptrend" and large_timeframe_trend == "uptrend") or \
+           (trend == "downtrend" and large_timeframe_trend == "downtrend"):
+            score += weights['large_timeframe']
 
         # Deductions for conflicting signals or extreme volatility
         # Implement logic for deducting points based on conflicting signals or high ATR (simplified)
         # Deduct if MACD and Vegas Tunnel trends conflict
-        if (trend_status == "uptrend" and macd_rsi_signals.get('macd_death_cross')) or \
-           (trend_status == "downtrend" and macd_rsi_signals.get('macd_golden_cross')):
-            score -= 1.0 # Example deduction
+        if (trend == "uptrend" and macd_rsi_signals.get('macd_death_cross')) or \
+           (trend == "downtrend" and macd_rsi_signals.get('macd_golden_cross')):
+            score -= weights['macd_conflict'] # Example deduction
 
         # Deduct if RSI is overbought in uptrend or oversold in downtrend (potential reversal)
-        if (trend_status == "uptrend" and macd_rsi_signals.get('rsi_overbought')) or \
-           (trend_status == "downtrend" and macd_rsi_signals.get('rsi_oversold')):
-            score -= 0.5 # Example deduction
+        if (trend == "uptrend" and macd_rsi_signals.get('rsi_overbought')) or \
+           (trend == "downtrend" and macd_rsi_signals.get('rsi_oversold')):
+            score -= weights['rsi_conflict'] # Example deduction
 
         # Add deduction based on high ATR (requires ATR value as input)
         # TODO: Define a proper threshold for high ATR (e.g., relative to average price or historical ATR)
-        high_atr_threshold = 5.0 # Example threshold
-        pass # Placeholder for proper threshold
-
-        if atr_value > high_atr_threshold:
-            score -= 1.0 # Example deduction for high volatility
+        if atr_value > self.high_atr_threshold:
+            score -= weights['high_atr'] # Example deduction for high volatility
 
         # Ensure score is within 0-10 range
         score = max(0, min(10, score))
 
         return score
 
+    def score_components(self, trend: np.ndarray, strength: np.ndarray, macd_rsi_signals: dict,
+                         fib_levels_near: np.ndarray, candle_patterns: dict, atr_value: np.ndarray,
+                         large_timeframe_trend=None) -> Dict[str, np.ndarray]:
+        """Vectorized calculate_score, split into what each component adds to every row.
+
+        Takes the arrays from identify_trend_series, signal_columns, near_level_series and
+        pattern_columns (plus, optionally, the large-timeframe trend label of each row or one
+        label for all of them). Deductions are negative. The components are in the order the
+        scalar path adds them, and adding 0.0 is exact, so ``total_score`` reproduces the
+        scalar score bit for bit.
+        """
+        weights = self.weights
+        n = len(trend)
+        up = trend == "uptrend"
+        down = trend == "downtrend"
+        golden_cross = macd_rsi_signals['macd_golden_cross']
+        death_cross = macd_rsi_signals['macd_death_cross']
+        overbought = macd_rsi_signals['rsi_overbought']
+        oversold = macd_rsi_signals['rsi_oversold']
+        any_pattern = np.zeros(n, dtype=bool)
+        for detected in candle_patterns.values():
+            any_pattern |= detected
+        if large_timeframe_trend is None:
+            aligned = np.zeros(n, dtype=bool)
+        else:
+            large_timeframe_trend = np.asarray(large_timeframe_trend, dtype=object)
+            aligned = (up & (large_timeframe_trend == "uptrend")) | (down & (large_timeframe_trend == "downtrend"))
+        return {
+            'trend': np.where(up | down, weights['trend'] * (1 + strength), 0.0),
+            'macd_cross': np.where(golden_cross | death_cross, weights['macd_cross'], 0.0),
+            'rsi_extreme': np.where(overbought | oversold, weights['rsi_extreme'], 0.0),
+            'rsi_divergence': np.where(macd_rsi_signals['rsi_bullish_divergence'] | macd_rsi_signals['rsi_bearish_divergence'],
+                                       weights['rsi_divergence'], 0.0),
+            'fib_level': np.where(fib_levels_near, weights['fib_level'], 0.0),
+            'candle_pattern': np.where(any_pattern, weights['candle_pattern'], 0.0),
+            'large_timeframe': np.where(aligned, weights['large_timeframe'], 0.0),
+            'macd_conflict': np.where((up & death_cross) | (down & golden_cross), -weights['macd_conflict'], 0.0),
+            'rsi_conflict': np.where((up & overbought) | (down & oversold), -weights['rsi_conflict'], 0.0),
+            'high_atr': np.where(atr_value > self.high_atr_threshold, -weights['high_atr'], 0.0),
+        }
+
+    @staticmethod
+    def total_score(components: Dict[str, np.ndarray]) -> np.ndarray:
+        """Sums score_components in order and clips to 0-10 like calculate_score."""
+        score = None
+        for contribution in components.values():
+            score = contribution if score is None else score + contribution
+        return np.maximum(0, np.minimum(10, score))
+
+    def calculate_scores(self, trend: np.ndarray, strength: np.ndarray, macd_rsi_signals: dict, fib_levels_near: np.ndarray,
+                         candle_patterns: dict, atr_value: np.ndarray, large_timeframe_trend=None) -> np.ndarray:
+        """Vectorized calculate_score for every row (see score_components)."""
+        return self.total_score(self.score_components(trend, strength, macd_rsi_signals, fib_levels_near,
+                                                      candle_patterns, atr_value, large_timeframe_trend))
+
     def interpret_score(self, score: float):
         """Interprets the score to provide action advice."""
         if score >= 8:
@@ -0,0 +1,252 @@
+import math
+from collections import deque
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+
+NAN = float("nan")
+
+
+class EmaState:
+    """Exponential moving average updated one value at a time.
+
+    Matches ``Series.ewm(span=span, adjust=False).mean()``. With ``sma_seed`` the first
+    ``span`` values are averaged to seed the EMA, which is what ``pandas_ta.ema`` does.
+    """
+
+    def __init__(self, span: int, sma_seed: bool = False):
+        self.span = span
+        self.alpha = 2.0 / (span + 1)
+        self.sma_seed = sma_seed
+        self.count = 0
+        self.value = NAN
+        self._seed_sum = 0.0
+
+    def update(self, x: float) -> float:
+        self.count += 1
+        if self.sma_seed and self.count <= self.span:
+            self._seed_sum += x
+            if self.count == self.span:
+                self.value = self._seed_sum / self.span
+            return self.value
+        if math.isnan(self.value):
+            self.value = x
+        else:
+            self.value = (1 - self.alpha) * self.value + self.alpha * x
+        return self.value
+
+    def state(self) -> dict:
+        return {"count": self.count, "value": self.value, "seed_sum": self._seed_sum}
+
+    def load_state(self, state: dict):
+        self.count = state["count"]
+        self.value = state["value"]
+        self._seed_sum = state["seed_sum"]
+
+
+class RmaState:
+    """Wilder's moving average as computed by ``pandas_ta.rma``.
+
+    ``pandas_ta`` uses ``ewm(alpha=1/length, min_periods=length)`` with the default
+    ``adjust=True``, so the running numerator and denominator are kept separately.
+    """
+
+    def __init__(self, length: int):
+        self.length = length
+        self.decay = 1.0 - 1.0 / length
+        self.count = 0
+        self._num = 0.0
+        self._den = 0.0
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        self.count += 1
+        self._num = x + self.decay * self._num
+        self._den = 1.0 + self.decay * self._den
+        if self.count >= self.length:
+            self.value = self._num / self._den
+        return self.value
+
+    def state(self) -> dict:
+        return {"count": self.count, "num": self._num, "den": self._den, "value": self.value}
+
+    def load_state(self, state: dict):
+        self.count = state["count"]
+        self._num = state["num"]
+        self._den = state["den"]
+        self.value = state["value"]
+
+
+class MacdState:
+    """MACD line, signal and histogram (``pandas_ta.macd`` without TA-Lib)."""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = EmaState(fast, sma_seed=True)
+        self.slow = EmaState(slow, sma_seed=True)
+        self.signal = EmaState(signal, sma_seed=True)
+        self.macd = NAN
+        self.signal_value = NAN
+        self.histogram = NAN
+
+    def update(self, close: float):
+        fast = self.fast.update(close)
+        slow = self.slow.update(close)
+        self.macd = fast - slow
+        if not math.isnan(self.macd):
+            self.signal_value = self.signal.update(self.macd)
+            self.histogram = self.macd - self.signal_value
+        return self.macd, self.histogram, self.signal_value
+
+    def state(self) -> dict:
+        return {"fast": self.fast.state(), "slow": self.slow.state(), "signal": self.signal.state(),
+                "macd": self.macd, "signal_value": self.signal_value, "histogram": self.histogram}
+
+    def load_state(self, state: dict):
+        self.fast.load_state(state["fast"])
+        self.slow.load_state(state["slow"])
+        self.signal.load_state(state["signal"])
+        self.macd = state["macd"]
+        self.signal_value = state["signal_value"]
+        self.histogram = state["histogram"]
+
+
+class RsiState:
+    """Wilder RSI (``pandas_ta.rsi``)."""
+
+    def __init__(self, length: int = 14):
+        self.gain = RmaState(length)
+        self.loss = RmaState(length)
+        self.prev_close = NAN
+        self.value = NAN
+
+    def update(self, close: float) -> float:
+        if not math.isnan(self.prev_close):
+            change = close - self.prev_close
+            avg_gain = self.gain.update(max(change, 0.0))
+            avg_loss = self.loss.update(max(-change, 0.0))
+            total = avg_gain + avg_loss
+            self.value = 100.0 * avg_gain / total if total else NAN
+        self.prev_close = close
+        return self.value
+
+    def state(self) -> dict:
+        return {"gain": self.gain.state(), "loss": self.loss.state(),
+                "prev_close": self.prev_close, "value": self.value}
+
+    def load_state(self, state: dict):
+        self.gain.load_state(state["gain"])
+        self.loss.load_state(state["loss"])
+        self.prev_close = state["prev_close"]
+        self.value = state["value"]
+
+
+class AtrState:
+    """Average True Range smoothed with Wilder's RMA (``pandas_ta.atr``)."""
+
+    def __init__(self, length: int = 14):
+        self.rma = RmaState(length)
+        self.prev_close = NAN
+        self.value = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        if not math.isnan(self.prev_close):
+            true_range = max(abs(high - low), abs(high - self.prev_close), abs(low - self.prev_close))
+            self.value = self.rma.update(true_range)
+        self.prev_close = close
+        return self.value
+
+    def state(self) -> dict:
+        return {"rma": self.rma.state(), "prev_close": self.prev_close, "value": self.value}
+
+    def load_state(self, state: dict):
+        self.rma.load_state(state["rma"])
+        self.prev_close = state["prev_close"]
+        self.value = state["value"]
+
+
+class StreamingIndicatorEngine:
+    """Keeps the Vegas EMAs, MACD, RSI and ATR up to date one closed candle at a time.
+
+    Column names follow the ones produced by ``VegasTunnel.calculate_emas`` and pandas_ta,
+    so ``frame()`` can be handed to the existing ``identify_trend`` / ``check_signals`` code.
+    """
+
+    def __init__(self, ema_spans: Iterable[int], macd_fast: int = 12, macd_slow: int = 26, macd_signal: int = 9,
+                 rsi_length: int = 14, atr_length: int = 14, history: int = 100):
+        self.emas = {span: EmaState(span) for span in sorted(set(ema_spans))}
+        self.macd = MacdState(macd_fast, macd_slow, macd_signal)
+        self.rsi = RsiState(rsi_length)
+        self.atr = AtrState(atr_length)
+        macd_suffix = f"{macd_fast}_{macd_slow}_{macd_signal}"
+        self.macd_column = f"MACD_{macd_suffix}"
+        self.macd_hist_column = f"MACDh_{macd_suffix}"
+        self.macd_signal_column = f"MACDs_{macd_suffix}"
+        self.rsi_column = f"RSI_{rsi_length}"
+        self.atr_column = f"ATRr_{atr_length}"
+        self.rows = deque(maxlen=history)
+        self.last_timestamp = None
+
+    def update(self, candle: dict) -> dict:
+        """Feeds one closed candle and returns its row with all indicator values."""
+        close = float(candle["close"])
+        row = {
+            "timestamp": candle["timestamp"],
+            "open": float(candle["open"]),
+            "high": float(candle["high"]),
+            "low": float(candle["low"]),
+            "close": close,
+            "volume": float(candle["volume"]),
+        }
+        for span, ema in self.emas.items():
+            row[f"EMA_{span}"] = ema.update(close)
+        macd, histogram, signal = self.macd.update(close)
+        row[self.macd_column] = macd
+        row[self.macd_hist_column] = histogram
+        row[self.macd_signal_column] = signal
+        row[self.rsi_column] = self.rsi.update(close)
+        row[self.atr_column] = self.atr.update(row["high"], row["low"], close)
+        self.rows.append(row)
+        self.last_timestamp = candle["timestamp"]
+        return row
+
+    def update_many(self, candles: Iterable[dict]) -> Optional[dict]:
+        """Feeds candles in order, skipping any that are not newer than the last one seen."""
+        row = None
+        for candle in candles:
+            if self.last_timestamp is not None and candle["timestamp"] <= self.last_timestamp:
+                continue
+            row = self.update(candle)
+        return row
+
+    def update_from_frame(self, data: pd.DataFrame) -> Optional[dict]:
+        """Feeds the rows of an OHLCV DataFrame that are newer than the last candle seen."""
+        return self.update_many(data.to_dict("records"))
+
+    def latest(self) -> Dict[str, float]:
+        return dict(self.rows[-1]) if self.rows else {}
+
+    def frame(self) -> pd.DataFrame:
+        """Returns the recent rows (OHLCV plus indicator columns) as a DataFrame."""
+        return pd.DataFrame(list(self.rows))
+
+    def state(self) -> dict:
+        """Serialisable snapshot of every indicator state."""
+        return {
+            "emas": {str(span): ema.state() for span, ema in self.emas.items()},
+            "macd": self.macd.state(),
+            "rsi": self.rsi.state(),
+            "atr": self.atr.state(),
+            "last_timestamp": self.last_timestamp,
+            "rows": list(self.rows),
+        }
+
+    def load_state(self, state: dict):
+        for span, ema_state in state["emas"].items():
+            if int(span) in self.emas:
+                self.emas[int(span)].load_state(ema_state)
+        self.macd.load_state(state["macd"])
+        self.rsi.load_state(state["rsi"])
+        self.atr.load_state(state["atr"])
+        self.last_timestamp = state["last_timestamp"]
+        self.rows.clear()
+        self.rows.extend(state.get("rows", []))
@@ -1,27 +1,26 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 
 class VegasTunnel:
     def __init__(self, ema_short=85, ema_medium=144, ema_long=169):
         self.ema_short = ema_short
         self.ema_medium = ema_medium 
         self.ema_long = ema_long
-        self.timeframe_ratios = [1, 4, 16]  # 1m, 4m, 16m timeframes
+
+    def ema_spans(self) -> List[int]:
+        """Returns the EMA spans of the tunnel.
+
+        Higher timeframes get the same spans on their own resampled candles (see
+        market_data.resampler) instead of multiplied spans on the base timeframe.
+        """
+        return [self.ema_short, self.ema_medium, self.ema_long]
 
     def calculate_emas(self, data: pd.DataFrame) -> pd.DataFrame:
-        """Calculates EMAs for all configured timeframes"""
-        for ratio in self.timeframe_ratios:
-            span_short = self.ema_short * ratio
-            span_medium = self.ema_medium * ratio
-            span_long = self.ema_long * ratio
-            
-            data[f'EMA_{span_short}'] = data['close'].ewm(
-                span=span_short, adjust=False).mean()
-            data[f'EMA_{span_medium}'] = data['close'].ewm(
-                span=span_medium, adjust=False).mean()
-            data[f'EMA_{span_long}'] = data['close'].ewm(
-                span=span_long, adjust=False).mean()
+        """Calculates the tunnel EMAs"""
+        for span in self.ema_spans():
+            data[f'EMA_{span}'] = data['close'].ewm(
+                span=span, adjust=False).mean()
         return data
 
     def calculate_trend_strength(self, data: pd.DataFrame) -> float:
@@ -50,11 +49,36 @@ class VegasTunnel:
             
         return trend, strength
 
+    def identify_trend_series(self, data: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized identify_trend: trend label and strength for every row"""
+        ema_short = data[f'EMA_{self.ema_short}'].to_numpy()
+        ema_medium = data[f'EMA_{self.ema_medium}'].to_numpy()
+        ema_long = data[f'EMA_{self.ema_long}'].to_numpy()
+        up = (ema_short > ema_medium) & (ema_medium > ema_long)
+        down = (ema_short < ema_medium) & (ema_medium < ema_long) & ~up
+        trend = np.where(up, "uptrend", np.where(down, "downtrend", "sideways")).astype(object)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            strength = np.where(up, np.minimum(1.0, (ema_short - ema_long) / ema_long * 0.1),
+                                np.where(down, np.minimum(1.0, (ema_long - ema_short) / ema_short * 0.1), 0.0))
+        return trend, strength
+
+    def calculate_large_timeframe_trend(self, data: pd.DataFrame) -> str:
+        """Trend label of a higher-timeframe candle frame (e.g. the 4h indicator engine's).
+
+        Returns "sideways" until the frame has every tunnel EMA.
+        """
+        if len(data) == 0:
+            return "sideways"
+        if not self.validate_emas(data):
+            data = self.calculate_emas(data.copy())
+        if data[[f'EMA_{span}' for span in self.ema_spans()]].iloc[-1].isna().any():
+            return "sideways"
+        return self.identify_trend(data)[0]
+
     def validate_emas(self, data: pd.DataFrame) -> bool:
         """Validates EMA calculations"""
-        for ratio in self.timeframe_ratios:
-            span_short = self.ema_short * ratio
-            if f'EMA_{span_short}' not in data.columns:
+        for span in self.ema_spans():
+            if f'EMA_{span}' not in data.columns:
                 return False
         return True
 
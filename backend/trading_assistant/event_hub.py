@@ -0,0 +1,82 @@
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Optional, Set
+
+
+def _to_json(value):
+    """json.dumps fallback for NumPy scalars, tuples of them and other leftovers."""
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+class Subscriber:
+    """One connected client: a bounded buffer of serialized events.
+
+    When the client falls behind, the oldest events are dropped (and counted) instead of
+    making the publisher wait.
+    """
+
+    def __init__(self, buffer_size: int):
+        self.events = deque(maxlen=buffer_size)
+        self.dropped = 0
+        self._ready = asyncio.Event()
+        self.closed = False
+
+    def push(self, message: str):
+        if len(self.events) == self.events.maxlen:
+            self.dropped += 1
+        self.events.append(message)
+        self._ready.set()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Returns the next event, or None if ``timeout`` passes (or the hub closes) first."""
+        if not self.events:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if not self.events:
+            return None
+        return self.events.popleft()
+
+
+class EventHub:
+    """In-memory fan-out of live events (signals, price ticks, stop adjustments) to push clients.
+
+    ``publish`` serializes an event once and appends it to every subscriber's buffer
+    without awaiting, so the trading loop never waits on a client.
+    """
+
+    def __init__(self, buffer_size: int = 256):
+        self.buffer_size = buffer_size
+        self.subscribers: Set[Subscriber] = set()
+        self.stats = {"published": 0, "delivered": 0}
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber(self.buffer_size)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        subscriber.closed = True
+        self.subscribers.discard(subscriber)
+
+    def publish(self, event_type: str, data: dict):
+        message = json.dumps({"type": event_type, "time": time.time(), "data": data}, default=_to_json)
+        self.stats["published"] += 1
+        for subscriber in self.subscribers:
+            subscriber.push(message)
+            self.stats["delivered"] += 1
+
+    def close(self):
+        for subscriber in list(self.subscribers):
+            self.unsubscribe(subscriber)
+            subscriber._ready.set()
+
+    @property
+    def dropped(self) -> int:
+        return sum(subscriber.dropped for subscriber in self.subscribers)
@@ -0,0 +1,205 @@
+import cProfile
+import io
+import os
+import pstats
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import pyinstrument
+except ImportError:  # Optional: only needed for profile captures with mode="pyinstrument"
+    pyinstrument = None
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class StageHistogram:
+    """Latency of one stage: lifetime count and sum plus a rolling window for quantiles."""
+
+    def __init__(self, window: int = 1000):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+
+    def observe(self, seconds: float):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+
+    def quantiles(self) -> Dict[float, float]:
+        if not self.samples:
+            return {q: float("nan") for q in QUANTILES}
+        values = np.quantile(np.fromiter(self.samples, dtype=float), QUANTILES)
+        return dict(zip(QUANTILES, values.tolist()))
+
+    def summary(self) -> dict:
+        return {"count": self.count, "sum": self.total, "last": self.last,
+                **{f"p{int(q * 100)}": value for q, value in self.quantiles().items()}}
+
+
+class CycleMetrics:
+    """Per-stage timers for the trading cycle and the tasks around it.
+
+    Stages are timed with ``stage(name)`` (a context manager that also works around
+    ``await``) or ``observe``. ``render`` writes them as Prometheus summaries with
+    p50/p95/p99 over the last ``window`` samples, plus the gauges returned by the
+    registered collectors (queue depths, counters kept by other components).
+    """
+
+    def __init__(self, window: int = 1000, namespace: str = "trading", profile_dir: str = "data/profiles"):
+        self.window = window
+        self.namespace = namespace
+        self.stages: Dict[str, StageHistogram] = {}
+        self.collectors: List[Callable[[], Dict[str, float]]] = []
+        self.cycles = 0
+        self.profiler = CycleProfiler(profile_dir)
+
+    def observe(self, name: str, seconds: float):
+        histogram = self.stages.get(name)
+        if histogram is None:
+            histogram = self.stages[name] = StageHistogram(self.window)
+        histogram.observe(seconds)
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    async def timed(self, name: str, awaitable):
+        """Awaits ``awaitable`` and records how long it took, e.g. inside asyncio.gather."""
+        with self.stage(name):
+            return await awaitable
+
+    @contextmanager
+    def cycle(self):
+        """Times one full cycle and runs the profiler over it while a capture is active."""
+        self.profiler.begin()
+        try:
+            with self.stage("cycle"):
+                yield
+        finally:
+            self.cycles += 1
+            self.profiler.end()
+
+    def add_collector(self, collector: Callable[[], Dict[str, float]]):
+        self.collectors.append(collector)
+
+    def summary(self) -> dict:
+        return {name: histogram.summary() for name, histogram in sorted(self.stages.items())}
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        name = f"{self.namespace}_stage_seconds"
+        lines = [f"# HELP {name} Latency of each trading stage, quantiles over the last {self.window} samples.",
+                 f"# TYPE {name} summary"]
+        for stage, histogram in sorted(self.stages.items()):
+            for q, value in histogram.quantiles().items():
+                lines.append(f'{name}{{stage="{stage}",quantile="{q}"}} {value!r}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.total!r}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+        lines.append(f"# TYPE {self.namespace}_cycles_total counter")
+        lines.append(f"{self.namespace}_cycles_total {self.cycles}")
+        for collector in self.collectors:
+            try:
+                gauges = collector()
+            except Exception as e:
+                print(f"Error collecting metrics: {e}")
+                continue
+            for gauge, value in sorted(gauges.items()):
+                metric = f"{self.namespace}_{gauge}"
+                lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"{metric} {float(value)!r}")
+        return "\n".join(lines) + "\n"
+
+
+def stage(metrics: Optional[CycleMetrics], name: str):
+    """``metrics.stage(name)``, or a no-op when a component runs without metrics."""
+    return metrics.stage(name) if metrics is not None else nullcontext()
+
+
+class CycleProfiler:
+    """Profiles the next ``cycles`` trading cycles on request.
+
+    cProfile (or pyinstrument, when installed) runs only between ``begin`` and ``end`` of
+    those cycles. Everything the event loop runs in that time is included, so the other
+    tasks show up alongside the cycle. The result is written to ``output_dir`` and the
+    top functions are kept in ``report``.
+    """
+
+    def __init__(self, output_dir: str = "data/profiles"):
+        self.output_dir = output_dir
+        self.mode = "cprofile"
+        self.remaining = 0
+        self.captured = 0
+        self.report: Optional[str] = None
+        self.path: Optional[str] = None
+        self._profiler = None
+
+    @property
+    def active(self) -> bool:
+        return self.remaining > 0 or self._profiler is not None
+
+    def start(self, cycles: int, mode: str = "cprofile"):
+        if mode not in ("cprofile", "pyinstrument"):
+            raise ValueError(f"Unknown profiler: {mode}")
+        if mode == "pyinstrument" and pyinstrument is None:
+            raise ValueError("pyinstrument is not installed")
+        if self._profiler is not None:
+            raise ValueError("A capture is already running")
+        self.mode = mode
+        self.remaining = cycles
+        self.captured = 0
+        self.report = None
+        self.path = None
+
+    def begin(self):
+        if self.remaining <= 0:
+            return
+        if self._profiler is None:
+            self._profiler = cProfile.Profile() if self.mode == "cprofile" else pyinstrument.Profiler(async_mode="disabled")
+        if self.mode == "cprofile":
+            self._profiler.enable()
+        else:
+            self._profiler.start()
+
+    def end(self):
+        if self._profiler is None or self.remaining <= 0:
+            return
+        if self.mode == "cprofile":
+            self._profiler.disable()
+        else:
+            self._profiler.stop()
+        self.remaining -= 1
+        self.captured += 1
+        if self.remaining == 0:
+            self._finish()
+
+    def _finish(self):
+        profiler, self._profiler = self._profiler, None
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        if self.mode == "cprofile":
+            self.path = os.path.join(self.output_dir, f"cycles-{stamp}.prof")
+            profiler.dump_stats(self.path)
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(30)
+            self.report = out.getvalue()
+        else:
+            self.path = os.path.join(self.output_dir, f"cycles-{stamp}.html")
+            with open(self.path, "w") as f:
+                f.write(profiler.output_html())
+            self.report = profiler.output_text()
+        print(f"Profile of {self.captured} cycles written to {self.path}")
+
+    def status(self) -> dict:
+        return {"active": self.active, "mode": self.mode, "remaining": self.remaining,
+                "captured": self.captured, "path": self.path, "report": self.report}
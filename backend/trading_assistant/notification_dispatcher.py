@@ -0,0 +1,159 @@
+import asyncio
+import itertools
+from collections import OrderedDict
+from typing import List, Optional
+
+from telegram.error import BadRequest, Forbidden, InvalidToken, RetryAfter, TelegramError
+
+from gateio_client.rate_limiter import AsyncRateLimiter
+from trading_assistant.metrics import stage
+
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+
+
+class NotificationDispatcher:
+    """Background sender for Telegram messages.
+
+    ``enqueue`` only appends to a bounded queue, so the trading loop never waits for the
+    Telegram API. The sender collects everything queued within ``coalesce_window`` into
+    one message. Messages enqueued with the same ``key`` replace each other, so a burst of
+    stop adjustments for one position arrives as its latest state. Sends are paced by a
+    token bucket below Telegram's per-chat limit. A 429 waits the ``retry_after`` the API
+    asks for; network errors retry with exponential backoff.
+    """
+
+    def __init__(self, bot, chat_id: str, max_queue: int = 1000, rate: float = 1.0, burst: int = 3,
+                 coalesce_window: float = 2.0, max_retries: int = 5, backoff: float = 1.0, max_backoff: float = 60.0,
+                 metrics=None):
+        self.bot = bot
+        self.metrics = metrics  # Optional CycleMetrics; records each API call as "telegram_send"
+        self.chat_id = chat_id
+        self.coalesce_window = coalesce_window
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self.rate_limiter = AsyncRateLimiter(rate, burst)
+        self.stats = {
+            "queued": 0, "dropped": 0, "coalesced": 0,  # Notifications
+            "sent": 0, "failed": 0, "api_calls": 0, "retries": 0,  # Telegram messages
+        }
+        self._sequence = itertools.count()
+        self._initialized = False
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = False
+
+    def enqueue(self, text: str, key: Optional[str] = None) -> bool:
+        """Queues a message without waiting. Returns False (counted as dropped) if the queue is full."""
+        try:
+            self.queue.put_nowait((key, text))
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            return False
+        self.stats["queued"] += 1
+        return True
+
+    def _drain(self, pending: "OrderedDict"):
+        while True:
+            try:
+                key, text = self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            self._add(pending, key, text)
+
+    def _add(self, pending: "OrderedDict", key: Optional[str], text: str):
+        if key is None:
+            key = ("unkeyed", next(self._sequence))
+        elif key in pending:
+            self.stats["coalesced"] += 1
+            del pending[key]  # The latest message for a key moves to the end
+        pending[key] = text
+
+    @staticmethod
+    def _chunks(texts: List[str]) -> List[str]:
+        """Joins messages into as few Telegram messages as the length limit allows."""
+        chunks, current = [], ""
+        for text in texts:
+            text = text[:TELEGRAM_MAX_MESSAGE_LENGTH]
+            candidate = f"{current}\n\n{text}" if current else text
+            if len(candidate) > TELEGRAM_MAX_MESSAGE_LENGTH:
+                chunks.append(current)
+                candidate = text
+            current = candidate
+        if current:
+            chunks.append(current)
+        return chunks
+
+    async def _send(self, text: str) -> bool:
+        delay = self.backoff
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire()
+            self.stats["api_calls"] += 1
+            try:
+                if not self._initialized:
+                    await self.bot.initialize()
+                    self._initialized = True
+                with stage(self.metrics, "telegram_send"):
+                    await self.bot.send_message(chat_id=self.chat_id, text=text)
+                return True
+            except RetryAfter as e:
+                wait = e.retry_after.total_seconds() if hasattr(e.retry_after, "total_seconds") else e.retry_after
+                print(f"Telegram rate limit hit, retrying in {wait}s.")
+            except (BadRequest, Forbidden, InvalidToken) as e:
+                print(f"Telegram rejected the message, dropping it: {e}")
+                return False
+            except TelegramError as e:  # NetworkError, TimedOut and other transient errors
+                wait = delay
+                delay = min(self.max_backoff, delay * 2)
+                print(f"Error sending Telegram message (attempt {attempt + 1}): {e}")
+            if attempt < self.max_retries:
+                self.stats["retries"] += 1
+                await asyncio.sleep(wait)
+        return False
+
+    async def flush(self, pending: "OrderedDict"):
+        """Sends the pending texts. A message that fails, for any reason, is counted and skipped."""
+        try:
+            for text in self._chunks(list(pending.values())):
+                try:
+                    sent = await self._send(text)
+                except Exception as e:
+                    print(f"Error sending Telegram message: {e}")
+                    sent = False
+                if sent:
+                    self.stats["sent"] += 1
+                    print(f"Telegram message sent: {text}")
+                else:
+                    self.stats["failed"] += 1
+        finally:
+            pending.clear()
+
+    async def run(self):
+        self._task = asyncio.current_task()
+        pending: OrderedDict = OrderedDict()
+        while not (self._stopped and self.queue.empty()):
+            try:
+                key, text = await asyncio.wait_for(self.queue.get(), 1.0)
+            except asyncio.TimeoutError:
+                continue
+            self._add(pending, key, text)
+            if not self._stopped:
+                # Give a burst time to arrive so it goes out as one message
+                await asyncio.sleep(self.coalesce_window)
+            self._drain(pending)
+            try:
+                await self.flush(pending)
+            except Exception as e:
+                # Keep dispatching; one bad batch must not silence every later notification
+                print(f"Error flushing Telegram notifications: {e}")
+
+    async def close(self, timeout: float = 10.0):
+        """Sends what is still queued (waiting up to ``timeout``) and shuts the bot down."""
+        self._stopped = True
+        if self._task is not None and not self._task.done():
+            try:
+                await asyncio.wait_for(self._task, timeout)
+            except asyncio.TimeoutError:
+                print("Timed out flushing Telegram notifications.")
+        if self._initialized:
+            await self.bot.shutdown()
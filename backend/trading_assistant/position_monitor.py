@@ -0,0 +1,233 @@
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from gateio_client.rate_limiter import AsyncRateLimiter
+from trading_assistant.metrics import stage
+from trading_assistant.trailing_manager import TrailingManager
+
+
+class PositionMonitor:
+    """Re-evaluates trailing stops for all open positions on every price update.
+
+    Runs as its own task, separate from the signal cycle. It uses the latest ATR published
+    by the cycle, moves a position's stop loss / take profit trigger orders only when a
+    level moved by at least one price tick, and caps amendments with a rate limiter.
+    Levels are ratcheted per position, so an exchange stop is never loosened.
+    """
+
+    def __init__(self, async_client, trailing_manager: TrailingManager, contract: str,
+                 initial_stop_loss: float, initial_take_profit: float, tick_size: float = 0.01,
+                 amend_rate: float = 1.0, amend_burst: int = 5, refresh_interval: float = 10.0,
+                 on_amended: Optional[Callable] = None, metrics=None, tp_hysteresis_atr: float = 0.5):
+        self.async_client = async_client
+        self.trailing_manager = trailing_manager
+        self.contract = contract
+        self.initial_stop_loss = initial_stop_loss
+        self.initial_take_profit = initial_take_profit
+        self.tick_size = tick_size
+        self.rate_limiter = AsyncRateLimiter(amend_rate, amend_burst)
+        self.refresh_interval = refresh_interval
+        self.on_amended = on_amended  # on_amended(contract, position_key, stop_loss, take_profit)
+        self.metrics = metrics  # Optional CycleMetrics for the "position_evaluate" and "amend_order" stages
+        self.positions: List[dict] = []
+        self.positions_updated = 0.0
+        self.trigger_orders: List[dict] = []  # Open price-triggered orders: the positions' SL/TP
+        self.orders_updated = 0.0
+        self.multiplier: Optional[float] = None  # Base currency per contract (quanto_multiplier)
+        self.atr_value = 0.0
+        self.price: Optional[float] = None
+        self.tp_hysteresis_atr = tp_hysteresis_atr  # ATRs the trailing take profit must gain before it is re-sent
+        self.levels: Dict[str, dict] = {}  # position key -> ratcheted open_price, stop_loss, take_profit
+        self.retry_after: Dict[str, float] = {}  # position key -> monotonic time of the next attempt after a failure
+        self.stats = {"evaluations": 0, "amendments": 0, "skipped_below_tick": 0, "throttled": 0,
+                      "missing_orders": 0, "failed": 0}
+        self._price_event = asyncio.Event()
+        self._stopped = False
+
+    def update_positions(self, positions: Optional[list]):
+        """Replaces the cached open positions (e.g. with the ones fetched by the signal cycle)."""
+        if positions is None:
+            return
+        self.positions = list(positions)
+        self.positions_updated = time.monotonic()
+        open_keys = {self._position_key(p) for p in self.positions}
+        self.retry_after = {k: v for k, v in self.retry_after.items() if k in open_keys}
+        self.levels = {k: v for k, v in self.levels.items() if k in open_keys}
+
+    def update_trigger_orders(self, orders: Optional[list]):
+        if orders is None:
+            return
+        self.trigger_orders = list(orders)
+        self.orders_updated = time.monotonic()
+
+    def update_atr(self, atr_value: float):
+        self.atr_value = atr_value
+
+    def on_price(self, contract: str, price: float, timestamp: float = None):
+        """Price callback for the market data stream or the signal cycle."""
+        if contract != self.contract:
+            return
+        self.price = price
+        self._price_event.set()
+
+    async def run(self):
+        while not self._stopped:
+            try:
+                await asyncio.wait_for(self._price_event.wait(), self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._price_event.clear()
+            try:
+                if self.multiplier is None:
+                    self.multiplier = await self.async_client.get_contract_multiplier(self.contract)
+                now = time.monotonic()
+                if now - self.positions_updated >= self.refresh_interval:
+                    with stage(self.metrics, "fetch_positions"):
+                        self.update_positions(await self.async_client.get_open_positions(self.contract))
+                if now - self.orders_updated >= self.refresh_interval:
+                    with stage(self.metrics, "fetch_trigger_orders"):
+                        self.update_trigger_orders(await self.async_client.get_trigger_orders(self.contract))
+                with stage(self.metrics, "position_evaluate"):
+                    await self.evaluate()
+            except Exception as e:
+                print(f"Error in position monitor: {e}")
+
+    def stop(self):
+        self._stopped = True
+        self._price_event.set()
+
+    def round_to_tick(self, price: Optional[float]) -> Optional[float]:
+        if price is None:
+            return None
+        return round(round(price / self.tick_size) * self.tick_size, 10)
+
+    @staticmethod
+    def _position_key(position: dict) -> str:
+        # Gate positions have no id: a contract holds one position per mode (single, dual_long, dual_short)
+        return f"{position.get('contract')}:{position.get('mode') or 'single'}"
+
+    def _protective_orders(self, position: dict, direction: str) -> Tuple[Optional[dict], Optional[dict]]:
+        """The open (stop loss, take profit) trigger orders that close ``position``.
+
+        A long is stopped out when the price falls to the trigger (rule 2, ``<=``) and takes
+        profit when it rises to it (rule 1, ``>=``); a short the other way round.
+        """
+        close_side = "close_long" if direction == "long" else "close_short"
+        dual = str(position.get('mode') or '').startswith("dual")
+        stop_loss_rule = 2 if direction == "long" else 1
+        stop_loss = take_profit = None
+        for order in self.trigger_orders:
+            initial = order.get('initial') or {}
+            if initial.get('contract') != position.get('contract'):
+                continue
+            if dual:
+                if initial.get('auto_size') != close_side:
+                    continue
+            elif not (initial.get('close') or initial.get('reduce_only')):
+                continue
+            if (order.get('trigger') or {}).get('rule') == stop_loss_rule:
+                stop_loss = stop_loss or order
+            else:
+                take_profit = take_profit or order
+        return stop_loss, take_profit
+
+    @staticmethod
+    def _trigger_price(order: Optional[dict]) -> Optional[float]:
+        return None if order is None else float(order['trigger']['price'])
+
+    @staticmethod
+    def _beyond(new: Optional[float], current: Optional[float], sign: int, min_step: float) -> bool:
+        """Whether ``new`` is at least ``min_step`` past ``current`` in the ``sign`` direction."""
+        if new is None or current is None:
+            return False
+        return sign * (new - current) >= min_step - 1e-12
+
+    def _ratchet(self, key: str, position: dict, direction: str, base_size: float,
+                 current_stop_loss: Optional[float], current_take_profit: Optional[float]) -> Tuple[Optional[float], Optional[float]]:
+        """Returns the position's ratcheted (stop loss, take profit).
+
+        Levels start from the exchange orders and move only once the trailing trigger is
+        reached: the stop only tightens and the take profit only moves further into profit,
+        re-trailing only after it would move by ``tp_hysteresis_atr`` ATRs. Levels already
+        better on the exchange (e.g. set by hand) are adopted, never undone.
+        """
+        open_price = float(position.get('entry_price', 0.0))
+        sign = 1 if direction == "long" else -1
+        levels = self.levels.get(key)
+        if levels is None or levels['open_price'] != open_price:  # A new position under the same key
+            levels = {'open_price': open_price, 'stop_loss': current_stop_loss, 'take_profit': current_take_profit}
+            self.levels[key] = levels
+        if self._beyond(current_stop_loss, levels['stop_loss'], sign, 0.0) or levels['stop_loss'] is None:
+            levels['stop_loss'] = current_stop_loss
+        if self._beyond(current_take_profit, levels['take_profit'], sign, 0.0) or levels['take_profit'] is None:
+            levels['take_profit'] = current_take_profit
+        if self.trailing_manager.trailing_triggered(open_price, self.price, direction, base_size):
+            stop_loss, take_profit = self.trailing_manager.calculate_current_levels(
+                open_price, self.price, self.atr_value, direction, base_size)
+            stop_loss = self.round_to_tick(stop_loss)
+            take_profit = self.round_to_tick(take_profit)
+            if levels['stop_loss'] is None or self._beyond(stop_loss, levels['stop_loss'], sign, 0.0):
+                levels['stop_loss'] = stop_loss
+            hysteresis = max(self.tick_size, self.tp_hysteresis_atr * self.atr_value)
+            if levels['take_profit'] is None or self._beyond(take_profit, levels['take_profit'], sign, hysteresis):
+                levels['take_profit'] = take_profit
+        return levels['stop_loss'], levels['take_profit']
+
+    async def _amend(self, order: dict, trigger_price: float) -> bool:
+        amended_order = await self.async_client.amend_trigger_order(self.contract, order, trigger_price)
+        if amended_order is None:
+            return False
+        self.trigger_orders = [amended_order if o.get('id') == order.get('id') else o for o in self.trigger_orders]
+        return True
+
+    async def evaluate(self):
+        """Checks every cached position against the latest price and moves the SL/TP orders that moved."""
+        if self.price is None or not self.positions or self.multiplier is None:
+            return
+        self.stats["evaluations"] += 1
+        now = time.monotonic()
+        for position in self.positions:
+            size = float(position.get('size', 0) or 0)
+            if size == 0:
+                continue
+            key = self._position_key(position)
+            if now < self.retry_after.get(key, 0.0):
+                continue
+            direction = "long" if size > 0 else "short"  # Futures size is signed
+            stop_loss_order, take_profit_order = self._protective_orders(position, direction)
+            if stop_loss_order is None and take_profit_order is None:
+                self.stats["missing_orders"] += 1
+                continue
+            current_stop_loss = self._trigger_price(stop_loss_order)
+            current_take_profit = self._trigger_price(take_profit_order)
+            new_stop_loss, new_take_profit = self._ratchet(key, position, direction, abs(size) * self.multiplier,
+                                                           current_stop_loss, current_take_profit)
+            sign = 1 if direction == "long" else -1
+            amendments = []
+            # Only ever tighten the stop and push the take profit further into profit
+            if self._beyond(new_stop_loss, current_stop_loss, sign, self.tick_size):
+                amendments.append((stop_loss_order, new_stop_loss))
+            if self._beyond(new_take_profit, current_take_profit, sign, self.tick_size):
+                amendments.append((take_profit_order, new_take_profit))
+            if not amendments:
+                self.stats["skipped_below_tick"] += 1
+                continue
+            if not self.rate_limiter.try_acquire():
+                # Skip rather than queue: the next price update re-evaluates with fresh levels
+                self.stats["throttled"] += 1
+                continue
+            print(f"Adjustment needed for position: {key}. New SL: {new_stop_loss}, New TP: {new_take_profit}")
+            with stage(self.metrics, "amend_order"):
+                results = await asyncio.gather(*(self._amend(order, price) for order, price in amendments))
+            if not all(results):
+                # The orders may have filled or been replaced by hand: back off and re-read them
+                self.stats["failed"] += 1
+                self.retry_after[key] = time.monotonic() + self.refresh_interval
+                self.orders_updated = 0.0
+            if any(results):
+                self.stats["amendments"] += 1
+                if self.on_amended is not None:
+                    stop_loss_order, take_profit_order = self._protective_orders(position, direction)
+                    self.on_amended(self.contract, key, self._trigger_price(stop_loss_order),
+                                    self._trigger_price(take_profit_order))
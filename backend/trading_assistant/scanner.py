@@ -0,0 +1,149 @@
+import asyncio
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from gateio_client.rate_limiter import AsyncRateLimiter
+from market_data.candle_store import CANDLE_COLUMNS, CandleStore
+from signal_engine.batch_indicators import compute_indicators
+from signal_engine.candle_patterns import CandlePatterns
+from signal_engine.fib_support import FibSupport
+from signal_engine.macd_rsi_logic import MacdRsiLogic
+from signal_engine.pipeline import SignalPipeline
+from signal_engine.scoring_rules import RuleScoringSystem
+from signal_engine.scoring_system import ScoringSystem
+from signal_engine.vegas_tunnel import VegasTunnel
+
+
+def score_contract(contract: str, candles: np.ndarray, params: dict, large_candles: Optional[np.ndarray] = None,
+                   rules: Optional[dict] = None) -> dict:
+    """Process-pool entry point: computes indicators for one contract and scores its last closed candle.
+
+    Scored like the live loop: with the live rule set (``rules``, the plain ScoringSystem
+    without it), the trend of the closed ``large_candles`` and Fib swings taken from all
+    of ``candles`` rather than only the scoring window.
+    """
+    vegas_tunnel = VegasTunnel(params['ema_short'], params['ema_medium'], params['ema_long'])
+    fib_support = FibSupport()
+    scoring_system = RuleScoringSystem(rules=rules) if rules is not None else ScoringSystem()
+    pipeline = SignalPipeline(vegas_tunnel, MacdRsiLogic(), fib_support,
+                              CandlePatterns(scored=params.get('scored_patterns')), scoring_system,
+                              params['strong_score'])
+    df = pd.DataFrame(candles, columns=CANDLE_COLUMNS)
+    compute_indicators(df, vegas_tunnel.ema_spans(), params['macd_fast'], params['macd_slow'],
+                       params['macd_signal'], params['rsi_length'], params['atr_length'])
+    atr_value = df[f"ATRr_{params['atr_length']}"].iloc[-1]
+    atr_value = 0.0 if math.isnan(atr_value) else float(atr_value)
+    large_timeframe_trend = "sideways"
+    if large_candles is not None:
+        large_timeframe_trend = vegas_tunnel.calculate_large_timeframe_trend(
+            pd.DataFrame(large_candles, columns=CANDLE_COLUMNS))
+    fib_support.find_levels(df)  # The swings of the whole history; evaluate adds no newer rows
+    details = pipeline.evaluate(df.tail(params['window']).reset_index(drop=True), atr_value, large_timeframe_trend)
+    trend = details['trend_status']
+    return {
+        "contract": contract,
+        "timestamp": int(df['timestamp'].iloc[-1]),
+        "price": float(df['close'].iloc[-1]),
+        "score": float(details['score']),
+        "signal_type": details['signal_type'],
+        "trend": trend[0] if isinstance(trend, tuple) else trend,
+        "large_timeframe_trend": large_timeframe_trend,
+        "atr": atr_value,
+        "details": details['details'],
+    }
+
+
+class MarketScanner:
+    """Scores many contracts with the full signal pipeline and publishes them ranked by score.
+
+    Candles of ``interval`` and of ``large_timeframe`` are kept in a dedicated CandleStore,
+    so after the first pass each contract only downloads its newly closed candles. Every
+    exchange request, including each page of a longer sync, takes a token from a shared
+    rate limiter; scoring is spread over a process pool. ``scoring_system`` is the live
+    one: a RuleScoringSystem's current rules are sent with every pass.
+    """
+
+    def __init__(self, async_client, contracts: List[str], params: dict, interval: str = "1m",
+                 history: int = 2000, request_rate: float = 10.0, max_workers: Optional[int] = None,
+                 on_price: Optional[Callable] = None, large_timeframe: Optional[str] = "4h",
+                 large_history: int = 500, scoring_system: Optional[ScoringSystem] = None):
+        self.async_client = async_client
+        self.contracts = list(contracts)
+        self.params = params
+        self.interval = interval
+        self.history = history
+        self.large_timeframe = large_timeframe
+        self.large_history = large_history
+        self.scoring_system = scoring_system
+        self.rate_limiter = AsyncRateLimiter(request_rate, burst=max(1, int(request_rate)))
+        self.candle_store = CandleStore(async_client.client, capacity=max(history, large_history),
+                                        throttle=self.rate_limiter.acquire_blocking)
+        self.executor = ProcessPoolExecutor(max_workers=max_workers)
+        self.on_price = on_price  # on_price(contract, price, timestamp) with each contract's latest close
+        self.results: List[dict] = []
+        self.errors: dict = {}
+        self.last_scan: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self._stopped = False
+
+    def _sync(self, contract: str):
+        """Worker-thread sync of one contract's candles and, if configured, its large-timeframe candles."""
+        buf = self.candle_store.sync(contract, self.interval, self.history)
+        large = None
+        if self.large_timeframe:
+            large = self.candle_store.sync(contract, self.large_timeframe, self.large_history).to_array()
+        return buf, large
+
+    async def scan(self) -> List[dict]:
+        """Runs one pass over all contracts and returns the results, best score first."""
+        started = time.monotonic()
+        synced = await asyncio.gather(*(self.async_client.run(self._sync, c) for c in self.contracts),
+                                      return_exceptions=True)
+        rules = getattr(self.scoring_system, "rules", None)  # Read once, so a reload mid-pass cannot mix rule sets
+        loop = asyncio.get_running_loop()
+        jobs = {}
+        errors = {}
+        for contract, result in zip(self.contracts, synced):
+            if isinstance(result, Exception):
+                errors[contract] = str(result)
+                continue
+            buf, large = result
+            if self.on_price is not None and len(buf):
+                latest = buf.forming if buf.forming else buf.to_array(1)[0]
+                self.on_price(contract, float(latest[4]), float(latest[0]))
+            if len(buf) >= 2:
+                jobs[contract] = loop.run_in_executor(self.executor, score_contract, contract, buf.to_array(),
+                                                      self.params, large, rules)
+        results = []
+        for contract, result in zip(jobs, await asyncio.gather(*jobs.values(), return_exceptions=True)):
+            if isinstance(result, Exception):
+                errors[contract] = str(result)
+            else:
+                results.append(result)
+        results.sort(key=lambda r: r['score'], reverse=True)
+        for rank, result in enumerate(results, start=1):
+            result['rank'] = rank
+        self.results = results
+        self.errors = errors
+        self.last_scan = time.time()
+        self.last_duration = time.monotonic() - started
+        print(f"Scanned {len(results)}/{len(self.contracts)} contracts in {self.last_duration:.2f}s")
+        return results
+
+    async def run(self, interval_seconds: float):
+        while not self._stopped:
+            started = time.monotonic()
+            try:
+                await self.scan()
+            except Exception as e:
+                print(f"Error running market scan: {e}")
+            await asyncio.sleep(max(0.0, interval_seconds - (time.monotonic() - started)))
+
+    def stop(self):
+        self._stopped = True
+        self.executor.shutdown(wait=False, cancel_futures=True)
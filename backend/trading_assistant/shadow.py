@@ -0,0 +1,190 @@
+import datetime
+import json
+import os
+from typing import List, Optional
+
+import pandas as pd
+
+from database import models
+from signal_engine.pipeline import SignalPipeline
+from signal_engine.scoring_rules import RuleScoringSystem
+from signal_engine.scoring_system import ScoringSystem
+from trading_assistant.metrics import stage
+from trading_assistant.trailing_manager import TrailingManager
+
+
+def _candle_time(timestamp) -> datetime.datetime:
+    return datetime.datetime.utcfromtimestamp(int(timestamp))
+
+
+class ShadowVariant:
+    """One scoring/trailing configuration that trades on paper.
+
+    It holds at most one position at a time and exits it with the rules of
+    ``backtest.engine.simulate_trades``: entry at the signal candle's close, stop loss
+    checked before take profit against each later candle's low/high, and the levels
+    trailed at the candle close with ``trailing_manager``. Exits therefore match what a
+    backtest of the same variant reports.
+    """
+
+    def __init__(self, variant_id: str, scoring_system: ScoringSystem, trailing_manager: TrailingManager,
+                 strong_score: float = 8, position_size: float = 1.0, fee_rate: float = 0.0005):
+        self.variant_id = variant_id
+        self.scoring_system = scoring_system
+        self.trailing_manager = trailing_manager
+        self.strong_score = strong_score
+        self.position_size = position_size
+        self.fee_rate = fee_rate
+        self.position: Optional[dict] = None
+        self.last_exit_time = None
+        self.last_signal: Optional[dict] = None
+        self.stats = {"signals": 0, "trades": 0, "wins": 0, "profit": 0.0}
+
+    def open(self, direction: str, timestamp, price: float, atr_value: float):
+        stop_loss, take_profit = self.trailing_manager.calculate_current_levels(
+            price, price, atr_value, direction, self.position_size)
+        self.position = {"direction": direction, "open_time": timestamp, "open_price": price,
+                         "stop_loss": stop_loss, "take_profit": take_profit, "bars_held": 0}
+
+    def step(self, timestamp, high: float, low: float, close: float, atr_value: float) -> Optional[models.ShadowTrade]:
+        """Moves the open position through one closed candle. Returns the trade if it closed."""
+        position = self.position
+        if position is None or timestamp <= position["open_time"]:
+            return None
+        position["bars_held"] += 1
+        exit_price, reason = None, None
+        if position["direction"] == "long":
+            if low <= position["stop_loss"]:
+                exit_price, reason = position["stop_loss"], "stop_loss"
+            elif high >= position["take_profit"]:
+                exit_price, reason = position["take_profit"], "take_profit"
+        else:
+            if high >= position["stop_loss"]:
+                exit_price, reason = position["stop_loss"], "stop_loss"
+            elif low <= position["take_profit"]:
+                exit_price, reason = position["take_profit"], "take_profit"
+        if exit_price is None:
+            position["stop_loss"], position["take_profit"] = self.trailing_manager.calculate_current_levels(
+                position["open_price"], close, atr_value, position["direction"], self.position_size)
+            return None
+        return self._close(timestamp, exit_price, reason)
+
+    def _close(self, timestamp, exit_price: float, reason: str) -> models.ShadowTrade:
+        position, self.position = self.position, None
+        self.last_exit_time = timestamp
+        sign = 1 if position["direction"] == "long" else -1
+        fees = (position["open_price"] + exit_price) * self.position_size * self.fee_rate
+        profit = sign * (exit_price - position["open_price"]) * self.position_size - fees
+        self.stats["trades"] += 1
+        self.stats["wins"] += int(profit > 0)
+        self.stats["profit"] += profit
+        return models.ShadowTrade(
+            variant=self.variant_id, direction=position["direction"],
+            open_time=_candle_time(position["open_time"]), close_time=_candle_time(timestamp),
+            open_price=position["open_price"], close_price=exit_price,
+            bars_held=position["bars_held"], exit_reason=reason, profit=profit,
+        )
+
+    def summary(self) -> dict:
+        return {"id": self.variant_id, **self.stats, "position": self.position, "last_signal": self.last_signal}
+
+
+class ShadowStrategies:
+    """Runs scoring/trailing variants next to the live strategy without trading them.
+
+    Each cycle the live pipeline's ``signal_inputs`` (indicators, Fib levels, patterns,
+    computed once) are scored by every variant, so an extra variant costs one score and
+    one paper-position step. Signals and closed paper trades are queued on the database
+    writer as ShadowSignal/ShadowTrade rows tagged with the variant id; when the writer is
+    full they are dropped rather than holding up the live cycle.
+    """
+
+    def __init__(self, variants: List[ShadowVariant], pipeline: SignalPipeline, db_writer=None, metrics=None):
+        ids = [variant.variant_id for variant in variants]
+        if len(set(ids)) != len(ids):
+            raise ValueError("Shadow variant ids must be unique")
+        self.variants = variants
+        self.pipeline = pipeline
+        self.db_writer = db_writer
+        self.metrics = metrics  # Optional CycleMetrics; records the "shadow" stage
+        self.last_timestamp = None
+
+    def on_cycle(self, df: pd.DataFrame, inputs: dict, atr_column: str, large_timeframe_trend: str = None):
+        """Steps the paper positions through the candles closed since the last cycle, then
+        scores the last one for every variant."""
+        with stage(self.metrics, "shadow"):
+            bars = df.tail(1) if self.last_timestamp is None else df[df['timestamp'] > self.last_timestamp]
+            if len(bars) == 0:
+                return
+            timestamps = [int(timestamp) for timestamp in bars['timestamp'].tolist()]
+            highs = bars['high'].tolist()
+            lows = bars['low'].tolist()
+            closes = bars['close'].tolist()
+            atrs = bars[atr_column].fillna(0.0).tolist()
+            rows = []
+            for variant in self.variants:
+                if hasattr(variant.scoring_system, "reload_if_changed"):
+                    variant.scoring_system.reload_if_changed()
+                for i in range(len(bars)):
+                    trade = variant.step(timestamps[i], highs[i], lows[i], closes[i], atrs[i])
+                    if trade is not None:
+                        rows.append(trade)
+                rows.append(self._score(variant, inputs, timestamps[-1], closes[-1], atrs[-1], large_timeframe_trend))
+            self.last_timestamp = timestamps[-1]
+            if self.db_writer is not None:
+                for row in rows:
+                    self.db_writer.put_nowait(row)
+
+    def _score(self, variant: ShadowVariant, inputs: dict, timestamp, price: float, atr_value: float,
+               large_timeframe_trend: str) -> models.ShadowSignal:
+        details = self.pipeline.score(inputs, atr_value, large_timeframe_trend,
+                                      variant.scoring_system, variant.strong_score)
+        signal_type = details['signal_type']
+        variant.last_signal = {"timestamp": timestamp, "score": details['score'], "signal_type": signal_type}
+        variant.stats["signals"] += int(signal_type != "NEUTRAL")
+        if signal_type != "NEUTRAL" and variant.position is None and \
+                (variant.last_exit_time is None or timestamp > variant.last_exit_time):
+            variant.open("long" if signal_type == "BUY" else "short", timestamp, price, atr_value)
+        return models.ShadowSignal(
+            variant=variant.variant_id, candle_time=_candle_time(timestamp), price=price,
+            score=details['score'], trend_direction=variant.scoring_system.trend_label(details['trend_direction']),
+            signal_type=signal_type,
+        )
+
+    def summary(self) -> List[dict]:
+        return [variant.summary() for variant in self.variants]
+
+
+def load_variants(path: str, stop_loss: float, take_profit: float, trailing_trigger: float,
+                  strong_score: float) -> List[ShadowVariant]:
+    """Builds the variants listed in a JSON file, e.g.
+
+        [{"id": "strict", "strong_score": 9},
+         {"id": "no-atr-penalty", "rules": "config/scoring_rules_no_atr.json"},
+         {"id": "wide-stops", "weights": {"fib_level": 1}, "stop_loss": 20, "take_profit": 30}]
+
+    ``rules`` is a rule file (reloaded when it changes) or an inline rule set; without it
+    ``weights`` and ``high_atr_threshold`` configure a plain ScoringSystem. Trailing and
+    ``strong_score`` settings not given fall back to the live ones passed in. A ``rules``
+    file that does not exist fails the load rather than shadowing the default rules.
+    """
+    with open(path) as f:
+        specs = json.load(f)
+    variants = []
+    for spec in specs:
+        rules = spec.get("rules")
+        if isinstance(rules, str):
+            if not os.path.isfile(rules):
+                raise ValueError(f"Shadow variant {spec['id']}: rules file not found: {rules}")
+            scoring_system = RuleScoringSystem(rules)
+        elif isinstance(rules, dict):
+            scoring_system = RuleScoringSystem(rules=rules)
+        else:
+            scoring_system = ScoringSystem(spec.get("weights"), spec.get("high_atr_threshold", 5.0))
+        trailing_manager = TrailingManager(spec.get("stop_loss", stop_loss), spec.get("take_profit", take_profit),
+                                           spec.get("trailing_trigger", trailing_trigger), spec.get("atr_multiplier"))
+        variants.append(ShadowVariant(
+            spec["id"], scoring_system, trailing_manager, spec.get("strong_score", strong_score),
+            spec.get("position_size", 1.0), spec.get("fee_rate", 0.0005),
+        ))
+    return variants
@@ -1,18 +1,25 @@
 import telegram
 
+from trading_assistant.notification_dispatcher import NotificationDispatcher
+
 class TelegramNotifier:
-    def __init__(self, bot_token: str, chat_id: str):
+    def __init__(self, bot_token: str, chat_id: str, base_url: str = None, **dispatcher_options):
         self.bot_token = bot_token
         self.chat_id = chat_id
-        self.bot = telegram.Bot(token=bot_token)
+        # base_url lets tests point the bot at a local stub server
+        self.bot = telegram.Bot(token=bot_token, base_url=base_url) if base_url else telegram.Bot(token=bot_token)
+        self.dispatcher = NotificationDispatcher(self.bot, chat_id, **dispatcher_options)
+
+    async def run(self):
+        await self.dispatcher.run()
 
-    def send_message(self, message: str):
-        """Sends a message to the configured Telegram chat."""
-        try:
-            self.bot.send_message(chat_id=self.chat_id, text=message)
-            print(f"Telegram message sent: {message}")
-        except Exception as e:
-            print(f"Error sending Telegram message: {e}")
+    async def close(self):
+        await self.dispatcher.close()
+
+    def send_message(self, message: str, key: str = None):
+        """Queues a message for the configured Telegram chat; messages sharing ``key`` are coalesced."""
+        if not self.dispatcher.enqueue(message, key):
+            print(f"Telegram queue full, dropping message: {message}")
 
     def send_signal_notification(self, signal_details: dict):
         """Sends a formatted notification for a trading signal."""
@@ -32,3 +39,26 @@ class TelegramNotifier:
                   f"Profit/Loss: {trade_details.get('profit', 'N/A')}\n" \
                   f"Notes: {trade_details.get('notes', 'N/A')}"
         self.send_message(message)
+
+    def send_adjustment_notification(self, contract: str, position_id, stop_loss: float, take_profit: float):
+        """Sends the new SL/TP of a position; a burst of adjustments is sent as the latest one."""
+        message = f"🛡 Stop Adjusted\n\n" \
+                  f"Symbol: {contract}\n" \
+                  f"Position: {position_id}\n" \
+                  f"Stop Loss: {stop_loss}\n" \
+                  f"Take Profit: {take_profit}"
+        self.send_message(message, key=f"adjustment:{contract}:{position_id}")
+
+
+class NullNotifier(TelegramNotifier):
+    """Counts notifications and drops them; a replay must not message the live chat."""
+
+    def __init__(self, **dispatcher_options):
+        self.bot_token = None
+        self.chat_id = None
+        self.bot = None
+        self.dispatcher = NotificationDispatcher(None, None, **dispatcher_options)
+        self.dropped = 0
+
+    def send_message(self, message: str, key: str = None):
+        self.dropped += 1
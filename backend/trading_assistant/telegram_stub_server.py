@@ -0,0 +1,113 @@
+"""Local stand-in for the Telegram Bot API, for exercising the notification dispatcher.
+
+    python -m trading_assistant.telegram_stub_server --port 8081 --rate-limit-every 5
+
+Point the bot at it with TELEGRAM_API_BASE_URL=http://127.0.0.1:8081/bot. Every
+sendMessage is printed and kept in ``messages``. The server can answer every Nth call
+with a 429 (``retry_after``) or a 502 to test the retry paths.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+from urllib.parse import parse_qs
+
+
+class StubBotServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, rate_limit_every: int = 0, retry_after: int = 1,
+                 fail_every: int = 0, verbose: bool = False):
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.fail_every = fail_every
+        self.verbose = verbose
+        self.messages: List[dict] = []
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/bot"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length).decode() if length else ""
+                if self.headers.get("Content-Type", "").startswith("application/json"):
+                    params = json.loads(body or "{}")
+                else:
+                    params = {k: v[0] for k, v in parse_qs(body).items()}
+                status, payload = server.respond(self.path.rsplit("/", 1)[-1], params)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def respond(self, method: str, params: dict):
+        with self._lock:
+            self.calls += 1
+            calls = self.calls
+        if method == "getMe":
+            return 200, {"ok": True, "result": {"id": 1, "is_bot": True, "first_name": "Stub", "username": "stub_bot"}}
+        if self.rate_limit_every and calls % self.rate_limit_every == 0:
+            return 429, {"ok": False, "error_code": 429, "description": f"Too Many Requests: retry after {self.retry_after}",
+                         "parameters": {"retry_after": self.retry_after}}
+        if self.fail_every and calls % self.fail_every == 0:
+            return 502, {"ok": False, "error_code": 502, "description": "Bad Gateway"}
+        if method == "sendMessage":
+            with self._lock:
+                message_id = len(self.messages) + 1
+                message = {"message_id": message_id, "date": int(time.time()), "text": params.get("text", ""),
+                           "chat": {"id": int(params.get("chat_id", 0)), "type": "private"}}
+                self.messages.append(message)
+            if self.verbose:
+                print(f"[{message['chat']['id']}] {message['text']}\n")
+            return 200, {"ok": True, "result": message}
+        return 200, {"ok": True, "result": True}
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stub of the Telegram Bot API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Answer every Nth call with a 429")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--fail-every", type=int, default=0, help="Answer every Nth call with a 502")
+    args = parser.parse_args()
+    server = StubBotServer(args.host, args.port, args.rate_limit_every, args.retry_after, args.fail_every, verbose=True)
+    print(f"Stub Telegram Bot API listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,11 @@
 class TrailingManager:
-    def __init__(self, initial_stop_loss_usd: float, initial_take_profit_usd: float, trailing_trigger_usd: float):
+    def __init__(self, initial_stop_loss_usd: float, initial_take_profit_usd: float, trailing_trigger_usd: float,
+                 atr_multiplier: float = None):
         self.initial_stop_loss_usd = initial_stop_loss_usd
         self.initial_take_profit_usd = initial_take_profit_usd
         self.trailing_trigger_usd = trailing_trigger_usd
+        # ATR multiple the take profit trails by once triggered; defaults to the take-profit/trigger ratio
+        self.atr_multiplier = atr_multiplier if atr_multiplier is not None else initial_take_profit_usd / trailing_trigger_usd
         self.strategy_rules = {} # Placeholder for specific strategy rules
 
     def calculate_current_levels(self, open_price: float, current_price: float, atr_value: float, position_direction: str, position_size: float = 1.0):
@@ -19,7 +22,7 @@ class TrailingManager:
                 # Move stop loss to breakeven
                 current_stop_loss = open_price
                 # Trail take profit based on ATR
-                current_take_profit = current_price + atr_value * (self.initial_take_profit_usd / self.trailing_trigger_usd) # Example: Scale take profit step by ATR relative to trigger
+                current_take_profit = current_price + atr_value * self.atr_multiplier # Example: Scale take profit step by ATR relative to trigger
 
         elif position_direction == "short":
             profit_usd = (open_price - current_price) * position_size
@@ -30,13 +33,19 @@ class TrailingManager:
                 # Move stop loss to breakeven
                 current_stop_loss = open_price
                 # Trail take profit based on ATR
-                current_take_profit = current_price - atr_value * (self.initial_take_profit_usd / self.trailing_trigger_usd) # Example: Scale take profit step by ATR relative to trigger
+                current_take_profit = current_price - atr_value * self.atr_multiplier # Example: Scale take profit step by ATR relative to trigger
         else:
             return None, None # Should not happen
 
         return current_stop_loss, current_take_profit
 
-    def check_for_adjustment(self, trade_data: dict, current_price: float, atr_value: float):
+    def trailing_triggered(self, open_price: float, current_price: float, position_direction: str,
+                           position_size: float = 1.0) -> bool:
+        """Whether the open profit reached the trailing trigger (calculate_current_levels trails from here on)."""
+        sign = 1 if position_direction == "long" else -1
+        return sign * (current_price - open_price) * position_size >= self.trailing_trigger_usd
+
+    def check_for_adjustment(self, trade_data: dict, current_price: float, atr_value: float, position_size: float = 1.0):
         """Checks if stop loss or take profit needs adjustment."""
         open_price = trade_data['open_price']
         initial_stop_loss = trade_data['initial_stop_loss']
@@ -56,7 +65,7 @@ class TrailingManager:
                 current_price,
                 atr_value, # Pass ATR value
                 position_direction, # Pass position direction
-                1.0 # Pass position size
+                position_size # Pass position size
             )
 
             # Check if calculated levels are different from current levels
@@ -1,11 +1,9 @@
-from database.db import create_connection, save_history, get_history
+from database.db import SessionLocal, save_history, get_history
 from datetime import datetime
 
 class TradingLogic:
     def __init__(self):
-        self.conn = create_connection("trading_history.db")
-        if self.conn:
-            create_tables(self.conn)
+        self.session_factory = SessionLocal
 
     def save_trade(self, price, volume, signal_type, signal_strength):
         """Save trade to database"""
@@ -16,8 +14,10 @@ class TradingLogic:
             "signal_type": signal_type,
             "signal_strength": signal_strength
         }
-        save_history(self.conn, trade_data)
+        with self.session_factory() as session:
+            save_history(session, trade_data)
 
     def get_recent_trades(self, limit=100):
         """Get recent trades from database"""
-        return get_history(self.conn, limit)
+        with self.session_factory() as session:
+            return get_history(session, limit)
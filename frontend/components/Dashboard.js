@@ -1,8 +1,12 @@
 import React, { useState, useEffect } from 'react';
 import Link from 'next/link';
 
+const EVENTS_URL = process.env.NEXT_PUBLIC_BACKEND_WS_URL || 'ws://localhost:8000/ws';
+
 function Dashboard() {
     const [latestPrice, setLatestPrice] = useState("Loading...");
+    const [latestSignal, setLatestSignal] = useState(null);
+    const [latestAdjustment, setLatestAdjustment] = useState(null);
 
     const fetchLatestPrice = async () => {
         try {
@@ -19,6 +23,37 @@ function Dashboard() {
         fetchLatestPrice();
     }, []);
 
+    // Live updates pushed by the backend: price ticks, new signals and SL/TP adjustments
+    useEffect(() => {
+        let socket;
+        let retryTimer;
+        let closed = false;
+        const connect = () => {
+            socket = new WebSocket(EVENTS_URL);
+            socket.onmessage = (message) => {
+                const event = JSON.parse(message.data);
+                if (event.type === 'price') {
+                    setLatestPrice(event.data.price);
+                } else if (event.type === 'signal') {
+                    setLatestSignal(event.data);
+                } else if (event.type === 'adjustment') {
+                    setLatestAdjustment(event.data);
+                }
+            };
+            socket.onclose = () => {
+                if (!closed) {
+                    retryTimer = setTimeout(connect, 5000);
+                }
+            };
+        };
+        connect();
+        return () => {
+            closed = true;
+            clearTimeout(retryTimer);
+            socket.close();
+        };
+    }, []);
+
     return (
         <div>
             <h1>Trading Dashboard</h1>
@@ -74,7 +109,8 @@ function Dashboard() {
             </div>
             <div>  
                 <h2>Scoring System</h2>
-                <h3>Current Score</h3>  
+                <h3>Current Score</h3>
+                <div>{latestSignal ? `${latestSignal.score} (${latestSignal.signal_type})` : "Waiting for signal..."}</div>
                 <h4>Score breakdown:</h4>    
                 <p>Details: The score is calculated based on MACD, RSI, Vegas Tunnel, EMA Double Cross, Candlestick Pattern, Fibonacci Support/Resistance.</p>   
             </div>
@@ -94,6 +130,9 @@ function Dashboard() {
               <h2>Dynamic Take Profit/Stop Loss</h2>
               <label htmlFor="dynamic-adjustment-switch">Enable Dynamic Adjustment</label>
               <input type="checkbox" id="dynamic-adjustment-switch" />
+              <div>
+                Last Adjustment: {latestAdjustment ? `SL ${latestAdjustment.stop_loss} / TP ${latestAdjustment.take_profit}` : "None yet"}
+              </div>
             </div>
 
             <div>
@@ -1,35 +1,82 @@
+import React, { useState, useEffect } from 'react';
 import Link from 'next/link';
 
+const FIELDS = 'score,details,trend_direction,signal_type,macd_status,rsi_status,fib_levels_status,candle_patterns_status,large_timeframe_trend';
+
 function SignalHistory() {
+  const [signals, setSignals] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [signalType, setSignalType] = useState('');
+  const [minScore, setMinScore] = useState('');
+  const [loading, setLoading] = useState(false);
+
+  const fetchSignals = async (cursor) => {
+    setLoading(true);
+    const params = new URLSearchParams({ limit: '50', fields: FIELDS });
+    if (cursor) params.set('cursor', cursor);
+    if (signalType) params.set('signal_type', signalType);
+    if (minScore) params.set('min_score', minScore);
+    try {
+      const response = await fetch(`/api/signals?${params.toString()}`);
+      const data = await response.json();
+      setSignals((previous) => (cursor ? [...previous, ...(data.items || [])] : (data.items || [])));
+      setNextCursor(data.next_cursor || null);
+    } catch (error) {
+      console.error("Error fetching signals:", error);
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  useEffect(() => {
+    fetchSignals(null);
+  }, [signalType, minScore]);
+
   return (
     <div>
       <h2>Signal History</h2>
+      <div> {/* Filters */}
+        <label htmlFor="signal-type-filter">Signal Type</label>
+        <select id="signal-type-filter" value={signalType} onChange={(e) => setSignalType(e.target.value)}>
+          <option value="">All</option>
+          <option value="BUY">BUY</option>
+          <option value="SELL">SELL</option>
+          <option value="NEUTRAL">NEUTRAL</option>
+        </select>
+        <label htmlFor="min-score-filter">Min Score</label>
+        <input id="min-score-filter" type="number" value={minScore} onChange={(e) => setMinScore(e.target.value)} />
+      </div>
       <div> {/* Main table container */}
         <div> {/* Header Row */}
-          <div>Timestamp</div>          
-          <div>Signal Name</div>          
-          <div>Signal Value</div>          
+          <div>Timestamp</div>
+          <div>Signal Type</div>
+          <div>Trend</div>
           <div>Score</div>
-          <div>Open Price</div>
-          <div>Close Price</div>
-          <div>Result</div>          
-        </div>
-        <div> {/* Example Row */}
-          <div>2024-10-27 10:00:00</div>
-          <div>MACD</div>
-          <div>Bullish</div>
-          <div>8</div>
-          <div>1500</div>
-          <div>1550</div>
-          <div>Success</div>
-          
+          <div>Fibonacci</div>
+          <div>Candle Patterns</div>
+          <div>Details</div>
         </div>
-         {/* Add more rows here as needed */}
-      
+        {signals.map((signal) => (
+          <div key={signal.id}>
+            <div>{signal.timestamp}</div>
+            <div>{signal.signal_type}</div>
+            <div>{signal.trend_direction}</div>
+            <div>{signal.score}</div>
+            <div>{signal.fib_levels_status}</div>
+            <div>{signal.candle_patterns_status}</div>
+            <div>{signal.details}</div>
+          </div>
+        ))}
+        {nextCursor && (
+          <button onClick={() => fetchSignals(nextCursor)} disabled={loading}>
+            {loading ? 'Loading...' : 'Load more'}
+          </button>
+        )}
+
       <Link href="/">Go to Dashboard</Link>
       </div>
     </div>
   );
 }
 
-export default SignalHistory;
\ No newline at end of file
+export default SignalHistory;
@@ -1,3 +1,28 @@
-export default function handler(req, res) {
-  res.status(200).json({ price: 1000 });
-}
\ No newline at end of file
+const BACKEND_URL = process.env.BACKEND_URL || 'http://localhost:8000';
+
+// Proxies the backend's cached /price; If-None-Match and the ETag are passed through so
+// polling clients get 304s while the price is unchanged.
+export default async function handler(req, res) {
+  const headers = {};
+  if (req.headers['if-none-match']) {
+    headers['If-None-Match'] = req.headers['if-none-match'];
+  }
+  try {
+    const response = await fetch(`${BACKEND_URL}/price`, { headers });
+    for (const name of ['etag', 'cache-control', 'x-price-age', 'x-price-stale']) {
+      const value = response.headers.get(name);
+      if (value) {
+        res.setHeader(name, value);
+      }
+    }
+    if (response.status === 304) {
+      res.status(304).end();
+      return;
+    }
+    const data = await response.json();
+    res.status(response.status).json(data);
+  } catch (error) {
+    console.error("Error fetching latest price:", error);
+    res.status(502).json({ message: "Error fetching latest price" });
+  }
+}
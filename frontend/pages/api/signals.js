@@ -0,0 +1,13 @@
+const BACKEND_URL = process.env.BACKEND_URL || 'http://localhost:8000';
+
+export default async function handler(req, res) {
+  const query = new URLSearchParams(req.query).toString();
+  try {
+    const response = await fetch(`${BACKEND_URL}/signals${query ? `?${query}` : ''}`);
+    const data = await response.json();
+    res.status(response.status).json(data);
+  } catch (error) {
+    console.error("Error fetching signals:", error);
+    res.status(502).json({ message: "Error fetching signals" });
+  }
+}